@@ -0,0 +1,194 @@
+"""Throughput, tail latency and engine overhead of every execution mode of BaseLLM.
+
+Providers:
+    fake            in-process FakeLLM, no network
+    anthropic-http  the Anthropic SDK against the local HTTP stand-in
+    openai-http     the OpenAI SDK against the local HTTP stand-in
+
+Engine overhead is measured separately with a zero-latency FakeLLM, so it is the cost of the
+scheduler, retries, bookkeeping and result frame per row.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_engine --rows 2000 --concurrency 200
+    python -m benchmarks.bench_engine --providers fake --modes window --rate-limit-rate 0.05
+    python -m benchmarks.bench_engine --providers anthropic-http --concurrency 400 --max-connections 400
+    python -m benchmarks.bench_engine --json bench.json
+    python -m benchmarks.bench_engine --baseline bench.json --tolerance 0.2
+"""
+
+from contextlib import ExitStack
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+import pandas as pd
+from datafarmer.llm import HttpTransport
+from datafarmer.utils import logger
+from benchmarks.fake_provider import FakeLLM, FaultModel, LatencyModel
+from benchmarks.http_stub import StubAnthropic, StubOpenAI, serve_stub
+
+MODES = ("batch", "window", "workers")
+PROVIDERS = ("fake", "anthropic-http", "openai-http")
+
+
+def get_mode_options(mode: str, concurrency: int, workers: int) -> dict:
+    return {
+        "batch": dict(batch_size=concurrency),
+        "window": dict(max_concurrency=concurrency),
+        "workers": dict(max_concurrency=concurrency, workers=workers),
+    }[mode]
+
+
+async def measure(llm, data: pd.DataFrame, options: dict) -> dict:
+    started_at = time.perf_counter()
+    result = await llm.generate_async_from_dataframe(data, **options)
+    elapsed = time.perf_counter() - started_at
+
+    latency = result["latency_ms"].dropna()
+    succeeded = int((result["status"] == "succeeded").sum())
+    pool_wait = llm.metrics.snapshot()["pool_wait_p99"]
+    return dict(
+        rows=len(result),
+        seconds=round(elapsed, 3),
+        rows_per_second=round(len(result) / elapsed, 1),
+        success_rate=round(succeeded / len(result), 4) if len(result) else 1.0,
+        latency_p50_ms=round(latency.quantile(0.5), 1) if len(latency) else None,
+        latency_p99_ms=round(latency.quantile(0.99), 1) if len(latency) else None,
+        attempts_mean=round(result["attempts"].mean(), 3),
+        pool_wait_p99_ms=round(pool_wait * 1000, 1) if pool_wait is not None else None,
+    )
+
+
+async def run(args) -> dict:
+    data = pd.DataFrame(
+        {"id": range(args.rows), "prompt": [f"prompt {i}" for i in range(args.rows)]}
+    )
+    retry_options = dict(min_wait=args.min_wait, max_wait=args.max_wait, request_timeout=args.timeout)
+    fault_options = dict(
+        rate_limit_rate=args.rate_limit_rate,
+        server_error_rate=args.server_error_rate,
+        timeout_rate=args.timeout_rate,
+    )
+    report = {}
+
+    with ExitStack() as stack:
+        base_url = None
+        if any(provider.endswith("-http") for provider in args.providers):
+            base_url = stack.enter_context(
+                serve_stub(
+                    LatencyModel(args.median_latency, tail_probability=args.tail_probability, tail_latency=args.tail_latency),
+                    FaultModel(**fault_options),
+                    timeout_latency=args.timeout * 2,
+                )
+            )
+
+        # None keeps the SDK default pool, the pool wait is only measured with a transport
+        transport_options = {}
+        if args.max_connections:
+            transport_options["transport"] = HttpTransport(max_connections=args.max_connections)
+
+        def make_llm(provider: str):
+            match provider:
+                case "fake":
+                    return FakeLLM(
+                        median_latency=args.median_latency,
+                        tail_probability=args.tail_probability,
+                        tail_latency=args.tail_latency,
+                        **fault_options,
+                        **retry_options,
+                    )
+                case "anthropic-http":
+                    return StubAnthropic(base_url=base_url, **retry_options, **transport_options)
+                case "openai-http":
+                    return StubOpenAI(base_url=base_url, **retry_options, **transport_options)
+
+        for mode in args.modes:
+            options = get_mode_options(mode, args.concurrency, args.workers)
+
+            overhead = await measure(
+                FakeLLM(median_latency=0, tail_probability=0), data, options
+            )
+            report[f"overhead/{mode}"] = dict(
+                overhead,
+                overhead_us_per_row=round(overhead["seconds"] / args.rows * 1e6, 1),
+            )
+
+            for provider in args.providers:
+                report[f"{provider}/{mode}"] = await measure(make_llm(provider), data, options)
+
+    return report
+
+
+def print_report(report: dict) -> None:
+    columns = ["rows_per_second", "latency_p50_ms", "latency_p99_ms", "success_rate", "attempts_mean", "pool_wait_p99_ms", "overhead_us_per_row"]
+    print(f"{'benchmark':<24}" + "".join(f"{column:>22}" for column in columns))
+    for name, values in report.items():
+        print(f"{name:<24}" + "".join(f"{str(values.get(column, '')):>22}" for column in columns))
+
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list[str]:
+    """Return the benchmarks that got slower than the baseline by more than `tolerance`."""
+    regressions = []
+    for name, values in report.items():
+        if name not in baseline:
+            continue
+        previous = baseline[name]
+        if values["rows_per_second"] < previous["rows_per_second"] * (1 - tolerance):
+            regressions.append(
+                f"{name}: {values['rows_per_second']} rows/s vs {previous['rows_per_second']} baseline"
+            )
+        if "overhead_us_per_row" in values and values["overhead_us_per_row"] > previous[
+            "overhead_us_per_row"
+        ] * (1 + tolerance):
+            regressions.append(
+                f"{name}: {values['overhead_us_per_row']} us/row vs {previous['overhead_us_per_row']} baseline"
+            )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=["batch", "window"])
+    parser.add_argument("--providers", nargs="+", choices=PROVIDERS, default=list(PROVIDERS))
+    parser.add_argument("--median-latency", type=float, default=0.05)
+    parser.add_argument("--tail-probability", type=float, default=0.02)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--server-error-rate", type=float, default=0.0)
+    parser.add_argument("--timeout-rate", type=float, default=0.0)
+    parser.add_argument("--timeout", type=float, default=2.0, help="client request timeout")
+    parser.add_argument("--max-connections", type=int, help="HTTP pool size of the -http providers")
+    parser.add_argument("--min-wait", type=float, default=0.05)
+    parser.add_argument("--max-wait", type=float, default=1.0)
+    parser.add_argument("--json", help="write the report to this file")
+    parser.add_argument("--baseline", help="fail when slower than this report")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    report = asyncio.run(run(args))
+    print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
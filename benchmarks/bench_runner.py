@@ -0,0 +1,67 @@
+"""Compare a fresh event loop per synchronous call with the shared background loop.
+
+Many small `generate_from_dataframe` calls against the local HTTP stand-in: with a fresh loop per
+call the SDK's connection pool is rebuilt every time, the background loop keeps it warm.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_runner --calls 50 --rows 4
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import pandas as pd
+from datafarmer.llm.runner import get_runner
+from datafarmer.utils import logger
+from benchmarks.fake_provider import LatencyModel
+from benchmarks.http_stub import StubAnthropic, serve_stub
+
+
+def run_fresh_loops(base_url: str, data: pd.DataFrame, calls: int) -> float:
+    """The old behaviour: a new loop, and so a new client and connection pool, for every call."""
+    started_at = time.perf_counter()
+    for _ in range(calls):
+        llm = StubAnthropic(base_url=base_url)
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(llm.generate_async_from_dataframe(data))
+        loop.run_until_complete(llm.client.close())
+        loop.close()
+    return time.perf_counter() - started_at
+
+
+def run_shared_loop(base_url: str, data: pd.DataFrame, calls: int) -> float:
+    started_at = time.perf_counter()
+    llm = StubAnthropic(base_url=base_url)
+    for _ in range(calls):
+        llm.generate_from_dataframe(data)
+    return time.perf_counter() - started_at
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--rows", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.005)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    data = pd.DataFrame({"id": range(args.rows), "prompt": [f"prompt {i}" for i in range(args.rows)]})
+
+    latency = LatencyModel(median_latency=args.latency, tail_probability=0)
+    with serve_stub(latency) as base_url:
+        for mode, run in {"fresh": run_fresh_loops, "shared": run_shared_loop}.items():
+            elapsed = run(base_url, data, args.calls)
+            print(f"{mode:>6}: {args.calls} calls in {elapsed:.2f}s -> {elapsed / args.calls * 1000:.1f} ms/call")
+
+    stats = get_runner().stats()
+    print(
+        f"runner: started in {stats['startup_ms']:.1f} ms, "
+        f"mean setup {stats['mean_setup_ms']:.3f} ms over {stats['calls']} calls"
+    )
+    get_runner().shutdown()
+
+
+if __name__ == "__main__":
+    main()
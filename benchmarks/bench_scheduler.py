@@ -0,0 +1,50 @@
+"""Compare the batch loop with the sliding window scheduler on a long-tailed fake provider.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_scheduler --rows 1200 --concurrency 120
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+import pandas as pd
+from datafarmer.utils import logger
+from benchmarks.fake_provider import FakeLLM
+
+
+async def run(rows: int, concurrency: int, tail_probability: float, tail_latency: float):
+    data = pd.DataFrame(
+        {"id": range(rows), "prompt": [f"prompt {i}" for i in range(rows)]}
+    )
+
+    modes = {
+        "batch": dict(batch_size=concurrency),
+        "window": dict(max_concurrency=concurrency),
+    }
+    for mode, options in modes.items():
+        llm = FakeLLM(tail_probability=tail_probability, tail_latency=tail_latency)
+        started_at = time.perf_counter()
+        result = await llm.generate_async_from_dataframe(data, **options)
+        elapsed = time.perf_counter() - started_at
+        print(
+            f"{mode:>6}: {len(result)} rows in {elapsed:.2f}s "
+            f"-> {len(result) / elapsed:.1f} rows/s"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1200)
+    parser.add_argument("--concurrency", type=int, default=120)
+    parser.add_argument("--tail-probability", type=float, default=0.02)
+    parser.add_argument("--tail-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    logger.setLevel(logging.WARNING)
+    asyncio.run(run(args.rows, args.concurrency, args.tail_probability, args.tail_latency))
+
+
+if __name__ == "__main__":
+    main()
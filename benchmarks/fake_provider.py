@@ -0,0 +1,125 @@
+import asyncio
+import random
+from typing import Optional
+from datafarmer.llm.base import BaseLLM
+
+
+class LatencyModel:
+    """Long-tailed latency distribution shared by the fake provider and the HTTP stand-in.
+
+    Most requests take a log-normal latency around `median_latency`, while a fraction
+    `tail_probability` take `tail_latency` (e.g. a request stuck behind a slow replica).
+    """
+
+    def __init__(
+        self,
+        median_latency: float = 0.05,
+        sigma: float = 0.5,
+        tail_probability: float = 0.02,
+        tail_latency: float = 1.0,
+        seed: Optional[int] = 42,
+    ):
+        self.median_latency = median_latency
+        self.sigma = sigma
+        self.tail_probability = tail_probability
+        self.tail_latency = tail_latency
+        self.random = random.Random(seed)
+
+    def sample(self) -> float:
+        if self.random.random() < self.tail_probability:
+            return self.tail_latency
+        if self.median_latency == 0:
+            return 0.0
+        return self.median_latency * self.random.lognormvariate(0, self.sigma)
+
+
+class FaultModel:
+    """Injects 429, 5xx and timeout failures at the given rates."""
+
+    def __init__(
+        self,
+        rate_limit_rate: float = 0.0,
+        server_error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        seed: Optional[int] = 7,
+    ):
+        assert rate_limit_rate + server_error_rate + timeout_rate <= 1, (
+            "fault rates should sum to at most 1"
+        )
+        self.rate_limit_rate = rate_limit_rate
+        self.server_error_rate = server_error_rate
+        self.timeout_rate = timeout_rate
+        self.random = random.Random(seed)
+
+    def sample(self) -> Optional[str]:
+        """Return "rate_limit", "server_error", "timeout" or None for a healthy response."""
+        draw = self.random.random()
+        for fault, rate in (
+            ("rate_limit", self.rate_limit_rate),
+            ("server_error", self.server_error_rate),
+            ("timeout", self.timeout_rate),
+        ):
+            if draw < rate:
+                return fault
+            draw -= rate
+        return None
+
+
+class FakeAPIError(Exception):
+    """Provider error with an HTTP status code, classified like the real SDK errors."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"fake provider returned HTTP {status_code}")
+        self.status_code = status_code
+
+
+class FakeLLM(BaseLLM):
+    """Offline stand-in for a provider with a long-tailed latency distribution and injected faults.
+
+    Timeouts sleep for `request_timeout` and then raise `TimeoutError`, like a client timeout.
+    """
+
+    def __init__(
+        self,
+        median_latency: float = 0.05,
+        tail_probability: float = 0.02,
+        tail_latency: float = 1.0,
+        seed: Optional[int] = 42,
+        rate_limit_rate: float = 0.0,
+        server_error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.latency = LatencyModel(
+            median_latency=median_latency,
+            tail_probability=tail_probability,
+            tail_latency=tail_latency,
+            seed=seed,
+        )
+        self.faults = FaultModel(
+            rate_limit_rate=rate_limit_rate,
+            server_error_rate=server_error_rate,
+            timeout_rate=timeout_rate,
+            seed=seed,
+        )
+
+    def sample_latency(self) -> float:
+        return self.latency.sample()
+
+    async def _generate_single(
+        self, id: str, prompt: str, **kwargs
+    ) -> tuple[str, str, bool]:
+        fault = self.faults.sample()
+        if fault == "timeout":
+            await asyncio.sleep(self.request_timeout)
+            raise TimeoutError("fake provider timed out")
+
+        latency = self.sample_latency()
+        if latency:
+            await asyncio.sleep(latency)
+        if fault == "rate_limit":
+            raise FakeAPIError(429)
+        if fault == "server_error":
+            raise FakeAPIError(503)
+        return id, f"echo: {prompt}", True
@@ -0,0 +1,164 @@
+"""Local HTTP stand-in that speaks the OpenAI chat completions and Anthropic Messages wire formats.
+
+It lets the benchmarks drive the real provider SDKs (request building, connection pool, response
+parsing) without a network or an API key:
+
+    with serve_stub(LatencyModel(median_latency=0.05), FaultModel(rate_limit_rate=0.01)) as base_url:
+        llm = StubAnthropic(base_url=base_url)
+        llm.generate_from_dataframe(data)
+"""
+
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, Optional
+import json
+import threading
+import time
+import uuid
+from benchmarks.fake_provider import FaultModel, LatencyModel
+from datafarmer.llm import Anthropic, GithubCopilot
+
+
+class _StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # the default backlog of 5 drops connections at benchmark concurrency
+    request_queue_size = 1024
+
+    def __init__(self, latency: LatencyModel, faults: FaultModel, timeout_latency: float):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.latency = latency
+        self.faults = faults
+        self.timeout_latency = timeout_latency
+        self.lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # clients hang up on injected timeouts, that is expected
+        pass
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict, headers: Optional[dict] = None) -> None:
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_POST(self):
+        request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        with self.server.lock:
+            fault = self.server.faults.sample()
+            latency = self.server.latency.sample()
+
+        if fault == "timeout":
+            time.sleep(self.server.timeout_latency)
+        elif latency:
+            time.sleep(latency)
+
+        is_anthropic = self.path.endswith("/messages")
+        if fault == "rate_limit":
+            return self._send_json(429, self._error(is_anthropic, "rate_limit_error"), {"Retry-After": "1"})
+        if fault == "server_error":
+            return self._send_json(503, self._error(is_anthropic, "overloaded_error"))
+
+        prompt = request["messages"][-1]["content"]
+        text = f"echo: {prompt}"
+        if is_anthropic:
+            body = {
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "model": request.get("model"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": len(prompt) // 4 + 1, "output_tokens": len(text) // 4 + 1},
+            }
+        else:
+            body = {
+                "id": f"chatcmpl-{uuid.uuid4().hex}",
+                "object": "chat.completion",
+                "created": int(time.time()),
+                "model": request.get("model"),
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": text},
+                        "finish_reason": "stop",
+                    }
+                ],
+                "usage": {
+                    "prompt_tokens": len(prompt) // 4 + 1,
+                    "completion_tokens": len(text) // 4 + 1,
+                    "total_tokens": (len(prompt) + len(text)) // 4 + 2,
+                },
+            }
+        self._send_json(200, body)
+
+    @staticmethod
+    def _error(is_anthropic: bool, error_type: str) -> dict:
+        if is_anthropic:
+            return {"type": "error", "error": {"type": error_type, "message": error_type}}
+        return {"error": {"type": error_type, "message": error_type, "code": error_type}}
+
+
+@contextmanager
+def serve_stub(
+    latency: Optional[LatencyModel] = None,
+    faults: Optional[FaultModel] = None,
+    timeout_latency: float = 60.0,
+) -> Iterator[str]:
+    """Serve the stand-in on a free local port in a background thread and yield its base URL.
+
+    Args:
+        latency (Optional[LatencyModel], optional): response latency. Defaults to LatencyModel().
+        faults (Optional[FaultModel], optional): injected 429/503/timeouts. Defaults to no faults.
+        timeout_latency (float, optional): seconds an injected timeout hangs before answering,
+            set it above the client `request_timeout`. Defaults to 60.0.
+    """
+    server = _StubServer(latency or LatencyModel(), faults or FaultModel(), timeout_latency)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class StubAnthropic(Anthropic):
+    """`Anthropic` pointed at the stand-in, SDK retries are off so the engine does the retrying."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(api_key="stub", **kwargs)
+        import anthropic as anthropic_sdk
+
+        self.client = anthropic_sdk.AsyncAnthropic(
+            base_url=base_url,
+            api_key="stub",
+            max_retries=0,
+            http_client=self.client._client if self.transport is not None else None,
+        )
+
+
+class StubOpenAI(GithubCopilot):
+    """OpenAI-compatible `GithubCopilot` pointed at the stand-in."""
+
+    def __init__(self, base_url: str, **kwargs):
+        super().__init__(github_token="stub", **kwargs)
+        import openai
+
+        self.client = openai.AsyncOpenAI(
+            base_url=f"{base_url}/v1",
+            api_key="stub",
+            max_retries=0,
+            http_client=self.client._client if self.transport is not None else None,
+        )
@@ -1,11 +1,35 @@
 from .gemini import Gemini
 from .anthropic import Anthropic
 from .github_copilot import GithubCopilot
+from .router import RouterLLM
 from .vertex_rag import VertexRag
+from .vector_index import VectorIndex
+from .rate_limit import RateLimiter
+from .retry import RetryPolicy
+from .cache import ResponseCache
+from .journal import Journal
+from .metrics import InMemoryMetrics, Metrics
+from .structured import ResponseSchema, StructuredOutputError
+from .streaming import StreamOptions
+from .runner import LoopRunner
+from .transport import HttpTransport
 
 __all__ = [
     "Gemini",
     "Anthropic",
     "GithubCopilot",
+    "RouterLLM",
     "VertexRag",
+    "VectorIndex",
+    "RateLimiter",
+    "RetryPolicy",
+    "ResponseCache",
+    "Journal",
+    "Metrics",
+    "InMemoryMetrics",
+    "ResponseSchema",
+    "StructuredOutputError",
+    "StreamOptions",
+    "LoopRunner",
+    "HttpTransport",
 ]
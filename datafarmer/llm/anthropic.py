@@ -1,8 +1,17 @@
-from typing import Optional
+from typing import AsyncIterator, Optional
+import time
 from datafarmer.llm.base import BaseLLM
+from datafarmer.llm.batch import BatchBackend
+from datafarmer.llm.cache import ResponseCache
+from datafarmer.llm.metrics import Metrics
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy
+from datafarmer.llm.transport import HttpTransport
 
 
 class Anthropic(BaseLLM):
+    _supports_streaming = True
+
     def __init__(
         self,
         model: str = "claude-sonnet-4-6",
@@ -13,6 +22,12 @@ class Anthropic(BaseLLM):
         max_wait: int = 30,
         max_attempts: int = 3,
         request_timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[Metrics] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+        prompt_caching: bool = False,
+        transport: Optional[HttpTransport] = None,
     ):
         """Initialize the Anthropic class.
 
@@ -25,8 +40,33 @@ class Anthropic(BaseLLM):
             max_wait (int, optional): maximum seconds between retries. Defaults to 30.
             max_attempts (int, optional): maximum number of retry attempts. Defaults to 3.
             request_timeout (int, optional): per-request timeout in seconds. Defaults to 30.
+            rate_limiter (Optional[RateLimiter], optional): client-side RPM/TPM limiter consulted before
+                every request. Share one instance across LLMs that use the same quota. Defaults to None.
+            cache (Optional[ResponseCache], optional): persistent response cache, hits skip the API call
+                entirely. Defaults to None.
+            metrics (Optional[Metrics], optional): metrics hooks, defaults to an `InMemoryMetrics`
+                readable through `.metrics`. Defaults to None.
+            retry_policies (Optional[dict[str, RetryPolicy]], optional): backoff per error class
+                ("rate_limit", "server_error", "timeout", "connection", "parse_error", "other"),
+                classes without a policy use `min_wait` / `max_wait`. Defaults to None.
+            prompt_caching (bool, optional): mark the system instruction as a cacheable prefix
+                (``cache_control``), so rows after the first read it from the provider cache
+                instead of processing it again. Cache reads and writes are reported to `metrics`.
+                Defaults to False.
+            transport (Optional[HttpTransport], optional): connection pool settings (size,
+                keep-alive, HTTP/2, connect and pool timeouts), one instance can be shared by
+                several LLMs so they share one pool. Defaults to None (the SDK default pool).
         """
-        super().__init__(min_wait=min_wait, max_wait=max_wait, max_attempts=max_attempts, request_timeout=request_timeout)
+        super().__init__(
+            min_wait=min_wait,
+            max_wait=max_wait,
+            max_attempts=max_attempts,
+            request_timeout=request_timeout,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            metrics=metrics,
+            retry_policies=retry_policies,
+        )
 
         try:
             import anthropic as anthropic_sdk
@@ -38,7 +78,45 @@ class Anthropic(BaseLLM):
         self.model = model
         self.system_instruction = system_instruction
         self.max_tokens = max_tokens
-        self.client = anthropic_sdk.AsyncAnthropic(api_key=api_key)
+        self.prompt_caching = prompt_caching
+        self.transport = transport
+        self.timeout = request_timeout
+        http_client = None
+        if transport is not None:
+            http_client = transport.get_client(anthropic_sdk.DefaultAsyncHttpxClient, request_timeout)
+            self.timeout = transport.timeout(request_timeout, anthropic_sdk.DefaultAsyncHttpxClient)
+        self.client = anthropic_sdk.AsyncAnthropic(api_key=api_key, http_client=http_client)
+
+    def _get_message_params(self, prompt: str) -> dict:
+        """Return the Messages API parameters for a prompt."""
+        create_kwargs = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": [{"role": "user", "content": prompt}],
+        }
+
+        if self.system_instruction and self.prompt_caching:
+            create_kwargs["system"] = [
+                {
+                    "type": "text",
+                    "text": self.system_instruction,
+                    "cache_control": {"type": "ephemeral"},
+                }
+            ]
+        elif self.system_instruction:
+            create_kwargs["system"] = self.system_instruction
+
+        return create_kwargs
+
+    def _get_batch_backend(self) -> BatchBackend:
+        return AnthropicBatchBackend(self)
+
+    async def _count_tokens(self, prompt: str, **kwargs) -> Optional[int]:
+        """Count the input tokens of a prompt with the Messages count_tokens endpoint."""
+        count_kwargs = self._get_message_params(prompt)
+        count_kwargs.pop("max_tokens")
+        response = await self.client.messages.count_tokens(**count_kwargs)
+        return response.input_tokens
 
     async def _generate_single(
         self, id: str, prompt: str, **kwargs
@@ -48,19 +126,76 @@ class Anthropic(BaseLLM):
         Args:
             id (str): identifier for this prompt
             prompt (str): the prompt text
-            **kwargs: unused, kept for interface compatibility
+            **kwargs: supports stream (a `StreamOptions`)
 
         Returns:
             tuple[str, str, bool]: (id, response_text, is_succeeded)
         """
-        create_kwargs = {
-            "model": self.model,
-            "max_tokens": self.max_tokens,
-            "messages": [{"role": "user", "content": prompt}],
-        }
+        create_kwargs = self._get_message_params(prompt)
+        stream = kwargs.get("stream")
+        started_at = time.perf_counter()
+        response = await self.client.messages.create(
+            **create_kwargs,
+            timeout=self.timeout,
+            **({"stream": True} if stream is not None else {}),
+        )
 
-        if self.system_instruction:
-            create_kwargs["system"] = self.system_instruction
+        if stream is not None:
+            usage = None
+
+            async def chunks():
+                nonlocal usage
+                try:
+                    async for event in response:
+                        if event.type == "message_start":
+                            usage = event.message.usage
+                        elif event.type == "content_block_delta" and event.delta.type == "text_delta":
+                            yield event.delta.text
+                finally:
+                    # stops the generation when a stop condition cut the stream short
+                    await response.close()
+
+            text = await stream.collect(chunks(), self.model, self.metrics, started_at)
+        else:
+            usage = getattr(response, "usage", None)
+            text = response.content[0].text
+
+        if self.prompt_caching and usage is not None:
+            self.metrics.on_prompt_cache(
+                self.model,
+                read_tokens=usage.cache_read_input_tokens or 0,
+                write_tokens=usage.cache_creation_input_tokens or 0,
+                uncached_tokens=usage.input_tokens or 0,
+            )
+        return id, text, True
+
+
+class AnthropicBatchBackend(BatchBackend):
+    """Message Batches API backend, a job holds up to 100,000 requests."""
+
+    max_batch_size = 100_000
+    poll_interval = 60.0
+
+    def __init__(self, llm: Anthropic):
+        self.llm = llm
+
+    async def submit(self, requests: list[tuple[str, dict]]) -> str:
+        batch = await self.llm.client.messages.batches.create(
+            requests=[
+                {"custom_id": f"row-{position}", "params": self.llm._get_message_params(prompt)}
+                for position, (prompt, _) in enumerate(requests)
+            ]
+        )
+        return batch.id
+
+    async def poll(self, job_id: str) -> str:
+        batch = await self.llm.client.messages.batches.retrieve(job_id)
+        return "succeeded" if batch.processing_status == "ended" else "running"
 
-        response = await self.client.messages.create(**create_kwargs, timeout=self.request_timeout)
-        return id, response.content[0].text, True
+    async def results(self, job_id: str) -> AsyncIterator[tuple[int, str, bool]]:
+        async for item in await self.llm.client.messages.batches.results(job_id):
+            position = int(item.custom_id.removeprefix("row-"))
+            if item.result.type == "succeeded":
+                yield position, item.result.message.content[0].text, True
+            else:
+                yield position, f"Error: batch request {item.result.type}", False
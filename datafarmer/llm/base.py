@@ -1,18 +1,54 @@
 from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from itertools import chain
+from typing import Any, AsyncIterator, Iterable, Iterator, NamedTuple, Optional
 import asyncio
+import copy
+import logging
+import math
+import multiprocessing
+import time
+import numpy as np
 import pandas as pd
-from tenacity import AsyncRetrying, retry_if_exception, wait_exponential, stop_after_attempt
+import polars as pl
+from tenacity import AsyncRetrying, RetryCallState, RetryError, retry_if_exception
 from tqdm.asyncio import tqdm
+from datafarmer.llm.batch import BatchBackend
+from datafarmer.llm.cache import ResponseCache, make_cache_key
+from datafarmer.llm.embedding import EmbeddingMatrix, get_embedding_batches
+from datafarmer.llm.journal import Journal
+from datafarmer.llm.metrics import InMemoryMetrics, Metrics
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy, get_retry_after
+from datafarmer.llm.runner import get_runner
+from datafarmer.llm.streaming import StreamOptions
+from datafarmer.llm.structured import ResponseSchema, StructuredOutputError
+from datafarmer.llm.template import get_template_columns, render_prompt_template
+from datafarmer.llm.transport import current_request
 from datafarmer.utils import logger
 
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+def _get_status_code(exc: BaseException) -> Optional[int]:
+    """Return the HTTP status code of an API error, if any."""
+    # openai, anthropic, httpx all expose status_code on API errors
+    status_code = getattr(exc, "status_code", None)
+    if status_code is None:
+        # google-genai and google-api-core expose it as `code`
+        status_code = getattr(exc, "code", None)
+    return status_code if isinstance(status_code, int) else None
+
 
 def _is_retryable_error(exc: BaseException) -> bool:
     """Return True only for errors that are worth retrying (rate limits, server errors, timeouts)."""
-    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)):
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError, StructuredOutputError)):
         return True
-    # openai, anthropic, httpx all expose status_code on API errors
-    status_code = getattr(exc, "status_code", None)
+    status_code = _get_status_code(exc)
     if status_code is not None:
         return status_code == 429 or status_code >= 500
     # Fallback: match common retryable class names
@@ -20,12 +56,391 @@ def _is_retryable_error(exc: BaseException) -> bool:
     return any(p in name for p in ("Timeout", "Connection", "RateLimit", "ServiceUnavailable", "InternalServer"))
 
 
+def _get_error_category(exc: BaseException) -> str:
+    """Group an error into the classes used by _is_retryable_error, for retry metrics."""
+    if isinstance(exc, StructuredOutputError):
+        return "parse_error"
+    if _is_rate_limit_error(exc):
+        return "rate_limit"
+    if isinstance(exc, (TimeoutError, asyncio.TimeoutError)) or "Timeout" in type(exc).__name__:
+        return "timeout"
+    status_code = _get_status_code(exc)
+    if (status_code is not None and status_code >= 500) or any(
+        p in type(exc).__name__ for p in ("ServiceUnavailable", "InternalServer")
+    ):
+        return "server_error"
+    if "Connection" in type(exc).__name__:
+        return "connection"
+    return "other"
+
+
+def _is_rate_limit_error(exc: BaseException) -> bool:
+    """Return True if the error means the provider quota was exhausted (HTTP 429)."""
+    if _get_status_code(exc) == 429:
+        return True
+    name = type(exc).__name__
+    return any(p in name for p in ("RateLimit", "ResourceExhausted", "TooManyRequests"))
+
+
+RESULT_COLUMNS = ["id", "result", "status", "error_type", "attempts", "latency_ms"]
+
+
+class GenerationResult(NamedTuple):
+    """Outcome of one request, a row of the result dataframe."""
+
+    id: Any
+    result: Optional[str]
+    is_succeeded: bool
+    error_type: Optional[str] = None
+    attempts: int = 0
+    latency_ms: Optional[float] = None
+    # fields of a structured response, see `response_schema`
+    parsed: Optional[dict] = None
+
+    @property
+    def status(self) -> str:
+        return "succeeded" if self.is_succeeded else "failed"
+
+    def to_record(self) -> tuple:
+        return (
+            self.id,
+            self.result,
+            self.status,
+            self.error_type,
+            self.attempts,
+            self.latency_ms,
+        )
+
+    @classmethod
+    def from_record(cls, record: tuple) -> "GenerationResult":
+        id, result, status, error_type, attempts, latency_ms = record
+        # pandas reads missing cells back as NaN
+        result, error_type, latency_ms = (
+            None if pd.isna(value) else value for value in (result, error_type, latency_ms)
+        )
+        return cls(id, result, status == "succeeded", error_type, int(attempts), latency_ms)
+
+
+def _run_sync(coroutine, async_name: str):
+    """Run a coroutine on the shared background event loop, so clients stay warm between calls.
+
+    Works from a thread that already runs a loop (e.g. a notebook), but not from a coroutine on
+    the background loop itself.
+    """
+    runner = get_runner()
+    if runner.in_loop_thread:
+        coroutine.close()
+        logger.error(f"🛑 Use `await {async_name}()` instead")
+        raise RuntimeError("Async event loop is already running")
+
+    return runner.run(coroutine)
+
+
+def _is_arrow_table(data: Any) -> bool:
+    """Return True for a pyarrow Table or RecordBatch."""
+    return pa is not None and isinstance(data, (pa.Table, pa.RecordBatch))
+
+
+def _get_frame_type(data: Any) -> str:
+    """Return the format results are returned in for an input: "pandas", "polars" or "arrow"."""
+    if isinstance(data, (pl.DataFrame, pl.LazyFrame)):
+        return "polars"
+    if _is_arrow_table(data):
+        return "arrow"
+    return "pandas"
+
+
+def _to_result_frame(
+    results: list[GenerationResult],
+    frame_type: str = "pandas",
+    response_schema: Optional[ResponseSchema] = None,
+) -> Any:
+    """Build the result dataframe from generation results, in the format of the input.
+
+    With a `response_schema`, every field of the structured response becomes a typed column
+    (prefixed with "result_" if its name clashes with a result column). Responses that were not
+    parsed yet, e.g. cache hits or journal records, are parsed here.
+    """
+    columns = {}
+    if response_schema is not None:
+        parsed = [
+            r.parsed if r.parsed is not None else response_schema.parse_or_none(r.result)
+            for r in results
+        ]
+        columns = {
+            f"result_{field}" if field in RESULT_COLUMNS else field: column
+            for field, column in response_schema.to_columns(parsed, frame_type).items()
+        }
+
+    if frame_type == "pandas":
+        result = pd.DataFrame([r.to_record() for r in results], columns=RESULT_COLUMNS)
+        result = result.astype({"attempts": "int64", "latency_ms": "float64"})
+        for name, column in columns.items():
+            result[name] = column.array
+        return result
+
+    result = pl.DataFrame(
+        [r.to_record() for r in results],
+        schema=RESULT_COLUMNS,
+        schema_overrides=dict(
+            result=pl.String,
+            status=pl.String,
+            error_type=pl.String,
+            attempts=pl.Int64,
+            latency_ms=pl.Float64,
+        ),
+        orient="row",
+    )
+    if columns:
+        result = result.with_columns(column.alias(name) for name, column in columns.items())
+    return result.to_arrow() if frame_type == "arrow" else result
+
+
+def _iter_result_records(result: Any) -> Iterator[tuple]:
+    """Yield the rows of a result dataframe of any format as tuples."""
+    if isinstance(result, pd.DataFrame):
+        return result[RESULT_COLUMNS].itertuples(index=False, name=None)
+    if _is_arrow_table(result):
+        result = pl.from_arrow(result)
+    return result.select(RESULT_COLUMNS).iter_rows()
+
+
+def _take_results(result: Any, positions: np.ndarray, ids: np.ndarray) -> Any:
+    """Return the rows of a result dataframe of any format at `positions`, with `ids` as ids."""
+    if isinstance(result, pd.DataFrame):
+        result = result.take(positions).reset_index(drop=True)
+        result["id"] = ids
+        return result
+    if _is_arrow_table(result):
+        result = result.take(positions)
+        return result.set_column(result.schema.get_field_index("id"), "id", pa.array(ids))
+    return result[positions].with_columns(pl.Series("id", ids))
+
+
+def _slice_rows(data: pd.DataFrame | pl.DataFrame, start: int, stop: int) -> pd.DataFrame | pl.DataFrame:
+    """Return rows [start, stop) of a pandas or polars dataframe, without copying."""
+    if isinstance(data, pl.DataFrame):
+        return data.slice(start, max(0, stop - start))
+    return data.iloc[start:stop]
+
+
+def _filter_rows(data: pd.DataFrame | pl.DataFrame, mask) -> pd.DataFrame | pl.DataFrame:
+    """Return the rows of a pandas or polars dataframe where the boolean array `mask` is True."""
+    if isinstance(data, pl.DataFrame):
+        return data.filter(pl.Series(mask, dtype=pl.Boolean))
+    return data[mask]
+
+
+def _isin(values: pd.Series | pl.Series, candidates: list):
+    """Boolean numpy array, True where a value of the series is in `candidates`."""
+    if isinstance(values, pl.Series):
+        return values.is_in(candidates).to_numpy()
+    return values.isin(candidates).to_numpy()
+
+
+_worker_llm = None
+_worker_loop = None
+
+
+class _WorkerShardResult(NamedTuple):
+    """Results of one shard and what the worker recorded while generating it."""
+
+    results: list[GenerationResult]
+    metrics: Optional[InMemoryMetrics] = None
+    cache_hits: int = 0
+    cache_misses: int = 0
+    idle_seconds: Optional[dict] = None
+
+
+def _init_worker(llm: "BaseLLM", rate_limiter: Optional[RateLimiter]) -> None:
+    """Set up the provider client and event loop of a worker process, reused for every shard."""
+    global _worker_llm, _worker_loop
+    llm.rate_limiter = rate_limiter
+    _worker_llm = llm
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+    # the parent process logs the progress and the summaries of the whole run
+    logger.setLevel(logging.WARNING)
+
+
+def _run_worker_shard(data: pd.DataFrame | pl.DataFrame, options: dict) -> _WorkerShardResult:
+    """Generate one shard inside a worker process."""
+    # fresh metrics per shard, the parent merges them into its own
+    _worker_llm.metrics = InMemoryMetrics()
+    cache = _worker_llm.cache
+    hits, misses = (cache.hits, cache.misses) if cache is not None else (0, 0)
+    result = _worker_loop.run_until_complete(
+        _worker_llm.generate_async_from_dataframe(data, **options)
+    )
+    return _WorkerShardResult(
+        [GenerationResult.from_record(record) for record in _iter_result_records(result)],
+        _worker_llm.metrics,
+        cache.hits - hits if cache is not None else 0,
+        cache.misses - misses if cache is not None else 0,
+        _worker_llm.idle_seconds,
+    )
+
+
 class BaseLLM(ABC):
-    def __init__(self, min_wait: int = 2, max_wait: int = 60, max_attempts: int = 3, request_timeout: int = 30):
+    # providers whose _generate_single reads the `stream` kwarg
+    _supports_streaming = False
+    # embedding defaults of providers that implement _embed_batch: model, texts and estimated
+    # tokens per request
+    _embedding_model: Optional[str] = None
+    _embed_batch_size = 100
+    _embed_batch_tokens: Optional[int] = None
+    # attributes that are pickled with the constructor arguments, see __reduce__
+    _runtime_attributes = ("min_wait", "max_wait", "max_attempts", "request_timeout", "retry_policies")
+
+    def __new__(cls, *args, **kwargs):
+        # keep the constructor arguments, so worker processes can rebuild the instance
+        # (and its provider client) instead of pickling live clients
+        instance = super().__new__(cls)
+        instance._init_args = (args, kwargs)
+        return instance
+
+    def __reduce__(self):
+        # the retry settings can be changed after init (e.g. by redrive), they are restored on
+        # top of the rebuilt instance
+        args, kwargs = self._init_args
+        state = {
+            name: self.__dict__[name] for name in self._runtime_attributes if name in self.__dict__
+        }
+        return (partial(type(self), *args, **kwargs), (), state)
+
+    def __copy__(self):
+        # a plain shallow copy that shares the provider client, unlike pickling
+        clone = object.__new__(type(self))
+        clone.__dict__.update(self.__dict__)
+        return clone
+
+    def __init__(
+        self,
+        min_wait: int = 2,
+        max_wait: int = 60,
+        max_attempts: int = 3,
+        request_timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[Metrics] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+    ):
         self.min_wait = min_wait
         self.max_wait = max_wait
         self.max_attempts = max_attempts
         self.request_timeout = request_timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.metrics = metrics if metrics is not None else InMemoryMetrics()
+        self.retry_policies = retry_policies or {}
+        self.idle_seconds = dict(retry_backoff=0.0, rate_limiter=0.0)
+        self._default_retry_policy = RetryPolicy(min_wait, max_wait)
+
+    def _get_retry_policy(self, category: str) -> RetryPolicy:
+        """Return the retry policy of an error category, see _get_error_category."""
+        policy = self.retry_policies.get(category)
+        if policy is not None:
+            return policy
+
+        default = self._default_retry_policy
+        if (default.min_wait, default.max_wait) != (self.min_wait, self.max_wait):
+            # min_wait / max_wait were changed after init, e.g. by redrive
+            default = self._default_retry_policy = RetryPolicy(self.min_wait, self.max_wait)
+        return default
+
+    def _get_retry_wait(self, retry_state: RetryCallState) -> float:
+        """Tenacity wait: the provider suggested delay, otherwise the backoff of the error class."""
+        exc = retry_state.outcome.exception()
+        policy = self._get_retry_policy(_get_error_category(exc))
+        return policy.get_wait(retry_state.attempt_number, get_retry_after(exc))
+
+    def _should_stop_retrying(self, retry_state: RetryCallState) -> bool:
+        """Tenacity stop: the max attempts of the error class, or of the LLM."""
+        exc = retry_state.outcome.exception()
+        max_attempts = self.max_attempts
+        if exc is not None:
+            max_attempts = self._get_retry_policy(_get_error_category(exc)).max_attempts or max_attempts
+        return retry_state.attempt_number >= max_attempts
+
+    def _get_model_name(self, **kwargs) -> str:
+        """Return the model a request is sent to, used to key rate limits."""
+        return getattr(self, "model", type(self).__name__)
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        """Cheap input token estimate (about 4 characters per token)."""
+        return len(text) // 4 + 1
+
+    @staticmethod
+    def _estimate_prompt_tokens(
+        data: pd.DataFrame | pl.DataFrame, prompt_template: Optional[str] = None
+    ) -> pd.Series | pl.Series:
+        """Column-wise version of _estimate_tokens for every row of a dataframe."""
+        if isinstance(data, pl.DataFrame):
+            prompts = (
+                render_prompt_template(data, prompt_template)
+                if prompt_template is not None
+                else data["prompt"].cast(pl.String)
+            )
+            return (prompts.str.len_chars() // 4 + 1).cast(pl.Int64)
+
+        prompts = (
+            render_prompt_template(data, prompt_template)
+            if prompt_template is not None
+            else data["prompt"].astype(str)
+        )
+        return (prompts.str.len() // 4 + 1).astype("int64")
+
+    async def _count_tokens(self, prompt: str, **kwargs) -> Optional[int]:
+        """Count the input tokens of a prompt with the provider endpoint.
+
+        Returns:
+            Optional[int]: token count, None when the provider has no count endpoint
+        """
+        return None
+
+    async def _call_generate_single(
+        self, id: str, prompt: str, **kwargs
+    ) -> tuple[str, str, bool]:
+        """Call _generate_single once, going through the rate limiter when one is set."""
+        model = self._get_model_name(**kwargs)
+        input_tokens = self._estimate_tokens(prompt)
+        if self.rate_limiter is not None:
+            wait = await self.rate_limiter.acquire(model, tokens=input_tokens)
+            self.metrics.on_limiter_wait(model, wait)
+            self.idle_seconds["rate_limiter"] += wait
+
+        self.metrics.on_request_start(model)
+        # lets a shared HttpTransport report pool waits to the metrics of this LLM
+        token = current_request.set((self.metrics, model))
+        sent_at = time.monotonic()
+        started_at = time.perf_counter()
+        try:
+            result = await self._generate_single(id, prompt, **kwargs)
+        except BaseException as e:
+            # cancelled calls (e.g. the loser of a hedged request) still leave the in-flight count
+            self.metrics.on_request_end(
+                model,
+                "cancelled" if isinstance(e, asyncio.CancelledError) else "failed",
+                time.perf_counter() - started_at,
+                input_tokens,
+            )
+            if self.rate_limiter is not None and _is_rate_limit_error(e):
+                self.rate_limiter.on_rate_limited(model, sent_at)
+            raise
+        finally:
+            current_request.reset(token)
+
+        self.metrics.on_request_end(
+            model,
+            "succeeded" if result[2] else "failed",
+            time.perf_counter() - started_at,
+            input_tokens,
+            self._estimate_tokens(result[1]) if result[2] else 0,
+        )
+        if self.rate_limiter is not None:
+            self.rate_limiter.on_success(model)
+        return result
 
     @abstractmethod
     async def _generate_single(self, id: str, prompt: str, **kwargs) -> tuple[str, str, bool]:
@@ -43,7 +458,7 @@ class BaseLLM(ABC):
 
     async def _get_async_generation_response(
         self, id: str, prompt: str, **kwargs
-    ) -> tuple[str, str, bool]:
+    ) -> GenerationResult:
         """Wrap _generate_single with retry logic.
 
         Args:
@@ -52,130 +467,1302 @@ class BaseLLM(ABC):
             **kwargs: passed through to _generate_single
 
         Returns:
-            tuple[str, str, bool]: (id, response_text, is_succeeded)
+            GenerationResult: the response with its status, error type, attempts and latency
         """
         assert prompt is not None and len(prompt) > 0, "Prompt cannot be empty."
 
+        started_at = time.perf_counter()
+        attempts = 0
+        parsed = None
+        model = self._get_model_name(**kwargs)
+        response_schema = kwargs.get("response_schema")
+
+        def record_retry(retry_state: RetryCallState) -> None:
+            wait = retry_state.next_action.sleep
+            self.idle_seconds["retry_backoff"] += wait
+            self.metrics.on_retry(
+                model, _get_error_category(retry_state.outcome.exception()), wait
+            )
+
         try:
             async for attempt in AsyncRetrying(
-                wait=wait_exponential(multiplier=1, min=self.min_wait, max=self.max_wait),
-                stop=stop_after_attempt(self.max_attempts),
+                wait=self._get_retry_wait,
+                stop=self._should_stop_retrying,
                 retry=retry_if_exception(_is_retryable_error),
+                before_sleep=record_retry,
             ):
                 with attempt:
-                    return await self._generate_single(id, prompt, **kwargs)
+                    attempts = attempt.retry_state.attempt_number
+                    try:
+                        id, response, is_succeeded = await self._call_generate_single(
+                            id, prompt, **kwargs
+                        )
+                        if is_succeeded and response_schema is not None:
+                            parsed = response_schema.parse(response)
+                    except StructuredOutputError:
+                        self.metrics.on_parse_error(model)
+                        raise
         except Exception as e:
+            if isinstance(e, RetryError):
+                e = e.last_attempt.exception()
             logger.warning(f"🚧 All retries failed for id {id}: {str(e)}")
-            return id, f"Error: {str(e)}", False
+            return GenerationResult(
+                id,
+                None,
+                False,
+                type(e).__name__,
+                attempts,
+                (time.perf_counter() - started_at) * 1000,
+            )
+
+        return GenerationResult(
+            id,
+            response if is_succeeded else None,
+            is_succeeded,
+            None if is_succeeded else "UnsuccessfulResponse",
+            attempts,
+            (time.perf_counter() - started_at) * 1000,
+            parsed,
+        )
+
+    def _get_cache_key(self, prompt: str, **kwargs) -> str:
+        """Return the response cache key for a request.
+
+        The key covers the provider class, the model, the system instruction, the generation
+        config and the prompt, plus any other per-request kwargs.
+        """
+        generation_config = kwargs.pop(
+            "generation_config", None
+        ) or getattr(self, "generation_config", None)
+        return make_cache_key(
+            provider=f"{type(self).__module__}.{type(self).__qualname__}",
+            model=self._get_model_name(**kwargs),
+            system_instruction=getattr(self, "system_instruction", None),
+            generation_config=generation_config,
+            max_tokens=getattr(self, "max_tokens", None),
+            prompt=prompt,
+            kwargs=kwargs,
+        )
+
+    async def _get_response(self, id: str, prompt: str, **kwargs) -> GenerationResult:
+        """Return a response from the cache when possible, otherwise generate it with retries.
+
+        Args:
+            id (str): identifier for this prompt
+            prompt (str): the prompt text
+            **kwargs: passed through to _generate_single
+
+        Returns:
+            GenerationResult: the response, cache hits have 0 attempts
+        """
+        if self.cache is None:
+            return await self._get_async_generation_response(id, prompt, **kwargs)
+
+        key = self._get_cache_key(prompt, **kwargs)
+        cached_response = await self.cache.get_async(key)
+        self.metrics.on_cache(cached_response is not None)
+        if cached_response is not None:
+            return GenerationResult(id, cached_response, True, None, 0, 0.0)
+
+        result = await self._get_async_generation_response(id, prompt, **kwargs)
+        if result.is_succeeded:
+            await self.cache.set_async(key, result.result)
+        return result
+
+    async def _get_guarded_response(self, id: str, prompt: str, **kwargs) -> GenerationResult:
+        """Like _get_response, but unexpected errors become a failed result instead of raising."""
+        try:
+            result = await self._get_response(id=id, prompt=prompt, **kwargs)
+        except Exception as e:
+            logger.error(f"🛑 Error while generating: {str(e)}")
+            result = GenerationResult(id, None, False, type(e).__name__)
+
+        self._record_result(result)
+        return result
+
+    def _record_result(self, result: GenerationResult) -> None:
+        """Report a finished row to the metrics."""
+        self.metrics.on_result(result.status, result.attempts, result.latency_ms)
 
     async def _run_async_generation(
-        self, data: pd.DataFrame, **kwargs
-    ) -> list[tuple[str, str]]:
+        self, data: pd.DataFrame | pl.DataFrame, journal: Optional[Journal] = None, **kwargs
+    ) -> list[GenerationResult]:
         """Run async generation over a dataframe batch.
 
         Args:
-            data (pd.DataFrame): dataframe with 'id' and 'prompt' columns
+            data (pd.DataFrame | pl.DataFrame): dataframe with 'id' and 'prompt' columns
+            journal (Optional[Journal], optional): journal that records every success. Defaults to None.
             **kwargs: extra kwargs passed to _generate_single
 
         Returns:
-            list[tuple[str, str]]: list of (id, result) pairs for successful generations
+            list[GenerationResult]: one result per row, failed rows included
         """
         tasks = [
-            self._get_async_generation_response(
-                id=row.id,
-                prompt=row.prompt,
-                **{
-                    col: getattr(row, col)
-                    for col in data.columns
-                    if col not in ["id", "prompt"]
-                },
-                **kwargs,
-            )
-            for row in data.itertuples()
+            self._get_guarded_response(id=id, prompt=prompt, **row_kwargs)
+            for id, prompt, row_kwargs in self._iter_requests(data, **kwargs)
         ]
         results = []
 
-        with tqdm(total=len(tasks), desc="Generating", unit="Item") as pbar:
+        with tqdm(
+            total=len(tasks), desc="Generating", unit="Item", disable=_worker_llm is not None
+        ) as pbar:
             for completed_task in asyncio.as_completed(tasks):
+                result = await completed_task
+                results.append(result)
+                if result.is_succeeded and journal is not None:
+                    journal.append(result.id, result.result)
+                pbar.update(1)
+
+        return results
+
+    @staticmethod
+    def _iter_requests(
+        data: pd.DataFrame | pl.DataFrame,
+        prompt_template: Optional[str] = None,
+        render_chunk_size: int = 10_000,
+        **kwargs,
+    ) -> Iterator[tuple[str, str, dict]]:
+        """Yield (id, prompt, kwargs) for every row, extra columns become per-row kwargs.
+
+        Polars dataframes are read column by column, a chunk at a time, without a pandas copy.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame): dataframe with an 'id' column and a 'prompt'
+                column (or the columns used by `prompt_template`)
+            prompt_template (Optional[str], optional): template rendered from the columns, it is
+                rendered lazily `render_chunk_size` rows at a time. Defaults to None.
+            render_chunk_size (int, optional): rows rendered at a time. Defaults to 10_000.
+            **kwargs: extra kwargs merged into every row
+
+        Yields:
+            tuple[str, str, dict]: (id, prompt, kwargs for _generate_single)
+        """
+        extra_columns = [col for col in data.columns if col not in ["id", "prompt"]]
+        if isinstance(data, pl.DataFrame):
+            for chunk in data.iter_slices(render_chunk_size):
+                prompts = (
+                    render_prompt_template(chunk, prompt_template)
+                    if prompt_template is not None
+                    else chunk["prompt"]
+                )
+                columns = [chunk[col].to_list() for col in extra_columns]
+                for i, (id, prompt) in enumerate(zip(chunk["id"].to_list(), prompts.to_list())):
+                    row_kwargs = {col: values[i] for col, values in zip(extra_columns, columns)}
+                    row_kwargs.update(kwargs)
+                    yield id, prompt, row_kwargs
+            return
+
+        for start in range(0, len(data), render_chunk_size):
+            chunk = data.iloc[start : start + render_chunk_size]
+            prompts = (
+                render_prompt_template(chunk, prompt_template)
+                if prompt_template is not None
+                else chunk["prompt"]
+            )
+            for row, prompt in zip(chunk.itertuples(), prompts):
+                row_kwargs = {col: getattr(row, col) for col in extra_columns}
+                row_kwargs.update(kwargs)
+                yield row.id, prompt, row_kwargs
+
+    async def _iter_windowed_generation(
+        self,
+        requests: Iterator[tuple[str, str, dict]],
+        max_concurrency: int,
+        queue_waits: Optional[list[float]] = None,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncIterator[GenerationResult]:
+        """Run requests through a sliding window of at most `max_concurrency` in-flight calls.
+
+        A new request is started as soon as any in-flight one finishes, so a slow request
+        only holds its own slot instead of stalling a whole batch. Requests are pulled from
+        the iterator lazily, only when a slot is free.
+
+        Args:
+            requests (Iterator[tuple[str, str, dict]]): (id, prompt, kwargs) triples
+            max_concurrency (int): maximum number of requests in flight
+            queue_waits (Optional[list[float]], optional): if given, the seconds each request
+                waited for a free slot are appended to it. Defaults to None.
+            max_tokens (Optional[int], optional): maximum estimated input tokens in flight, a
+                request larger than the budget runs alone. Defaults to None.
+
+        Yields:
+            GenerationResult: results in completion order
+        """
+        assert max_concurrency > 0, "max_concurrency should be greater than 0"
+
+        assert max_tokens is None or max_tokens > 0, "max_tokens should be greater than 0"
+
+        pending = set()
+        # estimated input tokens of every in-flight task, and their sum
+        task_tokens = {}
+        tokens_in_flight = 0
+
+        try:
+            for id, prompt, row_kwargs in requests:
+                tokens = self._estimate_tokens(prompt) if max_tokens is not None else 0
+                pulled_at = time.perf_counter()
+                while len(pending) >= max_concurrency or (
+                    pending
+                    and max_tokens is not None
+                    and tokens_in_flight + tokens > max_tokens
+                ):
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                    for task in done:
+                        tokens_in_flight -= task_tokens.pop(task, 0)
+                        yield task.result()
+
+                queue_wait = time.perf_counter() - pulled_at
+                self.metrics.on_queue_wait(queue_wait)
+                if queue_waits is not None:
+                    queue_waits.append(queue_wait)
+                task = asyncio.ensure_future(
+                    self._get_guarded_response(id=id, prompt=prompt, **row_kwargs)
+                )
+                pending.add(task)
+                if max_tokens is not None:
+                    task_tokens[task] = tokens
+                    tokens_in_flight += tokens
+
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run_windowed_generation(
+        self,
+        data: pd.DataFrame | pl.DataFrame,
+        max_concurrency: int,
+        journal: Optional[Journal] = None,
+        batch_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> list[GenerationResult]:
+        """Run async generation over the whole dataframe with a sliding concurrency window.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame): dataframe with 'id' and 'prompt' columns
+            max_concurrency (int): maximum number of requests in flight
+            journal (Optional[Journal], optional): journal that records every success. Defaults to None.
+            batch_tokens (Optional[int], optional): maximum estimated input tokens in flight.
+                Defaults to None.
+            **kwargs: extra kwargs passed to _generate_single
+
+        Returns:
+            list[GenerationResult]: one result per row, failed rows included
+        """
+        results = []
+        queue_waits = []
+
+        with tqdm(
+            total=len(data), desc="Generating", unit="Item", disable=_worker_llm is not None
+        ) as pbar:
+            async for result in self._iter_windowed_generation(
+                self._iter_requests(data, **kwargs),
+                max_concurrency=max_concurrency,
+                queue_waits=queue_waits,
+                max_tokens=batch_tokens,
+            ):
+                results.append(result)
+                if result.is_succeeded and journal is not None:
+                    journal.append(result.id, result.result)
+                pbar.update(1)
+
+        if queue_waits:
+            queue_waits.sort()
+            logger.info(
+                f"⏳ Queue wait: mean {sum(queue_waits) / len(queue_waits):.2f}s, "
+                f"p99 {queue_waits[int(0.99 * (len(queue_waits) - 1))]:.2f}s"
+            )
+
+        return results
+
+    async def _run_multiprocess_generation(
+        self,
+        data: pd.DataFrame | pl.DataFrame,
+        workers: int,
+        batch_size: int,
+        max_concurrency: Optional[int],
+        journal: Optional[Journal] = None,
+        batch_tokens: Optional[int] = None,
+        **kwargs,
+    ) -> list[GenerationResult]:
+        """Shard the dataframe across a pool of worker processes.
+
+        Every worker rebuilds this instance from its constructor arguments and retry settings, so
+        it owns its provider client and event loop. The concurrency (`batch_size` or
+        `max_concurrency`) and the rate limiter budgets are divided between the workers, so the
+        totals stay the same as in a single process run.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame): dataframe with 'id' and 'prompt' columns
+            workers (int): number of worker processes
+            batch_size (int): total number of rows per batch
+            max_concurrency (Optional[int]): total sliding window size
+            journal (Optional[Journal], optional): journal that records every success. Defaults to None.
+            **kwargs: extra kwargs passed to _generate_single
+
+        Returns:
+            list[GenerationResult]: one result per row, failed rows included
+        """
+        options = dict(
+            batch_size=max(1, batch_size // workers),
+            max_concurrency=max(1, max_concurrency // workers) if max_concurrency else None,
+            batch_tokens=max(1, batch_tokens // workers) if batch_tokens else None,
+            **kwargs,
+        )
+        rate_limiter = self.rate_limiter.split(workers) if self.rate_limiter else None
+
+        # a few shards per worker keeps the workers busy and the journal up to date
+        shard_size = max(1, math.ceil(len(data) / (workers * 4)))
+        shards = [_slice_rows(data, i, i + shard_size) for i in range(0, len(data), shard_size)]
+
+        loop = asyncio.get_running_loop()
+        results = []
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self, rate_limiter),
+        ) as pool:
+
+            async def run_shard(shard: pd.DataFrame) -> _WorkerShardResult:
                 try:
-                    id, response, is_succeeded = await completed_task
-                    if is_succeeded:
-                        results.append((id, response))
+                    return await loop.run_in_executor(pool, _run_worker_shard, shard, options)
                 except Exception as e:
-                    logger.error(f"🛑 Error while generating: {str(e)}")
-                finally:
+                    logger.error(f"🛑 Error in worker process: {str(e)}")
+                    return _WorkerShardResult(
+                        [GenerationResult(id, None, False, type(e).__name__) for id in shard["id"]]
+                    )
+
+            with tqdm(total=len(data), desc="Generating", unit="Item") as pbar:
+                for completed_shard in asyncio.as_completed([run_shard(shard) for shard in shards]):
+                    shard = await completed_shard
+                    self._merge_worker_shard(shard)
+                    shard_results = shard.results
+                    results.extend(shard_results)
+                    for result in shard_results:
+                        self._record_result(result)
+                    if journal is not None:
+                        for result in shard_results:
+                            if result.is_succeeded:
+                                journal.append(result.id, result.result)
+                    pbar.update(len(shard_results))
+
+        return results
+
+    def _merge_worker_shard(self, shard: _WorkerShardResult) -> None:
+        """Add the request-level metrics, cache lookups and idle time of a worker shard to the
+        parent's, the row-level metrics are recorded from the results."""
+        if shard.metrics is not None:
+            self.metrics.merge(shard.metrics)
+        if self.cache is not None:
+            self.cache.hits += shard.cache_hits
+            self.cache.misses += shard.cache_misses
+        for reason, seconds in (shard.idle_seconds or {}).items():
+            self.idle_seconds[reason] += seconds
+
+    def _get_batch_backend(self) -> BatchBackend:
+        """Return the provider batch API backend used by `mode="batch"`."""
+        raise NotImplementedError(
+            f"{type(self).__name__} doesn't support mode='batch'"
+        )
+
+    async def _embed_batch(self, texts: list[str], model: str, **kwargs) -> "np.ndarray | list":
+        """Embed one batch of texts with a single provider request.
+
+        Returns:
+            np.ndarray | list: one vector per text, a 2-D float array or a list of lists
+        """
+        raise NotImplementedError(f"{type(self).__name__} doesn't support embeddings")
+
+    async def _embed_with_retries(self, texts: list[str], model: str, **kwargs) -> "np.ndarray | list":
+        """Call _embed_batch through the rate limiter, with the retry policies of the LLM."""
+        input_tokens = sum(self._estimate_tokens(text) for text in texts)
+
+        def record_retry(retry_state: RetryCallState) -> None:
+            wait = retry_state.next_action.sleep
+            self.idle_seconds["retry_backoff"] += wait
+            self.metrics.on_retry(
+                model, _get_error_category(retry_state.outcome.exception()), wait
+            )
+
+        async for attempt in AsyncRetrying(
+            wait=self._get_retry_wait,
+            stop=self._should_stop_retrying,
+            retry=retry_if_exception(_is_retryable_error),
+            before_sleep=record_retry,
+            reraise=True,
+        ):
+            with attempt:
+                if self.rate_limiter is not None:
+                    wait = await self.rate_limiter.acquire(model, tokens=input_tokens)
+                    self.metrics.on_limiter_wait(model, wait)
+                    self.idle_seconds["rate_limiter"] += wait
+
+                self.metrics.on_request_start(model)
+                sent_at = time.monotonic()
+                started_at = time.perf_counter()
+                try:
+                    vectors = await self._embed_batch(texts, model, **kwargs)
+                except BaseException as e:
+                    self.metrics.on_request_end(
+                        model, "failed", time.perf_counter() - started_at, input_tokens
+                    )
+                    if self.rate_limiter is not None and _is_rate_limit_error(e):
+                        self.rate_limiter.on_rate_limited(model, sent_at)
+                    raise
+                self.metrics.on_request_end(
+                    model, "succeeded", time.perf_counter() - started_at, input_tokens
+                )
+                if self.rate_limiter is not None:
+                    self.rate_limiter.on_success(model)
+        return vectors
+
+    async def _run_batch_job(
+        self, backend: BatchBackend, shard: list[tuple[str, str, dict]]
+    ) -> list[GenerationResult]:
+        """Submit one shard to the batch API, wait until it finishes and return its results."""
+        try:
+            job_id = await backend.submit(
+                [(prompt, row_kwargs) for _, prompt, row_kwargs in shard]
+            )
+            logger.info(f"📮 Submitted batch job {job_id} with {len(shard)} requests")
+
+            status = await backend.poll(job_id)
+            while status == "running":
+                await asyncio.sleep(backend.poll_interval)
+                status = await backend.poll(job_id)
+
+            if status != "succeeded":
+                logger.warning(f"🚧 Batch job {job_id} ended with status '{status}'")
+                return [GenerationResult(id, None, False, "BatchJobFailed", 1) for id, _, _ in shard]
+
+            results = []
+            seen = np.zeros(len(shard), dtype=bool)
+            async for position, response, is_succeeded in backend.results(job_id):
+                seen[position] = True
+                results.append(
+                    GenerationResult(
+                        shard[position][0],
+                        response if is_succeeded else None,
+                        is_succeeded,
+                        None if is_succeeded else "BatchRequestFailed",
+                        1,
+                    )
+                )
+        except Exception as e:
+            logger.error(f"🛑 Error while running batch job: {str(e)}")
+            return [GenerationResult(id, None, False, type(e).__name__) for id, _, _ in shard]
+
+        missing = np.flatnonzero(~seen)
+        if len(missing):
+            logger.warning(f"🚧 Batch job {job_id} returned no result for {len(missing)} requests")
+            results.extend(
+                GenerationResult(shard[position][0], None, False, "BatchResultMissing", 1)
+                for position in missing
+            )
+
+        logger.info(f"📬 Batch job {job_id} finished")
+        return results
+
+    async def _run_batch_generation(
+        self,
+        data: pd.DataFrame | pl.DataFrame,
+        journal: Optional[Journal] = None,
+        poll_interval: Optional[float] = None,
+        **kwargs,
+    ) -> list[GenerationResult]:
+        """Run generation through the provider batch API.
+
+        Rows are packed into shards of the backend's maximum batch size, every shard is
+        submitted as its own job and the jobs are polled concurrently. Results are collected
+        shard by shard as jobs finish.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame): dataframe with 'id' and 'prompt' columns
+            journal (Optional[Journal], optional): journal that records every success. Defaults to None.
+            poll_interval (Optional[float], optional): seconds between status checks, overrides the
+                backend default. Defaults to None.
+            **kwargs: extra kwargs passed to every request
+
+        Returns:
+            list[GenerationResult]: one result per row, failed rows included
+        """
+        backend = self._get_batch_backend()
+        if poll_interval is not None:
+            backend.poll_interval = poll_interval
+
+        requests = list(self._iter_requests(data, **kwargs))
+        unsupported = {
+            key for _, _, row_kwargs in requests for key in row_kwargs
+        } & set(backend.unsupported_kwargs)
+        assert not unsupported, (
+            f"{sorted(unsupported)} are not supported with mode='batch' by {type(self).__name__}"
+        )
+        shards = [
+            requests[i : i + backend.max_batch_size]
+            for i in range(0, len(requests), backend.max_batch_size)
+        ]
+
+        results = []
+        with tqdm(
+            total=len(requests), desc="Generating", unit="Item", disable=_worker_llm is not None
+        ) as pbar:
+            for completed_job in asyncio.as_completed(
+                [self._run_batch_job(backend, shard) for shard in shards]
+            ):
+                for result in await completed_job:
+                    results.append(result)
+                    self._record_result(result)
+                    if result.is_succeeded and journal is not None:
+                        journal.append(result.id, result.result)
                     pbar.update(1)
 
         return results
 
     @staticmethod
-    def _assert_data(data: pd.DataFrame) -> pd.DataFrame:
-        """Validate and normalise the input dataframe."""
-        assert isinstance(data, pd.DataFrame), "data should be a pandas dataframe"
-        assert "prompt" in data.columns, "data should have a column named 'prompt'"
+    def _assert_columns(data: pd.DataFrame | pl.DataFrame, prompt_template: Optional[str] = None) -> None:
+        """Check that the prompt column, or every column used by the prompt template, exists."""
+        if prompt_template is None:
+            assert "prompt" in data.columns, "data should have a column named 'prompt'"
+            return
+
+        missing_columns = [
+            col for col in get_template_columns(prompt_template) if col not in data.columns
+        ]
+        assert not missing_columns, (
+            f"data doesn't have the columns used by prompt_template: {missing_columns}"
+        )
+
+    @staticmethod
+    def _assert_data(
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table", prompt_template: Optional[str] = None
+    ) -> pd.DataFrame | pl.DataFrame:
+        """Validate and normalise the input dataframe.
+
+        Polars input stays polars (a LazyFrame is collected) and a pyarrow Table is wrapped as a
+        polars dataframe without copying, none of them is converted to pandas.
+        """
+        if isinstance(data, pl.LazyFrame):
+            data = data.collect()
+        elif _is_arrow_table(data):
+            data = pl.from_arrow(data)
+        assert isinstance(data, (pd.DataFrame, pl.DataFrame)), (
+            "data should be a pandas or polars dataframe, a polars LazyFrame or a pyarrow Table"
+        )
+        BaseLLM._assert_columns(data, prompt_template)
 
         if "id" not in data.columns:
-            data = data.reset_index().rename(columns={"index": "id"})
+            if isinstance(data, pl.DataFrame):
+                data = data.with_row_index("id").with_columns(pl.col("id").cast(pl.Int64))
+            else:
+                data = data.reset_index().rename(columns={"index": "id"})
             logger.warning(
                 "🚧 Data doesn't have 'id' column, so added the index as 'id' column"
             )
 
         return data
 
-    async def generate_async_from_dataframe(
-        self, data: pd.DataFrame, batch_size: int = 120, **kwargs
+    @staticmethod
+    def _deduplicate(
+        data: pd.DataFrame | pl.DataFrame,
+    ) -> tuple[pd.DataFrame | pl.DataFrame, tuple[np.ndarray, np.ndarray]]:
+        """Keep one row per distinct (prompt, extra columns) combination.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame): dataframe with 'id' and 'prompt' columns
+
+        Returns:
+            tuple[pd.DataFrame | pl.DataFrame, tuple[np.ndarray, np.ndarray]]: the unique rows,
+                and the ids of every original row with, at the same position, the representative
+                id whose result it shares
+        """
+        if isinstance(data, pl.DataFrame):
+            keys = data.drop("id").hash_rows()
+            representatives = (
+                data["id"].to_numpy(),
+                data.select(pl.col("id").first().over(keys))["id"].to_numpy(),
+            )
+            unique_data = data.filter(keys.is_first_distinct())
+        else:
+            request_columns = data.drop(columns=["id"])
+            try:
+                keys = pd.util.hash_pandas_object(request_columns, index=False)
+            except TypeError:
+                # unhashable cells (e.g. lists), fall back to their string form
+                keys = pd.util.hash_pandas_object(request_columns.astype(str), index=False)
+
+            representatives = (
+                data["id"].to_numpy(),
+                data["id"].groupby(keys.to_numpy()).transform("first").to_numpy(),
+            )
+            unique_data = data[~keys.duplicated().to_numpy()]
+
+        saved = len(data) - len(unique_data)
+        logger.info(
+            f"🧬 Deduplicated {len(data)} rows into {len(unique_data)} unique requests "
+            f"({saved / len(data) if len(data) else 0:.2%} calls saved)"
+        )
+        return unique_data, representatives
+
+    @staticmethod
+    def _get_token_batches(tokens: pd.Series | pl.Series, batch_tokens: int) -> list[slice]:
+        """Split consecutive rows into batches of at most `batch_tokens` estimated tokens.
+
+        A row larger than the budget gets a batch of its own.
+        """
+        assert batch_tokens > 0, "batch_tokens should be greater than 0"
+
+        batches = []
+        start, total = 0, 0
+        for i, row_tokens in enumerate(tokens.to_list()):
+            if total + row_tokens > batch_tokens and i > start:
+                batches.append(slice(start, i))
+                start, total = i, 0
+            total += row_tokens
+        if start < len(tokens):
+            batches.append(slice(start, len(tokens)))
+        return batches
+
+    async def plan_async(
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        prompt_template: Optional[str] = None,
+        count_tokens: bool = False,
+        max_concurrency: int = 16,
     ) -> pd.DataFrame:
+        """Return the input token count of every row without generating anything.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): dataframe with a
+                'prompt' column (and optionally 'id')
+            prompt_template (Optional[str], optional): prompt template, see generate_async_from_dataframe.
+                Defaults to None.
+            count_tokens (bool, optional): ask the provider count endpoint instead of the local
+                approximation (about 4 characters per token). Rows the provider can't count keep
+                the approximation. Defaults to False.
+            max_concurrency (int, optional): concurrent count requests. Defaults to 16.
+
+        Returns:
+            pd.DataFrame: dataframe with columns ['id', 'input_tokens']
+        """
+        data = self._assert_data(data, prompt_template)
+        plan = pd.DataFrame(
+            {
+                "id": data["id"].to_numpy(),
+                "input_tokens": self._estimate_prompt_tokens(data, prompt_template).to_numpy(),
+            }
+        )
+        if not count_tokens:
+            return plan
+
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def count(prompt: str, row_kwargs: dict) -> Optional[int]:
+            async with semaphore:
+                try:
+                    return await self._count_tokens(prompt, **row_kwargs)
+                except Exception as e:
+                    logger.warning(f"🚧 Token count failed, using the approximation: {str(e)}")
+                    return None
+
+        counts = await asyncio.gather(
+            *[
+                count(prompt, row_kwargs)
+                for _, prompt, row_kwargs in self._iter_requests(data, prompt_template)
+            ]
+        )
+        counted = pd.Series(counts, dtype="Int64")
+        plan["input_tokens"] = counted.fillna(plan["input_tokens"]).astype("int64").to_numpy()
+        return plan
+
+    async def estimate_async(
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        prompt_template: Optional[str] = None,
+        count_tokens: bool = False,
+        output_tokens_per_row: int = 256,
+        input_cost_per_million: Optional[float] = None,
+        output_cost_per_million: Optional[float] = None,
+        max_concurrency: Optional[int] = None,
+        latency_seconds: Optional[float] = None,
+    ) -> dict:
+        """Project tokens, cost and wall-clock time of a run before starting it.
+
+        The time is bounded by the `RateLimiter` budgets of the model and, when `max_concurrency`
+        and `latency_seconds` are given, by the concurrency window. The largest bound wins.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): dataframe with a
+                'prompt' column (and optionally 'id')
+            prompt_template (Optional[str], optional): prompt template. Defaults to None.
+            count_tokens (bool, optional): use the provider count endpoint, see plan_async.
+                Defaults to False.
+            output_tokens_per_row (int, optional): expected output tokens per row. Defaults to 256.
+            input_cost_per_million (Optional[float], optional): price per million input tokens.
+                Defaults to None (cost not estimated).
+            output_cost_per_million (Optional[float], optional): price per million output tokens.
+                Defaults to None (cost not estimated).
+            max_concurrency (Optional[int], optional): planned concurrency. Defaults to None.
+            latency_seconds (Optional[float], optional): expected latency of one request. Defaults to None.
+
+        Returns:
+            dict: rows, input_tokens, output_tokens, cost, estimated_seconds and the bottleneck
+                ("requests_per_minute", "tokens_per_minute", "concurrency" or None)
+        """
+        plan = await self.plan_async(data, prompt_template, count_tokens=count_tokens)
+        rows = len(plan)
+        input_tokens = int(plan["input_tokens"].sum())
+        output_tokens = rows * output_tokens_per_row
+
+        cost = None
+        if input_cost_per_million is not None or output_cost_per_million is not None:
+            cost = (
+                input_tokens * (input_cost_per_million or 0)
+                + output_tokens * (output_cost_per_million or 0)
+            ) / 1_000_000
+
+        bounds = {}
+        if self.rate_limiter is not None:
+            rpm, tpm = self.rate_limiter.get_limits(self._get_model_name())
+            if rpm:
+                bounds["requests_per_minute"] = rows / rpm * 60
+            if tpm:
+                bounds["tokens_per_minute"] = input_tokens / tpm * 60
+        if max_concurrency and latency_seconds:
+            bounds["concurrency"] = math.ceil(rows / max_concurrency) * latency_seconds
+
+        bottleneck = max(bounds, key=bounds.get) if bounds else None
+        estimate = dict(
+            rows=rows,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost=cost,
+            estimated_seconds=bounds.get(bottleneck),
+            bottleneck=bottleneck,
+        )
+        logger.info(
+            f"🧮 Estimated {input_tokens} input tokens over {rows} rows"
+            + (f", cost {cost:.4f}" if cost is not None else "")
+            + (f", about {estimate['estimated_seconds']:.0f}s ({bottleneck})" if bottleneck else "")
+        )
+        return estimate
+
+    async def generate_async_from_dataframe(
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        batch_size: int = 120,
+        max_concurrency: Optional[int] = None,
+        journal: Optional[str | Journal] = None,
+        dedup: bool = False,
+        mode: str = "async",
+        batch_poll_interval: Optional[float] = None,
+        workers: Optional[int] = None,
+        prompt_template: Optional[str] = None,
+        batch_tokens: Optional[int] = None,
+        response_schema: Optional[dict | type | ResponseSchema] = None,
+        stream: bool | StreamOptions = False,
+        **kwargs,
+    ) -> "pd.DataFrame | pl.DataFrame | pa.Table":
         """Generate responses asynchronously from a dataframe.
 
+        Polars and Arrow input is read column-wise in slices, without a pandas copy, and the
+        result comes back in the same format (a polars dataframe for a LazyFrame).
+
         Args:
-            data (pd.DataFrame): dataframe with a 'prompt' column (and optionally 'id')
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): dataframe with a
+                'prompt' column (and optionally 'id')
             batch_size (int): number of rows per batch. Defaults to 120.
+            max_concurrency (Optional[int], optional): when set, the batch loop is replaced by
+                a sliding window that keeps up to this many requests in flight and starts a new
+                one as soon as any finishes. `batch_size` is ignored. Defaults to None.
+            journal (Optional[str | Journal], optional): path of (or a `Journal` for) an append-only
+                checkpoint file. Every success is recorded as it arrives, and ids already in the
+                journal are skipped and merged into the result, so a crashed run can be resumed
+                by calling again with the same journal. Defaults to None.
+            dedup (bool, optional): generate rows with the same prompt and extra columns only
+                once and copy the result to every duplicate id. Defaults to False.
+            mode (str, optional): "async" sends one request per row, "batch" packs the rows into
+                the provider batch API (cheaper, higher quota, but results can take hours).
+                Defaults to "async".
+            batch_poll_interval (Optional[float], optional): seconds between job status checks
+                in batch mode. Defaults to None (the backend default).
+            workers (Optional[int], optional): shard the rows across this many worker processes,
+                each with its own event loop and provider client. Concurrency and rate limits are
+                split between the workers. Defaults to None (single process).
+            prompt_template (Optional[str], optional): build the prompt from other columns instead
+                of a 'prompt' column, e.g. "Classify the review: {review}" or
+                "Classify the review: {{ review }}". Prompts are rendered column-wise, a batch at
+                a time. Defaults to None.
+            batch_tokens (Optional[int], optional): group rows into batches of at most this many
+                estimated input tokens instead of `batch_size` rows, so batches of long prompts
+                stay within the tokens-per-minute quota. With `max_concurrency` it caps the
+                estimated input tokens in flight instead, on top of the request count.
+                Defaults to None.
+            response_schema (Optional[dict | type | ResponseSchema], optional): JSON schema or
+                Pydantic model of a structured response. Every response is parsed and validated
+                once, a response that doesn't match is retried like a transient error (and
+                counted by `metrics.on_parse_error`), and every field becomes a typed column of
+                the result. Providers that support it are asked for JSON of this schema.
+                Defaults to None.
+            stream (bool | StreamOptions, optional): stream every response, recording time to
+                first token and the time between chunks (`metrics.on_stream`). A `StreamOptions`
+                with `max_chars` or `stop_when` also closes a stream early once it is met, the
+                row keeps the text received so far. Not available with mode="batch".
+                Defaults to False.
             **kwargs: passed through to _generate_single
 
         Returns:
-            pd.DataFrame: dataframe with columns ['id', 'result']
+            pd.DataFrame | pl.DataFrame | pa.Table: dataframe in the format of `data` with columns
+                ['id', 'result', 'status', 'error_type', 'attempts', 'latency_ms'], plus one column
+                per field of `response_schema`. Failed rows are kept with status "failed" and an empty result, see
+                `redrive` to generate them again.
         """
-        data = self._assert_data(data)
+        assert mode in ["async", "batch"], "mode should be either 'async' or 'batch'"
+
+        frame_type = _get_frame_type(data)
+        data = self._assert_data(data, prompt_template)
+        if prompt_template is not None:
+            kwargs["prompt_template"] = prompt_template
+        if response_schema is not None and not isinstance(response_schema, ResponseSchema):
+            response_schema = ResponseSchema(response_schema)
+        if response_schema is not None:
+            kwargs["response_schema"] = response_schema
+        if stream:
+            assert self._supports_streaming, f"{type(self).__name__} doesn't support stream"
+            assert mode == "async", "stream is not available with mode='batch'"
+            kwargs["stream"] = StreamOptions() if stream is True else stream
+            assert self.cache is None or kwargs["stream"].cacheable, (
+                "stop_when should be a module-level function with a cache, lambdas and nested "
+                "functions can't be told apart in cache keys"
+            )
+        total = len(data)
+        self.idle_seconds = dict(retry_backoff=0.0, rate_limiter=0.0)
+        self.metrics.on_run_start()
         logger.info("🔨 Starting for generation")
 
-        responses = []
-        for i in range(0, len(data), batch_size):
-            batch_data = data.iloc[i : i + batch_size]
-            logger.info(f"🔄 Processing data batch {i} - {i + len(batch_data)} ...")
-            response = await self._run_async_generation(batch_data, **kwargs)
-            responses.append(response)
+        representatives = None
+        if dedup:
+            data, representatives = self._deduplicate(data)
 
-        responses = list(chain(*responses))
+        resumed = []
+        if journal is not None:
+            journal = journal if isinstance(journal, Journal) else Journal(journal)
+            completed = journal.load()
+            is_completed = _isin(data["id"], list(completed.keys()))
+            resumed = [
+                GenerationResult(id, completed[id], True)
+                for id in _filter_rows(data, is_completed)["id"].to_list()
+            ]
+            data = _filter_rows(data, ~is_completed)
+            logger.info(
+                f"📒 Resuming from journal {journal.path}: {len(resumed)} done, {len(data)} remaining"
+            )
+
+        try:
+            if mode == "batch":
+                logger.info("📦 Using the provider batch API")
+                responses = await self._run_batch_generation(
+                    data, journal=journal, poll_interval=batch_poll_interval, **kwargs
+                )
+            elif workers is not None and workers > 1:
+                logger.info(f"🏭 Sharding across {workers} worker processes")
+                responses = await self._run_multiprocess_generation(
+                    data,
+                    workers=workers,
+                    batch_size=batch_size,
+                    max_concurrency=max_concurrency,
+                    journal=journal,
+                    batch_tokens=batch_tokens,
+                    **kwargs,
+                )
+            elif max_concurrency is not None:
+                logger.info(f"🪟 Sliding window with max concurrency {max_concurrency}")
+                responses = await self._run_windowed_generation(
+                    data,
+                    max_concurrency=max_concurrency,
+                    journal=journal,
+                    batch_tokens=batch_tokens,
+                    **kwargs,
+                )
+            else:
+                if batch_tokens is not None:
+                    tokens = self._estimate_prompt_tokens(data, prompt_template)
+                    batches = self._get_token_batches(tokens, batch_tokens)
+                    logger.info(f"🧮 Grouped {len(data)} rows into {len(batches)} token batches")
+                else:
+                    batches = [slice(i, i + batch_size) for i in range(0, len(data), batch_size)]
 
-        success_rate = len(responses) / len(data)
+                responses = []
+                for batch in batches:
+                    batch_data = _slice_rows(data, batch.start, batch.stop)
+                    logger.info(
+                        f"🔄 Processing data batch {batch.start} - {batch.start + len(batch_data)} ..."
+                    )
+                    response = await self._run_async_generation(
+                        batch_data, journal=journal, **kwargs
+                    )
+                    responses.append(response)
+
+                responses = list(chain(*responses))
+        finally:
+            if journal is not None:
+                journal.close()
+
+        results = resumed + responses
+        is_succeeded = np.fromiter((row.is_succeeded for row in results), bool, len(results))
+        if representatives is not None:
+            # row positions of the representative results, fanned out with one take
+            ids, representative_ids = representatives
+            positions = pd.Index([row.id for row in results]).get_indexer(representative_ids)
+            has_result = positions >= 0
+            ids, positions = ids[has_result], positions[has_result]
+            is_succeeded = is_succeeded[positions]
+        result = _to_result_frame(results, frame_type, response_schema)
+        if representatives is not None:
+            result = _take_results(result, positions, ids)
+
+        succeeded = int(is_succeeded.sum())
+        success_rate = succeeded / total if total else 1.0
         logger.info(
-            f"✅ Generation Finished, Success rate: {success_rate:.2%} ({len(responses)}/{len(data)})"
+            f"✅ Generation Finished, Success rate: {success_rate:.2%} ({succeeded}/{total})"
         )
 
-        return pd.DataFrame(responses, columns=["id", "result"])
+        summary = self.metrics.summary()
+        if summary is not None:
+            logger.info(summary)
+
+        if any(self.idle_seconds.values()):
+            logger.info(
+                f"💤 Idle time summed over requests: {self.idle_seconds['retry_backoff']:.1f}s in retry "
+                f"backoff, {self.idle_seconds['rate_limiter']:.1f}s in the rate limiter"
+            )
+
+        if self.cache is not None:
+            stats = self.cache.stats()
+            logger.info(
+                f"💾 Cache hit rate: {stats['hit_rate']:.2%} ({stats['hits']} hits, {stats['misses']} misses)"
+            )
+
+        return result
+
+    async def redrive_async(
+        self,
+        result: "pd.DataFrame | pl.DataFrame | pa.Table",
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        min_wait: Optional[float] = None,
+        max_wait: Optional[float] = None,
+        max_attempts: Optional[int] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+        **kwargs,
+    ) -> "pd.DataFrame | pl.DataFrame | pa.Table":
+        """Generate again only the rows of `data` that failed or are missing in `result`.
+
+        `min_wait`, `max_wait` and `max_attempts` apply to every error class of the redrive: the
+        `retry_policies` of the LLM are not used when one of them is set, unless new
+        `retry_policies` are passed as well.
+
+        Args:
+            result (pd.DataFrame | pl.DataFrame | pa.Table): result of a previous generate call
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): the input dataframe of
+                that call
+            min_wait (Optional[float], optional): backoff override for the redrive. Defaults to None.
+            max_wait (Optional[float], optional): backoff override for the redrive. Defaults to None.
+            max_attempts (Optional[int], optional): retry override for the redrive. Defaults to None.
+            retry_policies (Optional[dict[str, RetryPolicy]], optional): per error class policies
+                of the redrive, replacing those of the LLM. Defaults to None.
+            **kwargs: execution options of generate_async_from_dataframe, e.g. `max_concurrency`
+
+        Returns:
+            pd.DataFrame | pl.DataFrame | pa.Table: `result` with the redriven rows replaced,
+                attempts are summed, in the format of `result`
+        """
+        frame_type = _get_frame_type(result)
+        previous = [GenerationResult.from_record(record) for record in _iter_result_records(result)]
+        data = self._assert_data(data, kwargs.get("prompt_template"))
+        succeeded_ids = [row.id for row in previous if row.is_succeeded]
+        redrive_data = _filter_rows(data, ~_isin(data["id"], succeeded_ids))
+        logger.info(f"🔁 Redriving {len(redrive_data)} failed or missing rows")
+
+        llm = copy.copy(self)
+        if min_wait is not None:
+            llm.min_wait = min_wait
+        if max_wait is not None:
+            llm.max_wait = max_wait
+        if max_attempts is not None:
+            llm.max_attempts = max_attempts
+        if retry_policies is not None:
+            llm.retry_policies = retry_policies
+        elif (min_wait, max_wait, max_attempts) != (None, None, None):
+            # a policy of an error class would otherwise beat the explicit overrides
+            llm.retry_policies = {}
+
+        redriven = await llm.generate_async_from_dataframe(redrive_data, **kwargs)
+
+        previous_attempts = {row.id: row.attempts for row in previous}
+        redriven = [
+            row._replace(attempts=row.attempts + previous_attempts.get(row.id, 0))
+            for row in map(GenerationResult.from_record, _iter_result_records(redriven))
+        ]
+        redriven_ids = {row.id for row in redriven}
+        kept = [row for row in previous if row.id not in redriven_ids]
+        response_schema = kwargs.get("response_schema")
+        if response_schema is not None and not isinstance(response_schema, ResponseSchema):
+            response_schema = ResponseSchema(response_schema)
+        return _to_result_frame(kept + redriven, frame_type, response_schema)
+
+    def _iter_source_chunks(
+        self,
+        source: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table | Iterable[pd.DataFrame | pl.DataFrame]",
+        chunk_size: int,
+        prompt_template: Optional[str] = None,
+    ) -> Iterator[pd.DataFrame | pl.DataFrame]:
+        """Yield normalised chunks from a dataframe, a polars LazyFrame, a pyarrow Table or an
+        iterator of chunks.
+
+        Chunks are produced lazily, so only the chunk being dispatched is held in memory. Polars
+        and Arrow sources are sliced as polars dataframes, never converted to pandas. Chunks
+        without an 'id' column get a running row number as id.
+        """
+        if isinstance(source, pd.DataFrame):
+            chunks = (
+                source.iloc[i : i + chunk_size] for i in range(0, len(source), chunk_size)
+            )
+        elif isinstance(source, pl.LazyFrame):
+            chunks = source.collect_batches(chunk_size=chunk_size)
+        elif isinstance(source, pl.DataFrame):
+            chunks = source.iter_slices(chunk_size)
+        elif _is_arrow_table(source):
+            chunks = (pl.from_arrow(batch) for batch in source.to_batches(max_chunksize=chunk_size))
+        else:
+            chunks = iter(source)
+
+        offset = 0
+        for chunk in chunks:
+            if _is_arrow_table(chunk):
+                chunk = pl.from_arrow(chunk)
+            assert isinstance(chunk, (pd.DataFrame, pl.DataFrame)), (
+                "every chunk should be a pandas or polars dataframe"
+            )
+            self._assert_columns(chunk, prompt_template)
+
+            if "id" not in chunk.columns:
+                if isinstance(chunk, pl.DataFrame):
+                    chunk = chunk.with_columns(id=pl.int_range(offset, offset + len(chunk)))
+                else:
+                    chunk = chunk.assign(id=range(offset, offset + len(chunk)))
+            offset += len(chunk)
+            yield chunk
+
+    async def generate_iter(
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table | Iterable[pd.DataFrame | pl.DataFrame]",
+        max_concurrency: int = 120,
+        chunk_size: int = 10_000,
+        prompt_template: Optional[str] = None,
+        **kwargs,
+    ) -> AsyncIterator[tuple[str, str, str]]:
+        """Stream generation results as soon as each request completes.
+
+        Input rows are pulled lazily: a chunk is only read when the sliding window has a free
+        slot and the consumer has taken the previous results, so memory stays bounded by
+        `chunk_size` and `max_concurrency` regardless of the source size.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table | Iterable[pd.DataFrame | pl.DataFrame]):
+                a pandas or polars dataframe, a polars LazyFrame, a pyarrow Table or an iterator
+                of dataframe chunks, each with a 'prompt' column
+            max_concurrency (int, optional): maximum number of requests in flight. Defaults to 120.
+            chunk_size (int, optional): rows read from the source at a time. Defaults to 10_000.
+            prompt_template (Optional[str], optional): build the prompt from other columns, see
+                generate_async_from_dataframe. Defaults to None.
+            **kwargs: passed through to _generate_single
+
+        Yields:
+            tuple[str, str, str]: (id, result, status) where status is "succeeded" or "failed"
+        """
+
+        def requests() -> Iterator[tuple[str, str, dict]]:
+            for chunk in self._iter_source_chunks(data, chunk_size, prompt_template):
+                yield from self._iter_requests(chunk, prompt_template=prompt_template, **kwargs)
+
+        async for result in self._iter_windowed_generation(
+            requests(), max_concurrency=max_concurrency
+        ):
+            yield result.id, result.result, result.status
+
+    async def embed_async_from_dataframe(
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        column: str = "text",
+        model: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        batch_tokens: Optional[int] = None,
+        max_concurrency: int = 8,
+        output_path: Optional[str] = None,
+        normalize: bool = False,
+        dimensions: Optional[int] = None,
+        **kwargs,
+    ) -> np.ndarray:
+        """Embed a text column into a float32 matrix, one row per input row in order.
+
+        Texts are packed into requests of the provider's maximum batch size and token budget,
+        and up to `max_concurrency` requests are in flight, through the rate limiter and the
+        retry policies of the LLM. Every batch is written into one contiguous float32 matrix as
+        it arrives, instead of lists of Python floats.
+
+        Args:
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): dataframe with the texts
+            column (str, optional): the text column. Defaults to "text".
+            model (Optional[str], optional): embedding model. Defaults to None (the provider
+                default, e.g. "text-embedding-005" for Gemini).
+            batch_size (Optional[int], optional): texts per request. Defaults to None (the
+                provider maximum).
+            batch_tokens (Optional[int], optional): estimated tokens per request. Defaults to None
+                (the provider maximum).
+            max_concurrency (int, optional): requests in flight. Defaults to 8.
+            output_path (Optional[str], optional): write the matrix to this ``.npy`` file as a
+                memory map instead of holding it in memory, for large corpora. Defaults to None.
+            normalize (bool, optional): scale every vector to unit length, so a dot product is the
+                cosine similarity. Defaults to False.
+            dimensions (Optional[int], optional): output dimensionality, for models that support
+                shortened embeddings. Defaults to None (the model default).
+            **kwargs: passed through to _embed_batch (e.g. `task_type` for Gemini)
+
+        Returns:
+            np.ndarray: float32 matrix of shape (rows, dimensions), a ``np.memmap`` with
+                `output_path`. Rows of batches that failed after all retries are NaN.
+        """
+        assert max_concurrency > 0, "max_concurrency should be greater than 0"
+        model = model or self._embedding_model
+        assert model is not None, f"{type(self).__name__} doesn't support embeddings"
+
+        if isinstance(data, pl.LazyFrame):
+            data = data.select(column).collect()
+        if _is_arrow_table(data):
+            texts = data.column(column).to_pylist()
+        else:
+            assert column in data.columns, f"data should have a '{column}' column"
+            texts = data[column].to_list()
+        assert all(isinstance(text, str) and text for text in texts), (
+            f"'{column}' should only have non-empty strings"
+        )
+
+        tokens = np.fromiter(
+            (self._estimate_tokens(text) for text in texts), dtype=np.int64, count=len(texts)
+        )
+        batches = get_embedding_batches(
+            tokens,
+            batch_size or self._embed_batch_size,
+            batch_tokens if batch_tokens is not None else self._embed_batch_tokens,
+        )
+        matrix = EmbeddingMatrix(len(texts), output_path, dimensions)
+        semaphore = asyncio.Semaphore(max_concurrency)
+        self.idle_seconds = dict(retry_backoff=0.0, rate_limiter=0.0)
+        logger.info(f"🧬 Embedding {len(texts)} texts in {len(batches)} requests with {model}")
+
+        async def embed(batch: slice) -> None:
+            async with semaphore:
+                try:
+                    vectors = await self._embed_with_retries(
+                        texts[batch], model, dimensions=dimensions, **kwargs
+                    )
+                    matrix.write(batch, vectors)
+                except Exception as e:
+                    logger.warning(
+                        f"🚧 Embedding rows {batch.start} - {batch.stop} failed: {str(e)}"
+                    )
+                    matrix.fail(batch)
+                pbar.update(batch.stop - batch.start)
+
+        with tqdm(total=len(texts), desc="Embedding", unit="Item") as pbar:
+            await asyncio.gather(*(embed(batch) for batch in batches))
+
+        failed = int(matrix.failed.sum())
+        logger.info(
+            f"✅ Embedding Finished, {len(texts) - failed}/{len(texts)} rows"
+            + (f", written to {output_path}" if output_path else "")
+        )
+        if any(self.idle_seconds.values()):
+            logger.info(
+                f"💤 Idle time summed over requests: {self.idle_seconds['retry_backoff']:.1f}s in retry "
+                f"backoff, {self.idle_seconds['rate_limiter']:.1f}s in the rate limiter"
+            )
+        return matrix.finish(normalize)
 
     def generate_from_dataframe(
-        self, data: pd.DataFrame, batch_size: int = 120, **kwargs
-    ) -> pd.DataFrame:
+        self,
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        batch_size: int = 120,
+        **kwargs,
+    ) -> "pd.DataFrame | pl.DataFrame | pa.Table":
         """Synchronous wrapper around generate_async_from_dataframe.
 
         Args:
-            data (pd.DataFrame): dataframe with a 'prompt' column (and optionally 'id')
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): dataframe with a
+                'prompt' column (and optionally 'id')
             batch_size (int): number of rows per batch. Defaults to 120.
-            **kwargs: passed through to _generate_single
+            **kwargs: execution options of generate_async_from_dataframe (e.g. `max_concurrency`,
+                `journal`), everything else is passed through to _generate_single
 
         Returns:
-            pd.DataFrame: dataframe with columns ['id', 'result']
+            pd.DataFrame | pl.DataFrame | pa.Table: dataframe in the format of `data` with columns
+                ['id', 'result', 'status', 'error_type', 'attempts', 'latency_ms']
         """
-        try:
-            loop = asyncio.get_running_loop()
-        except RuntimeError:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-        else:
-            logger.error("🛑 Use `await generate_async_from_dataframe()` instead")
-            raise RuntimeError("Async event loop is already running")
+        return _run_sync(
+            self.generate_async_from_dataframe(data, batch_size, **kwargs),
+            "generate_async_from_dataframe",
+        )
+
+    def redrive(
+        self,
+        result: "pd.DataFrame | pl.DataFrame | pa.Table",
+        data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table",
+        **kwargs,
+    ) -> "pd.DataFrame | pl.DataFrame | pa.Table":
+        """Synchronous wrapper around redrive_async.
+
+        Args:
+            result (pd.DataFrame | pl.DataFrame | pa.Table): result of a previous generate call
+            data (pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table): the input dataframe of
+                that call
+            **kwargs: backoff overrides and execution options, see redrive_async
+
+        Returns:
+            pd.DataFrame | pl.DataFrame | pa.Table: `result` with the redriven rows replaced
+        """
+        return _run_sync(self.redrive_async(result, data, **kwargs), "redrive_async")
+
+    def plan(self, data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table", **kwargs) -> pd.DataFrame:
+        """Synchronous wrapper around plan_async.
 
-        return loop.run_until_complete(
-            self.generate_async_from_dataframe(data, batch_size, **kwargs)
+        Returns:
+            pd.DataFrame: dataframe with columns ['id', 'input_tokens']
+        """
+        return _run_sync(self.plan_async(data, **kwargs), "plan_async")
+
+    def estimate(self, data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table", **kwargs) -> dict:
+        """Synchronous wrapper around estimate_async.
+
+        Returns:
+            dict: rows, input_tokens, output_tokens, cost, estimated_seconds and bottleneck
+        """
+        return _run_sync(self.estimate_async(data, **kwargs), "estimate_async")
+
+    def embed_from_dataframe(
+        self, data: "pd.DataFrame | pl.DataFrame | pl.LazyFrame | pa.Table", **kwargs
+    ) -> np.ndarray:
+        """Synchronous wrapper around embed_async_from_dataframe.
+
+        Returns:
+            np.ndarray: float32 matrix of shape (rows, dimensions)
+        """
+        return _run_sync(
+            self.embed_async_from_dataframe(data, **kwargs), "embed_async_from_dataframe"
         )
@@ -0,0 +1,42 @@
+from abc import ABC, abstractmethod
+from typing import AsyncIterator
+
+
+class BatchBackend(ABC):
+    """Submit/poll layer of a provider batch API, used by `mode="batch"`.
+
+    Requests are sent in shards of at most `max_batch_size`. Inside a shard every request is
+    identified by its position, so backends never have to encode arbitrary ids into the
+    provider's custom id format.
+    """
+
+    #: maximum number of requests in one submitted job
+    max_batch_size: int = 10_000
+
+    #: seconds between two status checks of a job
+    poll_interval: float = 30.0
+
+    #: request kwargs (dataframe columns) the backend can't send, rejected before submitting
+    unsupported_kwargs: tuple = ()
+
+    @abstractmethod
+    async def submit(self, requests: list[tuple[str, dict]]) -> str:
+        """Submit one shard of requests as a batch job.
+
+        Args:
+            requests (list[tuple[str, dict]]): (prompt, kwargs) pairs, identified by their position
+
+        Returns:
+            str: provider job id
+        """
+        ...
+
+    @abstractmethod
+    async def poll(self, job_id: str) -> str:
+        """Return the job status: "running", "succeeded" or "failed"."""
+        ...
+
+    @abstractmethod
+    def results(self, job_id: str) -> AsyncIterator[tuple[int, str, bool]]:
+        """Yield (position, response_text, is_succeeded) for every request of a finished job."""
+        ...
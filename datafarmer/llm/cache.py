@@ -0,0 +1,221 @@
+from typing import Any, Optional
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from datafarmer.utils import logger
+
+
+def _to_jsonable(obj: Any) -> Any:
+    """Fallback serializer for values that end up in a cache key."""
+    if hasattr(obj, "model_dump"):
+        # pydantic models, e.g. google.genai GenerateContentConfig
+        return obj.model_dump(mode="json", exclude_none=True)
+    if isinstance(obj, type):
+        if hasattr(obj, "model_json_schema"):
+            return obj.model_json_schema()
+        return f"{obj.__module__}.{obj.__qualname__}"
+    if hasattr(obj, "to_dict"):
+        return obj.to_dict()
+    return repr(obj)
+
+
+def make_cache_key(**parts) -> str:
+    """Return a stable sha256 hex digest of the given key parts."""
+    payload = json.dumps(parts, sort_keys=True, default=_to_jsonable, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(
+        self,
+        path: str = "~/.cache/datafarmer/llm_cache.sqlite",
+        ttl_seconds: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+        eviction_interval: int = 1000,
+        busy_timeout: float = 1.0,
+    ):
+        """Persistent SQLite cache for successful LLM responses.
+
+        The database runs in WAL mode with a busy timeout, so several processes can read and
+        write the same cache file at the same time. The engine calls `get_async` / `set_async`,
+        which run the sqlite calls in a thread so the event loop never blocks on the database,
+        and a database still locked by another process after `busy_timeout` is a miss.
+
+        Args:
+            path (str, optional): sqlite file path. Defaults to "~/.cache/datafarmer/llm_cache.sqlite".
+            ttl_seconds (Optional[float], optional): entries older than this are treated as misses
+                and evicted. Defaults to None (never expire).
+            max_entries (Optional[int], optional): keep at most this many entries, evicting the least
+                recently used first. Defaults to None.
+            max_size_mb (Optional[float], optional): keep the stored responses under this size, evicting
+                the least recently used first. Defaults to None.
+            eviction_interval (int, optional): run eviction every this many writes. Defaults to 1000.
+            busy_timeout (float, optional): seconds to wait for a database locked by another
+                process before a lookup counts as a miss and a write is skipped. Defaults to 1.0.
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_size_mb = max_size_mb
+        self.eviction_interval = eviction_interval
+        self.busy_timeout = busy_timeout
+
+        self.hits = 0
+        self.misses = 0
+        self._writes = 0
+        self._lock = threading.Lock()
+        self._connection = None
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_connection"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            connection = sqlite3.connect(
+                self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS responses_accessed_at ON responses (accessed_at)"
+            )
+            self._connection = connection
+        return self._connection
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for `key`, or None on a miss."""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            row = connection.execute(
+                "SELECT response, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            expired = (
+                row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds
+            )
+
+            try:
+                if expired:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                elif row is not None:
+                    connection.execute(
+                        "UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key)
+                    )
+            except sqlite3.OperationalError as e:
+                # locked by another process for longer than busy_timeout, WAL readers are
+                # never blocked so the response is still served
+                logger.debug(f"🚧 Cache bookkeeping skipped: {str(e)}")
+
+            if row is None or expired:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return row[0]
+
+    def set(self, key: str, response: str) -> None:
+        """Store a response under `key`."""
+        now = time.time()
+        with self._lock:
+            connection = self._connect()
+            try:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?)",
+                    (key, response, len(response.encode("utf-8")), now, now),
+                )
+                self._writes += 1
+                if self._writes % self.eviction_interval == 0:
+                    self._evict(connection)
+            except sqlite3.OperationalError as e:
+                logger.debug(f"🚧 Cache write skipped: {str(e)}")
+
+    async def get_async(self, key: str) -> Optional[str]:
+        """`get` in a worker thread, so the event loop keeps running while sqlite waits."""
+        return await asyncio.to_thread(self.get, key)
+
+    async def set_async(self, key: str, response: str) -> None:
+        """`set` in a worker thread, so the event loop keeps running while sqlite waits."""
+        await asyncio.to_thread(self.set, key, response)
+
+    def evict(self) -> None:
+        """Drop expired entries and trim the cache to its size limits."""
+        with self._lock:
+            self._evict(self._connect())
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        if self.ttl_seconds is not None:
+            connection.execute(
+                "DELETE FROM responses WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,),
+            )
+
+        if self.max_entries is not None:
+            connection.execute(
+                """
+                DELETE FROM responses WHERE key IN (
+                    SELECT key FROM responses ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                )
+                """,
+                (self.max_entries,),
+            )
+
+        if self.max_size_mb is not None:
+            max_size = self.max_size_mb * 1024 * 1024
+            total_size = connection.execute(
+                "SELECT COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()[0]
+            if total_size > max_size:
+                # walk from the least recently used entry until enough space is freed
+                rows = connection.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed_at ASC"
+                )
+                to_delete = []
+                for key, size in rows:
+                    if total_size <= max_size:
+                        break
+                    to_delete.append((key,))
+                    total_size -= size
+                connection.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        with self._lock:
+            self._connect().execute("DELETE FROM responses")
+
+    def stats(self) -> dict:
+        """Return hit/miss counters of this process and the number of stored entries."""
+        with self._lock:
+            entries, size = self._connect().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            hit_rate=self.hits / lookups if lookups else 0.0,
+            entries=entries,
+            size_mb=size / 1024 / 1024,
+        )
@@ -0,0 +1,102 @@
+from typing import Optional
+import base64
+import numpy as np
+
+
+def get_embedding_batches(
+    tokens: np.ndarray, batch_size: int, batch_tokens: Optional[int] = None
+) -> list[slice]:
+    """Pack consecutive texts into batches of at most `batch_size` texts and `batch_tokens`
+    estimated tokens, a text larger than the token budget gets a batch of its own."""
+    assert batch_size > 0, "batch_size should be greater than 0"
+    assert batch_tokens is None or batch_tokens > 0, "batch_tokens should be greater than 0"
+
+    batches = []
+    start, total = 0, 0
+    for i, text_tokens in enumerate(tokens.tolist()):
+        is_full = i - start >= batch_size or (
+            batch_tokens is not None and total + text_tokens > batch_tokens
+        )
+        if is_full and i > start:
+            batches.append(slice(start, i))
+            start, total = i, 0
+        total += text_tokens
+    if start < len(tokens):
+        batches.append(slice(start, len(tokens)))
+    return batches
+
+
+def decode_base64_embeddings(values: list[str]) -> np.ndarray:
+    """Decode base64 little-endian float32 vectors (OpenAI ``encoding_format="base64"``) into a
+    matrix without going through Python floats."""
+    return np.stack([np.frombuffer(base64.b64decode(value), dtype="<f4") for value in values])
+
+
+class EmbeddingMatrix:
+    def __init__(self, rows: int, path: Optional[str] = None, dimensions: Optional[int] = None):
+        """Contiguous float32 matrix that batches of embeddings are written into by row offset.
+
+        The matrix is allocated when the first batch arrives, so the width doesn't have to be
+        known up front. With a `path` it is a memory-mapped ``.npy`` file, so a corpus larger
+        than memory is written batch by batch and can be opened later with
+        ``np.load(path, mmap_mode="r")``.
+
+        Args:
+            rows (int): number of texts
+            path (Optional[str], optional): ``.npy`` file to write. Defaults to None (in memory).
+            dimensions (Optional[int], optional): width of a vector, when known. Defaults to None.
+        """
+        self.rows = rows
+        self.path = path
+        self.dimensions = dimensions
+        self.failed = np.zeros(rows, dtype=bool)
+        self._matrix: Optional[np.ndarray] = None
+        self._failed_batches: list[slice] = []
+        if dimensions is not None:
+            self._allocate(dimensions)
+
+    def _allocate(self, dimensions: int) -> None:
+        self.dimensions = dimensions
+        if self.path is not None:
+            self._matrix = np.lib.format.open_memmap(
+                self.path, mode="w+", dtype=np.float32, shape=(self.rows, dimensions)
+            )
+        else:
+            self._matrix = np.empty((self.rows, dimensions), dtype=np.float32)
+        for batch in self._failed_batches:
+            self._matrix[batch] = np.nan
+
+    def write(self, batch: slice, vectors) -> None:
+        """Write the vectors of a batch, a list of lists or a 2-D array."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        assert vectors.ndim == 2 and len(vectors) == batch.stop - batch.start, (
+            f"expected {batch.stop - batch.start} vectors, got shape {vectors.shape}"
+        )
+        if self._matrix is None:
+            self._allocate(vectors.shape[1])
+        self._matrix[batch] = vectors
+
+    def fail(self, batch: slice) -> None:
+        """Mark the rows of a batch that couldn't be embedded, they are filled with NaN."""
+        self.failed[batch] = True
+        if self._matrix is None:
+            self._failed_batches.append(batch)
+        else:
+            self._matrix[batch] = np.nan
+
+    def finish(self, normalize: bool = False) -> np.ndarray:
+        """Return the matrix, L2-normalized in place with `normalize`, flushed to disk for a file."""
+        if self._matrix is None:
+            # nothing succeeded, the width is unknown
+            self._allocate(self.dimensions or 0)
+
+        if normalize:
+            # in chunks, so a memory-mapped matrix isn't copied into memory as a whole
+            for start in range(0, self.rows, 65_536):
+                chunk = self._matrix[start : start + 65_536]
+                norms = np.linalg.norm(chunk, axis=1, keepdims=True)
+                np.divide(chunk, norms, out=chunk, where=norms > 0)
+
+        if isinstance(self._matrix, np.memmap):
+            self._matrix.flush()
+        return self._matrix
@@ -7,19 +7,48 @@ from vertexai.generative_models import (
     Part,
 )
 from google import genai
-from google.genai.types import GenerateContentConfig
+from google.genai import types as genai_types
+from google.genai.types import CreateBatchJobConfig, GenerateContentConfig, InlinedRequest
 
-from typing import Optional
+from typing import Any, AsyncIterator, NamedTuple, Optional
 from datafarmer.utils import logger
 from datafarmer.llm.base import BaseLLM
+from datafarmer.llm.batch import BatchBackend
+from datafarmer.llm.cache import ResponseCache
+from datafarmer.llm.media import MediaCache, guess_mime_type, read_header
+from datafarmer.llm.metrics import Metrics
+from datafarmer.llm.pool import TargetPool
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy
+from datafarmer.llm.streaming import StreamOptions
+from datafarmer.llm.structured import ResponseSchema, StructuredOutputError
+from datafarmer.llm.transport import HttpTransport
+import asyncio
 import json
+import os
+import time
+import uuid
+import pandas as pd
 
 import warnings
 
 warnings.filterwarnings("ignore")
 
 
+class _StreamedResponse(NamedTuple):
+    """The parts of a response _generate_single reads, rebuilt from a stream."""
+
+    text: str
+    usage_metadata: Any
+
+
 class Gemini(BaseLLM):
+    _supports_streaming = True
+    _embedding_model = "text-embedding-005"
+    # Vertex AI limits of text-embedding-005: 250 texts and 20,000 tokens per request
+    _embed_batch_size = 250
+    _embed_batch_tokens = 20_000
+
     def __init__(
         self,
         project_id: str,
@@ -34,6 +63,17 @@ class Gemini(BaseLLM):
         max_attempts: int = 3,
         request_timeout: int = 60,
         client_kwargs: Optional[dict] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        batch_gcs_uri: Optional[str] = None,
+        metrics: Optional[Metrics] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+        targets: Optional[list[dict]] = None,
+        eject_seconds: float = 10.0,
+        media_cache_mb: float = 256,
+        upload_threshold_mb: Optional[float] = None,
+        context_cache_ttl: Optional[int] = None,
+        transport: Optional[HttpTransport] = None,
     ):
         """Initialize the Gemini class.
 
@@ -55,8 +95,52 @@ class Gemini(BaseLLM):
                 ``api_key``). Only used when ``google_sdk_version='genai'``. Keys here override
                 the defaults (``vertexai=True``, ``project=project_id``, ``location='us-central1'``).
                 Defaults to None.
+            rate_limiter (Optional[RateLimiter], optional): client-side RPM/TPM limiter consulted before
+                every request. Share one instance across LLMs that use the same quota. Defaults to None.
+            cache (Optional[ResponseCache], optional): persistent response cache, hits skip the API call
+                entirely. Defaults to None.
+            batch_gcs_uri (Optional[str], optional): GCS prefix (``gs://bucket/path``) for batch job
+                input and output files, required by ``mode="batch"`` on Vertex AI. Defaults to None.
+            metrics (Optional[Metrics], optional): metrics hooks, defaults to an `InMemoryMetrics`
+                readable through `.metrics`. Defaults to None.
+            retry_policies (Optional[dict[str, RetryPolicy]], optional): backoff per error class
+                ("rate_limit", "server_error", "timeout", "connection", "parse_error", "other"),
+                classes without a policy use `min_wait` / `max_wait`. Defaults to None.
+            targets (Optional[list[dict]], optional): pool of projects / regions / credentials to
+                spread requests over, e.g. ``[{"project": "a", "location": "us-central1"},
+                {"project": "b", "location": "europe-west4", "credentials": creds, "weight": 2}]``.
+                Every target gets its own client (keys are ``genai.Client`` kwargs on top of
+                `client_kwargs`, plus an optional ``weight``). Requests go to the target with the
+                fewest outstanding requests per weight, targets answering 429 / 5xx are ejected
+                for a while. Only used when ``google_sdk_version='genai'``. Defaults to None.
+            eject_seconds (float, optional): first ejection time of a failing target, doubled on
+                consecutive failures. Defaults to 10.0.
+            media_cache_mb (float, optional): size of the in-memory LRU cache of audio and image
+                files, so a file used by many rows is read once. Defaults to 256.
+            upload_threshold_mb (Optional[float], optional): files at least this large are uploaded
+                once with the Files API and referenced by URI from every row that uses them.
+                Gemini Developer API only, on Vertex AI use ``gs://`` paths instead. Defaults to
+                None (always send the bytes inline).
+            context_cache_ttl (Optional[int], optional): cache the system instruction (and tools)
+                as a Gemini cached content that lives this many seconds, created on the first
+                request and refreshed while the run goes on, so every row reuses the processed
+                prefix. Cache hits are reported to `metrics`. Only used when
+                ``google_sdk_version='genai'``. Defaults to None (no context caching).
+            transport (Optional[HttpTransport], optional): connection pool settings (size,
+                keep-alive, HTTP/2, connect and pool timeouts) of the async ``httpx`` client, shared
+                by all `targets` and by other LLMs given the same instance. Only used when
+                ``google_sdk_version='genai'``. Defaults to None (the SDK default client).
         """
-        super().__init__(min_wait=min_wait, max_wait=max_wait, max_attempts=max_attempts, request_timeout=request_timeout)
+        super().__init__(
+            min_wait=min_wait,
+            max_wait=max_wait,
+            max_attempts=max_attempts,
+            request_timeout=request_timeout,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            metrics=metrics,
+            retry_policies=retry_policies,
+        )
 
         assert google_sdk_version in [
             "genai",
@@ -71,10 +155,29 @@ class Gemini(BaseLLM):
         self.system_instruction = system_instruction
         self.tools = tools
         self.client_kwargs = client_kwargs or {}
+        self.batch_gcs_uri = batch_gcs_uri
+        self.targets = targets
+        self.target_pool = None
+        self.media_cache = MediaCache(media_cache_mb)
+        self.upload_threshold_mb = upload_threshold_mb
+        self._uploads: dict[tuple, asyncio.Future] = {}
+        self.context_cache_ttl = context_cache_ttl
+        self._context_caches: dict[tuple, dict] = {}
+
+        self.transport = transport
+
+        assert context_cache_ttl is None or google_sdk_version == "genai", (
+            "context_cache_ttl requires google_sdk_version='genai'"
+        )
+        assert transport is None or google_sdk_version == "genai", (
+            "transport requires google_sdk_version='genai'"
+        )
 
         match self.google_sdk_version:
             case "vertex":
                 vertexai.init(project=project_id)
+                # embeddings go through the google-genai client
+                self._embedding_model = None
 
                 self.generative_model = GenerativeModel(
                     model_name=self.gemini_version,
@@ -91,36 +194,299 @@ class Gemini(BaseLLM):
                     "location": "us-central1",
                 }
                 client_kwargs.update(self.client_kwargs)
+                if transport is not None:
+                    http_options = client_kwargs.get("http_options") or {}
+                    if isinstance(http_options, genai_types.HttpOptions):
+                        http_options = http_options.model_dump(exclude_none=True)
+                    client_kwargs["http_options"] = {
+                        **http_options,
+                        "httpx_async_client": transport.get_client(timeout=request_timeout),
+                    }
                 self.client = genai.Client(**client_kwargs)
 
-    @staticmethod
-    def _get_binary_file_part(
-        file_path: str, file_type: str = "audio", *args, **kwargs
-    ) -> Part:
-        """Return the Part Class from the given file.
+                if targets:
+                    self.clients = []
+                    for target in targets:
+                        target_kwargs = {**client_kwargs, **target}
+                        target_kwargs.pop("weight", None)
+                        self.clients.append(genai.Client(**target_kwargs))
+                    self.client = self.clients[0]
+                    self.target_pool = TargetPool(
+                        names=[
+                            f"{target.get('project', self.project_id)}/"
+                            f"{target.get('location', client_kwargs.get('location'))}#{i}"
+                            for i, target in enumerate(targets)
+                        ],
+                        weights=[target.get("weight", 1.0) for target in targets],
+                        eject_seconds=eject_seconds,
+                    )
+
+    def _get_model_name(self, **kwargs) -> str:
+        return kwargs.get("model", self.gemini_version)
+
+    def _get_batch_backend(self) -> BatchBackend:
+        assert self.google_sdk_version == "genai", "mode='batch' requires google_sdk_version='genai'"
+        return GeminiBatchBackend(self)
+
+    async def _upload_file(self, file_path: str, file_type: str) -> genai_types.File:
+        """Upload a file with the Files API once, every later call reuses the uploaded file."""
+
+        async def upload() -> genai_types.File:
+            header = await asyncio.to_thread(read_header, file_path)
+            logger.info(f"📤 Uploading {file_type} file {file_path}")
+            return await self.client.aio.files.upload(
+                file=file_path,
+                config=genai_types.UploadFileConfig(
+                    mime_type=guess_mime_type(file_path, header, file_type)
+                ),
+            )
+
+        stat = await asyncio.to_thread(os.stat, file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+        if key not in self._uploads:
+            self._uploads[key] = asyncio.ensure_future(upload())
+
+        try:
+            return await asyncio.shield(self._uploads[key])
+        except Exception:
+            # let the next row try the upload again
+            self._uploads.pop(key, None)
+            raise
+
+    async def _get_file_part(self, file_path: str, file_type: str = "audio"):
+        """Return the content part of an audio or image file without blocking the event loop.
+
+        ``gs://`` and ``https://`` paths are referenced by URI, large files are uploaded once when
+        `upload_threshold_mb` is set, other files are read through the media cache.
 
         Args:
-            file_path (str): the file path
+            file_path (str): the file path or URI
             file_type (str): file type. Defaults to "audio". It can be either "audio" or "image"
         """
         assert file_type in ["audio", "image"], (
             "type should be either 'audio' or 'image'"
         )
+        is_genai = self.google_sdk_version == "genai"
+
+        if file_path.startswith(("gs://", "https://", "http://")):
+            mime_type = guess_mime_type(file_path, file_type=file_type)
+            if is_genai:
+                return genai_types.Part.from_uri(file_uri=file_path, mime_type=mime_type)
+            return Part.from_uri(file_path, mime_type=mime_type)
+
+        if (
+            is_genai
+            and self.upload_threshold_mb is not None
+            and not self.client.vertexai
+            and (await asyncio.to_thread(os.stat, file_path)).st_size
+            >= self.upload_threshold_mb * 1024 * 1024
+        ):
+            uploaded = await self._upload_file(file_path, file_type)
+            return genai_types.Part.from_uri(file_uri=uploaded.uri, mime_type=uploaded.mime_type)
+
+        data, mime_type = await self.media_cache.load(file_path, file_type)
+        if is_genai:
+            return genai_types.Part.from_bytes(data=data, mime_type=mime_type)
+        return Part.from_data(mime_type=mime_type, data=data)
+
+    async def _create_context_cache(self, client: genai.Client, model: str, prefix: dict) -> Optional[str]:
+        """Create the cached content of a prompt prefix, None when the prefix can't be cached."""
+        try:
+            cached_content = await client.aio.caches.create(
+                model=model,
+                config=genai_types.CreateCachedContentConfig(
+                    **prefix, ttl=f"{self.context_cache_ttl}s", display_name="datafarmer"
+                ),
+            )
+        except Exception as e:
+            # e.g. a prefix below the minimum cacheable size, rows are sent without the cache
+            logger.warning(f"⚠️ Context caching disabled for {model}: {str(e)}")
+            return None
+
+        logger.info(f"🗄️ Created context cache {cached_content.name} for {model}")
+        usage = cached_content.usage_metadata
+        if usage is not None and usage.total_token_count:
+            self.metrics.on_prompt_cache(model, read_tokens=0, write_tokens=usage.total_token_count)
+        return cached_content.name
+
+    async def _refresh_context_cache(self, client: genai.Client, key: tuple, name: str) -> None:
+        """Extend the TTL of a cached content, dropping it when it is gone so it is created again."""
+        entry = self._context_caches[key]
+        try:
+            await client.aio.caches.update(
+                name=name,
+                config=genai_types.UpdateCachedContentConfig(ttl=f"{self.context_cache_ttl}s"),
+            )
+            entry["expire_at"] = time.monotonic() + self.context_cache_ttl
+        except Exception as e:
+            logger.warning(f"⚠️ Failed to refresh context cache {name}: {str(e)}")
+            self._context_caches.pop(key, None)
+        finally:
+            entry["refresh"] = None
+
+    async def _apply_context_cache(self, client: genai.Client, request: dict) -> dict:
+        """Move the system instruction and tools of a request into a cached content.
+
+        One cached content is kept per client, model and prefix. It is created by the first
+        request that needs it (concurrent requests wait for the same creation), and refreshed in
+        the background once half of its TTL has passed.
+        """
+        config = request.get("config")
+        if config is None:
+            config = genai_types.GenerateContentConfig()
+        elif isinstance(config, dict):
+            config = genai_types.GenerateContentConfig.model_validate(config)
+        if config.system_instruction is None and self.system_instruction:
+            config = config.model_copy(update=dict(system_instruction=self.system_instruction))
+        if config.system_instruction is None or config.cached_content is not None:
+            return request
+
+        prefix = dict(
+            system_instruction=config.system_instruction,
+            tools=config.tools,
+            tool_config=config.tool_config,
+        )
+        key = (
+            id(client),
+            request["model"],
+            config.model_dump_json(include=set(prefix), exclude_none=True),
+        )
+
+        now = time.monotonic()
+        entry = self._context_caches.get(key)
+        if entry is None or (entry["future"].done() and entry["expire_at"] <= now):
+            entry = self._context_caches[key] = dict(
+                future=asyncio.ensure_future(self._create_context_cache(client, request["model"], prefix)),
+                expire_at=now + self.context_cache_ttl,
+                refresh=None,
+            )
+
+        name = await asyncio.shield(entry["future"])
+        if name is None:
+            return {**request, "config": config}
 
-        mime = dict(
-            audio="audio/mp3",
-            image="image/jpeg",
+        if (
+            entry["refresh"] is None
+            and entry["expire_at"] - time.monotonic() < self.context_cache_ttl / 2
+        ):
+            entry["refresh"] = asyncio.ensure_future(self._refresh_context_cache(client, key, name))
+
+        config = config.model_copy(
+            update=dict(cached_content=name, system_instruction=None, tools=None, tool_config=None)
         )
+        return {**request, "config": config}
+
+    async def _collect_stream(
+        self, responses: AsyncIterator, stream: StreamOptions, model: str, started_at: float
+    ) -> _StreamedResponse:
+        """Read a streamed response until it ends or a stop condition closes it."""
+        usage = None
+
+        async def chunks():
+            nonlocal usage
+            try:
+                async for response in responses:
+                    # the last chunk carries the usage of the whole response
+                    usage = getattr(response, "usage_metadata", None) or usage
+                    try:
+                        yield response.text
+                    except ValueError:
+                        # a vertex chunk without text parts, e.g. only the finish reason
+                        continue
+            finally:
+                if hasattr(responses, "aclose"):
+                    await responses.aclose()
+
+        text = await stream.collect(chunks(), model, self.metrics, started_at)
+        return _StreamedResponse(text, usage)
+
+    async def _call_client(self, client: genai.Client, stream: Optional[StreamOptions], **request):
+        """Call generate_content on a client, or generate_content_stream with a stream."""
+        if self.context_cache_ttl is not None:
+            request = await self._apply_context_cache(client, request)
+        if stream is None:
+            return await client.aio.models.generate_content(**request)
 
-        with open(file_path, "rb") as f:
-            binary = f.read()
+        started_at = time.perf_counter()
+        responses = await client.aio.models.generate_content_stream(**request)
+        return await self._collect_stream(responses, stream, request["model"], started_at)
 
-        file_part = Part.from_data(
-            mime_type=mime.get(file_type),
-            data=binary,
+    async def _generate_content(self, stream: Optional[StreamOptions] = None, **request):
+        """Call generate_content on the client, or on a target of the pool when there is one."""
+        if self.target_pool is None:
+            return await self._call_client(self.client, stream, **request)
+
+        index = self.target_pool.acquire()
+        started_at = time.perf_counter()
+        try:
+            response = await self._call_client(self.clients[index], stream, **request)
+        except BaseException as e:
+            # a cancelled request (or interpreter exit) says nothing about the target
+            self.target_pool.release(
+                index,
+                time.perf_counter() - started_at,
+                e if isinstance(e, Exception) else None,
+                cancelled=not isinstance(e, Exception),
+            )
+            raise
+        self.target_pool.release(index, time.perf_counter() - started_at)
+        return response
+
+    def target_stats(self) -> pd.DataFrame:
+        """Return per-target request, failure, ejection and latency counters of the pool."""
+        assert self.target_pool is not None, "target_stats requires `targets`"
+        return pd.DataFrame(self.target_pool.stats())
+
+    @staticmethod
+    def _with_response_schema(
+        generation_config: Optional[GenerateContentConfig | dict], response_schema: ResponseSchema
+    ) -> GenerateContentConfig:
+        """Ask for JSON of the response schema, unless the config already sets a schema."""
+        if generation_config is None:
+            generation_config = GenerateContentConfig()
+        elif isinstance(generation_config, dict):
+            generation_config = GenerateContentConfig.model_validate(generation_config)
+        if (
+            generation_config.response_schema is not None
+            or generation_config.response_json_schema is not None
+        ):
+            return generation_config
+
+        update = dict(response_mime_type="application/json")
+        if response_schema.model is not None:
+            update["response_schema"] = response_schema.model
+        else:
+            update["response_json_schema"] = response_schema.json_schema
+        return generation_config.model_copy(update=update)
+
+    async def _embed_batch(
+        self,
+        texts: list[str],
+        model: str,
+        dimensions: Optional[int] = None,
+        task_type: Optional[str] = None,
+        **kwargs,
+    ) -> list[list[float]]:
+        """Embed a batch with embed_content, `task_type` is e.g. "RETRIEVAL_DOCUMENT"."""
+        response = await self.client.aio.models.embed_content(
+            model=model,
+            contents=texts,
+            config=genai_types.EmbedContentConfig(
+                task_type=task_type, output_dimensionality=dimensions
+            ),
         )
-        logger.info(f"📦 Loaded {file_type} file from {file_path}")
-        return file_part
+        return [embedding.values for embedding in response.embeddings]
+
+    async def _count_tokens(self, prompt: str, **kwargs) -> Optional[int]:
+        """Count the input tokens of a prompt with the Gemini count_tokens endpoint."""
+        match self.google_sdk_version:
+            case "vertex":
+                response = await self.generative_model.count_tokens_async(prompt)
+            case "genai":
+                response = await self.client.aio.models.count_tokens(
+                    model=kwargs.get("model", self.gemini_version), contents=prompt
+                )
+        return response.total_tokens
 
     async def _generate_single(
         self, id: str, prompt: str, **kwargs
@@ -130,7 +496,8 @@ class Gemini(BaseLLM):
         Args:
             id (str): identifier for this prompt
             prompt (str): the prompt text
-            **kwargs: supports audio_file_path, image_file_path, generation_config, model
+            **kwargs: supports audio_file_path, image_file_path, generation_config, model,
+                response_schema, stream (a `StreamOptions`)
 
         Returns:
             tuple[str, str, bool]: (id, response_text, is_succeeded)
@@ -141,35 +508,48 @@ class Gemini(BaseLLM):
             if kwargs.get("generation_config") is None
             else kwargs.get("generation_config")
         )
+        response_schema = kwargs.get("response_schema")
+        if response_schema is not None and self.google_sdk_version == "genai":
+            generation_config = self._with_response_schema(generation_config, response_schema)
 
         for key, value in kwargs.items():
             if key == "audio_file_path":
-                audio_part = self._get_binary_file_part(
-                    file_path=value, file_type="audio"
-                )
-                contents.append(audio_part)
+                contents.append(await self._get_file_part(file_path=value, file_type="audio"))
             elif key == "image_file_path":
-                image_part = self._get_binary_file_part(
-                    file_path=value, file_type="image"
-                )
-                contents.append(image_part)
+                contents.append(await self._get_file_part(file_path=value, file_type="image"))
 
+        stream = kwargs.get("stream")
         match self.google_sdk_version:
             case "vertex":
+                started_at = time.perf_counter()
                 response = await self.generative_model.generate_content_async(
                     contents,
                     generation_config=generation_config,
                     safety_settings=self.safety_settings,
-                    stream=False,
+                    stream=stream is not None,
                 )
+                if stream is not None:
+                    response = await self._collect_stream(
+                        response, stream, self.gemini_version, started_at
+                    )
 
             case "genai":
-                response = await self.client.aio.models.generate_content(
+                response = await self._generate_content(
                     model=kwargs.get("model", self.gemini_version),
-                    contents=prompt,
+                    contents=contents,
                     config=generation_config,
+                    stream=stream,
                 )
 
+        usage = getattr(response, "usage_metadata", None)
+        cached_tokens = getattr(usage, "cached_content_token_count", None) or 0
+        if usage is not None and (self.context_cache_ttl is not None or cached_tokens):
+            self.metrics.on_prompt_cache(
+                self._get_model_name(**kwargs),
+                read_tokens=cached_tokens,
+                uncached_tokens=(usage.prompt_token_count or 0) - cached_tokens,
+            )
+
         response = response.text
 
         is_json_response = (
@@ -180,10 +560,137 @@ class Gemini(BaseLLM):
             and generation_config.get("response_mime_type") == "application/json"
         )
 
-        if is_json_response:
+        # with a response_schema the engine parses and validates the response itself
+        if is_json_response and response_schema is None:
             try:
                 json.loads(response)
             except Exception:
-                raise ValueError(f"Failed to parse JSON response, Id: {id}")
+                raise StructuredOutputError(f"Failed to parse JSON response, Id: {id}")
 
         return id, response, True
+
+
+class GeminiBatchBackend(BatchBackend):
+    """Gemini batch prediction backend (genai SDK).
+
+    On Vertex AI the requests are written as JSONL to ``batch_gcs_uri`` and the predictions are
+    read back from GCS, otherwise (Gemini Developer API) they are sent inline.
+    """
+
+    poll_interval = 60.0
+    # batch requests only carry the text prompt
+    unsupported_kwargs = ("audio_file_path", "image_file_path")
+
+    def __init__(self, llm: Gemini):
+        self.llm = llm
+        self.is_vertex = bool(llm.client.vertexai)
+        self.max_batch_size = 100_000 if self.is_vertex else 1_000
+        self._jobs = {}
+
+        assert not self.is_vertex or llm.batch_gcs_uri, (
+            "batch_gcs_uri is required for mode='batch' on Vertex AI"
+        )
+
+    def _get_config(self, kwargs: dict) -> Optional[dict]:
+        generation_config = kwargs.get("generation_config") or self.llm.generation_config
+        if generation_config is None:
+            return None
+        if hasattr(generation_config, "model_dump"):
+            return generation_config.model_dump(mode="json", exclude_none=True)
+        return dict(generation_config)
+
+    def _get_request(self, position: int, prompt: str, kwargs: dict) -> dict:
+        """Build a Vertex AI batch prediction input line."""
+        request = {"contents": [{"role": "user", "parts": [{"text": prompt}]}]}
+        config = self._get_config(kwargs) or {}
+        for key in ["system_instruction", "safety_settings", "tools"]:
+            if key in config:
+                request[key] = config.pop(key)
+        if self.llm.system_instruction and "system_instruction" not in request:
+            request["system_instruction"] = {"parts": [{"text": self.llm.system_instruction}]}
+        if config:
+            request["generation_config"] = config
+        # the label carries the position, prediction output order is not guaranteed
+        request["labels"] = {"datafarmer_row": str(position)}
+        return {"request": request}
+
+    async def submit(self, requests: list[tuple[str, dict]]) -> str:
+        model = requests[0][1].get("model", self.llm.gemini_version)
+
+        if not self.is_vertex:
+            job = await self.llm.client.aio.batches.create(
+                model=model,
+                src=[
+                    InlinedRequest(
+                        contents=prompt,
+                        config=self._get_config(kwargs),
+                        metadata={"datafarmer_row": str(position)},
+                    )
+                    for position, (prompt, kwargs) in enumerate(requests)
+                ],
+            )
+            return job.name
+
+        from google.cloud import storage
+
+        prefix = f"{self.llm.batch_gcs_uri.rstrip('/')}/datafarmer-{uuid.uuid4().hex}"
+        lines = "\n".join(
+            json.dumps(self._get_request(position, prompt, kwargs), ensure_ascii=False)
+            for position, (prompt, kwargs) in enumerate(requests)
+        )
+        blob = storage.Blob.from_string(
+            f"{prefix}/input.jsonl", client=storage.Client(project=self.llm.project_id)
+        )
+        await asyncio.to_thread(blob.upload_from_string, lines, "application/jsonl")
+
+        job = await self.llm.client.aio.batches.create(
+            model=model,
+            src=f"{prefix}/input.jsonl",
+            config=CreateBatchJobConfig(dest=f"{prefix}/output"),
+        )
+        return job.name
+
+    async def poll(self, job_id: str) -> str:
+        job = await self.llm.client.aio.batches.get(name=job_id)
+        self._jobs[job_id] = job
+        state = job.state.name if job.state is not None else ""
+        if state in ["JOB_STATE_SUCCEEDED", "JOB_STATE_PARTIALLY_SUCCEEDED"]:
+            return "succeeded"
+        if state in ["JOB_STATE_FAILED", "JOB_STATE_CANCELLED", "JOB_STATE_EXPIRED"]:
+            return "failed"
+        return "running"
+
+    async def results(self, job_id: str) -> AsyncIterator[tuple[int, str, bool]]:
+        job = self._jobs.pop(job_id)
+
+        if not self.is_vertex:
+            for position, item in enumerate(job.dest.inlined_responses or []):
+                if item.metadata and "datafarmer_row" in item.metadata:
+                    position = int(item.metadata["datafarmer_row"])
+                if item.error is None and item.response is not None:
+                    yield position, item.response.text, True
+                else:
+                    yield position, f"Error: {item.error}", False
+            return
+
+        from google.cloud import storage
+
+        client = storage.Client(project=self.llm.project_id)
+        bucket_name, _, prefix = job.dest.gcs_uri.removeprefix("gs://").partition("/")
+        blobs = await asyncio.to_thread(
+            lambda: list(client.list_blobs(bucket_name, prefix=prefix))
+        )
+        for blob in blobs:
+            if not blob.name.endswith(".jsonl"):
+                continue
+            content = await asyncio.to_thread(blob.download_as_text)
+            for line in content.splitlines():
+                if not line.strip():
+                    continue
+                prediction = json.loads(line)
+                position = int(prediction["request"]["labels"]["datafarmer_row"])
+                try:
+                    parts = prediction["response"]["candidates"][0]["content"]["parts"]
+                    yield position, "".join(part.get("text", "") for part in parts), True
+                except (KeyError, IndexError):
+                    yield position, f"Error: {prediction.get('status') or 'empty response'}", False
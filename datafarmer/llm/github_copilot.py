@@ -1,10 +1,23 @@
 import subprocess
+import time
+import numpy as np
 from typing import Optional
 from datafarmer.llm.base import BaseLLM
+from datafarmer.llm.cache import ResponseCache
+from datafarmer.llm.embedding import decode_base64_embeddings
+from datafarmer.llm.metrics import Metrics
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy
+from datafarmer.llm.transport import HttpTransport
 from datafarmer.utils import logger
 
 
 class GithubCopilot(BaseLLM):
+    _supports_streaming = True
+    _embedding_model = "text-embedding-3-small"
+    _embed_batch_size = 2048
+    _embed_batch_tokens = 300_000
+
     def __init__(
         self,
         model: str = "gpt-4o",
@@ -14,6 +27,11 @@ class GithubCopilot(BaseLLM):
         max_wait: int = 30,
         max_attempts: int = 3,
         request_timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[Metrics] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+        transport: Optional[HttpTransport] = None,
     ):
         """Initialize the GithubCopilot class.
 
@@ -28,8 +46,29 @@ class GithubCopilot(BaseLLM):
             max_wait (int, optional): maximum seconds between retries. Defaults to 30.
             max_attempts (int, optional): maximum number of retry attempts. Defaults to 3.
             request_timeout (int, optional): per-request timeout in seconds. Defaults to 30.
+            rate_limiter (Optional[RateLimiter], optional): client-side RPM/TPM limiter consulted before
+                every request. Share one instance across LLMs that use the same quota. Defaults to None.
+            cache (Optional[ResponseCache], optional): persistent response cache, hits skip the API call
+                entirely. Defaults to None.
+            metrics (Optional[Metrics], optional): metrics hooks, defaults to an `InMemoryMetrics`
+                readable through `.metrics`. Defaults to None.
+            retry_policies (Optional[dict[str, RetryPolicy]], optional): backoff per error class
+                ("rate_limit", "server_error", "timeout", "connection", "parse_error", "other"),
+                classes without a policy use `min_wait` / `max_wait`. Defaults to None.
+            transport (Optional[HttpTransport], optional): connection pool settings (size,
+                keep-alive, HTTP/2, connect and pool timeouts), one instance can be shared by
+                several LLMs so they share one pool. Defaults to None (the SDK default pool).
         """
-        super().__init__(min_wait=min_wait, max_wait=max_wait, max_attempts=max_attempts, request_timeout=request_timeout)
+        super().__init__(
+            min_wait=min_wait,
+            max_wait=max_wait,
+            max_attempts=max_attempts,
+            request_timeout=request_timeout,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            metrics=metrics,
+            retry_policies=retry_policies,
+        )
 
         try:
             import openai
@@ -41,9 +80,16 @@ class GithubCopilot(BaseLLM):
         self.model = model
         self.system_instruction = system_instruction
         self.token = github_token or self._get_github_token()
+        self.transport = transport
+        self.timeout = request_timeout
+        http_client = None
+        if transport is not None:
+            http_client = transport.get_client(openai.DefaultAsyncHttpxClient, request_timeout)
+            self.timeout = transport.timeout(request_timeout, openai.DefaultAsyncHttpxClient)
         self.client = openai.AsyncOpenAI(
             base_url="https://models.inference.ai.azure.com",
             api_key=self.token,
+            http_client=http_client,
         )
 
     @staticmethod
@@ -70,7 +116,7 @@ class GithubCopilot(BaseLLM):
         Args:
             id (str): identifier for this prompt
             prompt (str): the prompt text
-            **kwargs: unused, kept for interface compatibility
+            **kwargs: supports stream (a `StreamOptions`)
 
         Returns:
             tuple[str, str, bool]: (id, response_text, is_succeeded)
@@ -80,9 +126,43 @@ class GithubCopilot(BaseLLM):
             messages.append({"role": "system", "content": self.system_instruction})
         messages.append({"role": "user", "content": prompt})
 
+        stream = kwargs.get("stream")
+        started_at = time.perf_counter()
         response = await self.client.chat.completions.create(
             model=self.model,
             messages=messages,
-            timeout=self.request_timeout,
+            timeout=self.timeout,
+            **({"stream": True} if stream is not None else {}),
+        )
+        if stream is None:
+            return id, response.choices[0].message.content, True
+
+        async def chunks():
+            try:
+                async for chunk in response:
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        yield chunk.choices[0].delta.content
+            finally:
+                await response.close()
+
+        return id, await stream.collect(chunks(), self.model, self.metrics, started_at), True
+
+    async def _embed_batch(
+        self, texts: list[str], model: str, dimensions: Optional[int] = None, **kwargs
+    ) -> np.ndarray | list[list[float]]:
+        """Embed a batch with the OpenAI-compatible embeddings endpoint.
+
+        Vectors are requested as base64 and decoded straight into a float32 matrix.
+        """
+        response = await self.client.embeddings.create(
+            model=model,
+            input=texts,
+            encoding_format="base64",
+            timeout=self.timeout,
+            **({"dimensions": dimensions} if dimensions is not None else {}),
         )
-        return id, response.choices[0].message.content, True
+        values = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        if values and isinstance(values[0], str):
+            return decode_base64_embeddings(values)
+        # endpoints that ignore encoding_format answer with floats
+        return values
@@ -0,0 +1,100 @@
+from typing import Any
+import json
+import os
+import time
+from datafarmer.utils import logger
+
+
+def _to_json_id(id: Any) -> Any:
+    """Convert numpy scalars (e.g. int64 ids from pandas) to plain python values."""
+    return id.item() if hasattr(id, "item") else id
+
+
+class Journal:
+    def __init__(self, path: str, flush_every: int = 200, flush_interval: float = 2.0):
+        """Append-only JSONL journal of completed generations, used to resume long runs.
+
+        Every completed `(id, result)` is buffered and written in batches, each batch is
+        fsynced so a crash loses at most the last unflushed batch.
+
+        Args:
+            path (str): journal file path, created if it doesn't exist
+            flush_every (int, optional): flush once this many records are buffered. Defaults to 200.
+            flush_interval (float, optional): flush when the oldest buffered record is older than
+                this many seconds. Defaults to 2.0.
+        """
+        self.path = os.path.expanduser(path)
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+
+        self._buffer: list[str] = []
+        self._last_flush = time.monotonic()
+        self._file = None
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __getstate__(self) -> dict:
+        self.flush()
+        state = self.__dict__.copy()
+        state["_file"] = None
+        return state
+
+    def load(self) -> dict:
+        """Return the `{id: result}` records already in the journal.
+
+        A torn last line (e.g. from a crash in the middle of a write) is skipped.
+        """
+        completed = {}
+        if not os.path.exists(self.path):
+            return completed
+
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"🚧 Skipping a corrupted line in journal {self.path}")
+                    continue
+                completed[record["id"]] = record["result"]
+
+        return completed
+
+    def append(self, id: Any, result: str) -> None:
+        """Buffer one completed record, flushing when the batch is full or old enough."""
+        if not self._buffer:
+            self._last_flush = time.monotonic()
+        self._buffer.append(
+            json.dumps({"id": _to_json_id(id), "result": result}, ensure_ascii=False) + "\n"
+        )
+
+        if (
+            len(self._buffer) >= self.flush_every
+            or time.monotonic() - self._last_flush >= self.flush_interval
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """Write and fsync the buffered records."""
+        if not self._buffer:
+            return
+
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+
+        self._file.write("".join(self._buffer))
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        """Flush the remaining records and close the file."""
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from typing import Optional
+import asyncio
+import mimetypes
+import os
+
+# (offset, magic bytes, mime type), checked before the file extension
+_MAGIC_NUMBERS = [
+    (0, b"\x89PNG\r\n\x1a\n", "image/png"),
+    (0, b"\xff\xd8\xff", "image/jpeg"),
+    (0, b"GIF87a", "image/gif"),
+    (0, b"GIF89a", "image/gif"),
+    (0, b"%PDF-", "application/pdf"),
+    (0, b"ID3", "audio/mpeg"),
+    (0, b"\xff\xfb", "audio/mpeg"),
+    (0, b"\xff\xf3", "audio/mpeg"),
+    (0, b"\xff\xf2", "audio/mpeg"),
+    (0, b"fLaC", "audio/flac"),
+    (0, b"OggS", "audio/ogg"),
+    (4, b"ftypM4A", "audio/mp4"),
+    (4, b"ftyp", "video/mp4"),
+]
+_RIFF_TYPES = {b"WAVE": "audio/wav", b"WEBP": "image/webp", b"AVI ": "video/x-msvideo"}
+_DEFAULT_MIME_TYPES = dict(audio="audio/mpeg", image="image/jpeg")
+
+
+def guess_mime_type(file_path: str, header: bytes = b"", file_type: Optional[str] = None) -> str:
+    """Detect the MIME type of a media file from its first bytes, then from its extension.
+
+    Args:
+        file_path (str): file path or URI
+        header (bytes, optional): the first bytes of the file. Defaults to b"".
+        file_type (Optional[str], optional): "audio" or "image", used as the fallback when the
+            type can't be detected. Defaults to None.
+
+    Returns:
+        str: MIME type, "application/octet-stream" when unknown
+    """
+    if header[:4] == b"RIFF" and header[8:12] in _RIFF_TYPES:
+        return _RIFF_TYPES[header[8:12]]
+    for offset, magic, mime_type in _MAGIC_NUMBERS:
+        if header[offset : offset + len(magic)] == magic:
+            return mime_type
+
+    mime_type, _ = mimetypes.guess_type(file_path)
+    if mime_type is not None:
+        return mime_type
+    return _DEFAULT_MIME_TYPES.get(file_type, "application/octet-stream")
+
+
+def read_header(file_path: str, size: int = 16) -> bytes:
+    """Return the first bytes of a file, enough for guess_mime_type."""
+    with open(file_path, "rb") as f:
+        return f.read(size)
+
+
+class MediaCache:
+    def __init__(self, max_size_mb: float = 256):
+        """LRU cache of media files read off the event loop.
+
+        Files are read in a worker thread, concurrent loads of the same file share one read, and
+        an entry is keyed by path, size and modification time so an edited file is read again.
+
+        Args:
+            max_size_mb (float, optional): total size of the cached files, 0 disables caching.
+                Defaults to 256.
+        """
+        self.max_size = int(max_size_mb * 1024 * 1024)
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, tuple[bytes, str]] = OrderedDict()
+        self._loading: dict[tuple, asyncio.Future] = {}
+
+    def __getstate__(self) -> dict:
+        # a worker process starts with an empty cache
+        return dict(max_size=self.max_size, size=0, hits=0, misses=0, _entries=OrderedDict(), _loading={})
+
+    @staticmethod
+    def _read(file_path: str, file_type: Optional[str]) -> tuple[bytes, str]:
+        with open(file_path, "rb") as f:
+            data = f.read()
+        return data, guess_mime_type(file_path, data[:16], file_type)
+
+    def _put(self, key: tuple, value: tuple[bytes, str]) -> None:
+        size = len(value[0])
+        if size > self.max_size:
+            return
+        self._entries[key] = value
+        self.size += size
+        while self.size > self.max_size:
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    async def load(self, file_path: str, file_type: Optional[str] = None) -> tuple[bytes, str]:
+        """Return the bytes and MIME type of a file.
+
+        Args:
+            file_path (str): file path
+            file_type (Optional[str], optional): "audio" or "image", the MIME type fallback.
+                Defaults to None.
+
+        Returns:
+            tuple[bytes, str]: (data, mime_type)
+        """
+        stat = await asyncio.to_thread(os.stat, file_path)
+        key = (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns)
+
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        if key in self._loading:
+            self.hits += 1
+            return await asyncio.shield(self._loading[key])
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await asyncio.to_thread(self._read, file_path, file_type)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                # nobody else may be waiting for it
+                future.exception()
+            raise
+        finally:
+            self._loading.pop(key, None)
+
+        self._put(key, value)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> dict:
+        """Return hits, misses, number of entries and size in MB."""
+        return dict(
+            hits=self.hits,
+            misses=self.misses,
+            entries=len(self._entries),
+            size_mb=self.size / 1024 / 1024,
+        )
@@ -0,0 +1,641 @@
+from bisect import bisect_left
+from typing import Optional
+import time
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+ATTEMPT_BUCKETS = (1, 2, 3, 4, 5, 6, 8, 10)
+INTER_CHUNK_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+class _Histogram:
+    """Fixed-bucket histogram, one bisect and two additions per observation."""
+
+    def __init__(self, bounds: tuple = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate quantile, linearly interpolated inside the bucket."""
+        if self.count == 0:
+            return None
+
+        rank = q * self.count
+        seen = 0
+        for i, count in enumerate(self.counts):
+            if count and seen + count >= rank:
+                lower = self.bounds[i - 1] if i > 0 else 0.0
+                upper = self.bounds[i] if i < len(self.bounds) else self.bounds[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.bounds[-1]
+
+    def since(self, earlier: Optional["_Histogram"]) -> "_Histogram":
+        """Return the observations made after `earlier`, a copy of this histogram at that time."""
+        histogram = _Histogram(self.bounds)
+        histogram.counts = list(self.counts)
+        histogram.sum, histogram.count = self.sum, self.count
+        if earlier is not None:
+            histogram.counts = [now - then for now, then in zip(self.counts, earlier.counts)]
+            histogram.sum -= earlier.sum
+            histogram.count -= earlier.count
+        return histogram
+
+    def merge(self, other: "_Histogram") -> None:
+        """Add the observations of a histogram with the same bounds."""
+        self.counts = [mine + theirs for mine, theirs in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def cumulative_counts(self) -> list[int]:
+        total, cumulative = 0, []
+        for count in self.counts:
+            total += count
+            cumulative.append(total)
+        return cumulative
+
+
+class Metrics:
+    """Hook interface the engine reports to, every hook is a no-op.
+
+    Subclass it and override the hooks to forward the events to another metrics backend.
+    Hooks are called from the event loop, so they should never block.
+    """
+
+    def on_request_start(self, model: str) -> None:
+        """A provider call is about to be sent."""
+
+    def on_request_end(
+        self,
+        model: str,
+        status: str,
+        seconds: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        """A provider call finished with status "succeeded" or "failed"."""
+
+    def on_retry(self, model: str, category: str, wait: float = 0.0) -> None:
+        """A failed attempt is retried after sleeping `wait` seconds, `category` is the error class."""
+
+    def on_parse_error(self, model: str) -> None:
+        """A response didn't match the response schema, the attempt is retried."""
+
+    def on_result(self, status: str, attempts: int, latency_ms: Optional[float]) -> None:
+        """A row finished, after all its attempts."""
+
+    def on_queue_wait(self, seconds: float) -> None:
+        """A row waited this long for a free concurrency slot."""
+
+    def on_limiter_wait(self, model: str, seconds: float) -> None:
+        """A request waited this long in the rate limiter."""
+
+    def on_pool_wait(self, model: str, seconds: float, new_connection: bool) -> None:
+        """A request waited this long for a connection of the HTTP client pool, `new_connection`
+        is False when it reused a kept-alive one."""
+
+    def on_stream(
+        self,
+        model: str,
+        ttft: Optional[float],
+        inter_chunk: Optional[float],
+        chunks: int,
+        stopped: bool,
+    ) -> None:
+        """A streamed response finished: seconds to the first chunk, mean seconds between chunks,
+        and whether a stop condition cut it short."""
+
+    def on_cache(self, hit: bool) -> None:
+        """A response cache lookup."""
+
+    def on_prompt_cache(
+        self, model: str, read_tokens: int, write_tokens: int = 0, uncached_tokens: int = 0
+    ) -> None:
+        """Provider prompt-prefix cache usage of a call: input tokens read from the cache, written
+        to it, and processed without it."""
+
+    def on_run_start(self) -> None:
+        """A generate call starts, the `summary` logged at its end covers only this run."""
+
+    def merge(self, other: "Metrics") -> None:
+        """Add the request-level metrics another instance recorded in a worker process.
+
+        Row-level metrics are not merged, the parent process records them from the returned
+        results through `on_result`.
+        """
+
+    def summary(self) -> Optional[str]:
+        """One line logged at the end of every run, None to log nothing."""
+        return None
+
+
+class InMemoryMetrics(Metrics):
+    def __init__(self):
+        """Default metrics backend, keeps counters and fixed-bucket histograms in memory.
+
+        Recording is a handful of dict and list updates per request, cheap enough to leave on
+        at thousands of requests per second. Read it with `snapshot()`, or export it with
+        `to_prometheus()` / `to_otlp()`.
+        """
+        self.reset()
+
+    def reset(self) -> None:
+        """Drop everything recorded so far."""
+        self.request_latency: dict[str, _Histogram] = {}
+        self.requests: dict[tuple[str, str], int] = {}
+        self.retries: dict[tuple[str, str], int] = {}
+        self.retry_wait: dict[str, float] = {}
+        self.parse_errors: dict[str, int] = {}
+        self.in_flight: dict[str, int] = {}
+        self.peak_in_flight = 0
+        self.rows: dict[str, int] = {}
+        self.row_latency = _Histogram()
+        self.attempts = _Histogram(ATTEMPT_BUCKETS)
+        self.queue_wait = _Histogram()
+        self.limiter_wait = _Histogram()
+        self.pool_wait = _Histogram()
+        self.ttft: dict[str, _Histogram] = {}
+        self.inter_chunk = _Histogram(INTER_CHUNK_BUCKETS)
+        self.streams = dict(completed=0, stopped=0)
+        self.connections = dict(new=0, reused=0)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.prompt_cache_hits = 0
+        self.prompt_cache_misses = 0
+        self.prompt_cache_tokens = dict(read=0, write=0, uncached=0)
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.started_at: Optional[float] = None
+        self.updated_at: Optional[float] = None
+        # wall clock start of the cumulative series, the OTLP startTimeUnixNano
+        self.reset_at_ns = time.time_ns()
+        # cumulative values when the current run started, see on_run_start
+        self._run: Optional[dict] = None
+        self.run_peak_in_flight = 0
+
+    def _touch(self) -> None:
+        now = time.monotonic()
+        if self.started_at is None:
+            self.started_at = now
+        self.updated_at = now
+
+    def on_request_start(self, model: str) -> None:
+        self._touch()
+        in_flight = self.in_flight.get(model, 0) + 1
+        self.in_flight[model] = in_flight
+        total_in_flight = sum(self.in_flight.values())
+        self.peak_in_flight = max(self.peak_in_flight, total_in_flight)
+        self.run_peak_in_flight = max(self.run_peak_in_flight, total_in_flight)
+
+    def on_request_end(
+        self,
+        model: str,
+        status: str,
+        seconds: float,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+    ) -> None:
+        self._touch()
+        self.in_flight[model] = self.in_flight.get(model, 1) - 1
+        key = (model, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        histogram = self.request_latency.get(model)
+        if histogram is None:
+            histogram = self.request_latency[model] = _Histogram()
+        histogram.observe(seconds)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+
+    def on_retry(self, model: str, category: str, wait: float = 0.0) -> None:
+        key = (model, category)
+        self.retries[key] = self.retries.get(key, 0) + 1
+        self.retry_wait[category] = self.retry_wait.get(category, 0.0) + wait
+
+    def on_parse_error(self, model: str) -> None:
+        self.parse_errors[model] = self.parse_errors.get(model, 0) + 1
+
+    def on_result(self, status: str, attempts: int, latency_ms: Optional[float]) -> None:
+        self._touch()
+        self.rows[status] = self.rows.get(status, 0) + 1
+        if attempts:
+            self.attempts.observe(attempts)
+        if latency_ms is not None:
+            self.row_latency.observe(latency_ms / 1000)
+
+    def on_queue_wait(self, seconds: float) -> None:
+        self.queue_wait.observe(seconds)
+
+    def on_limiter_wait(self, model: str, seconds: float) -> None:
+        self.limiter_wait.observe(seconds)
+
+    def on_pool_wait(self, model: str, seconds: float, new_connection: bool) -> None:
+        self.pool_wait.observe(seconds)
+        self.connections["new" if new_connection else "reused"] += 1
+
+    def on_stream(
+        self,
+        model: str,
+        ttft: Optional[float],
+        inter_chunk: Optional[float],
+        chunks: int,
+        stopped: bool,
+    ) -> None:
+        self.streams["stopped" if stopped else "completed"] += 1
+        if ttft is not None:
+            histogram = self.ttft.get(model)
+            if histogram is None:
+                histogram = self.ttft[model] = _Histogram()
+            histogram.observe(ttft)
+        if inter_chunk is not None:
+            self.inter_chunk.observe(inter_chunk)
+
+    def on_cache(self, hit: bool) -> None:
+        if hit:
+            self.cache_hits += 1
+        else:
+            self.cache_misses += 1
+
+    def on_prompt_cache(
+        self, model: str, read_tokens: int, write_tokens: int = 0, uncached_tokens: int = 0
+    ) -> None:
+        if read_tokens:
+            self.prompt_cache_hits += 1
+        else:
+            self.prompt_cache_misses += 1
+        self.prompt_cache_tokens["read"] += read_tokens
+        self.prompt_cache_tokens["write"] += write_tokens
+        self.prompt_cache_tokens["uncached"] += uncached_tokens
+
+    def on_run_start(self) -> None:
+        self.run_peak_in_flight = sum(self.in_flight.values())
+        self._run = dict(
+            started_at=time.monotonic(),
+            rows=sum(self.rows.values()),
+            tokens=self.input_tokens + self.output_tokens,
+            retries=sum(self.retries.values()),
+            row_latency=self.row_latency.since(None),
+            ttft={model: histogram.since(None) for model, histogram in self.ttft.items()},
+            streams_stopped=self.streams["stopped"],
+            prompt_cache_tokens=dict(self.prompt_cache_tokens),
+        )
+
+    def merge(self, other: "Metrics") -> None:
+        if not isinstance(other, InMemoryMetrics):
+            return
+        self._touch()
+
+        def add(mine: dict, theirs: dict) -> None:
+            for key, value in theirs.items():
+                mine[key] = mine.get(key, 0) + value
+
+        def add_histograms(mine: dict[str, _Histogram], theirs: dict[str, _Histogram]) -> None:
+            for key, histogram in theirs.items():
+                mine.setdefault(key, _Histogram(histogram.bounds)).merge(histogram)
+
+        add_histograms(self.request_latency, other.request_latency)
+        add_histograms(self.ttft, other.ttft)
+        add(self.requests, other.requests)
+        add(self.retries, other.retries)
+        add(self.retry_wait, other.retry_wait)
+        add(self.parse_errors, other.parse_errors)
+        add(self.streams, other.streams)
+        add(self.connections, other.connections)
+        add(self.prompt_cache_tokens, other.prompt_cache_tokens)
+        for name in ("queue_wait", "limiter_wait", "pool_wait", "inter_chunk"):
+            getattr(self, name).merge(getattr(other, name))
+        self.peak_in_flight = max(self.peak_in_flight, other.peak_in_flight)
+        self.run_peak_in_flight = max(self.run_peak_in_flight, other.peak_in_flight)
+        self.cache_hits += other.cache_hits
+        self.cache_misses += other.cache_misses
+        self.prompt_cache_hits += other.prompt_cache_hits
+        self.prompt_cache_misses += other.prompt_cache_misses
+        self.input_tokens += other.input_tokens
+        self.output_tokens += other.output_tokens
+
+    def _elapsed(self) -> float:
+        if self.started_at is None:
+            return 0.0
+        return self.updated_at - self.started_at
+
+    def snapshot(self) -> dict:
+        """Return the current values as a plain dict."""
+        elapsed = self._elapsed()
+        rows = sum(self.rows.values())
+        prompt_tokens = sum(self.prompt_cache_tokens.values())
+        return dict(
+            rows=dict(self.rows),
+            rows_per_second=rows / elapsed if elapsed else None,
+            input_tokens=self.input_tokens,
+            output_tokens=self.output_tokens,
+            tokens_per_second=(
+                (self.input_tokens + self.output_tokens) / elapsed if elapsed else None
+            ),
+            requests={f"{model}|{status}": count for (model, status), count in self.requests.items()},
+            retries={f"{model}|{category}": count for (model, category), count in self.retries.items()},
+            retry_wait_total=dict(self.retry_wait),
+            parse_errors=dict(self.parse_errors),
+            in_flight=sum(self.in_flight.values()),
+            peak_in_flight=self.peak_in_flight,
+            latency_p50=self.row_latency.quantile(0.5),
+            latency_p99=self.row_latency.quantile(0.99),
+            request_latency_p50={
+                model: histogram.quantile(0.5) for model, histogram in self.request_latency.items()
+            },
+            request_latency_p99={
+                model: histogram.quantile(0.99) for model, histogram in self.request_latency.items()
+            },
+            attempts_mean=self.attempts.sum / self.attempts.count if self.attempts.count else None,
+            queue_wait_p99=self.queue_wait.quantile(0.99),
+            limiter_wait_total=self.limiter_wait.sum,
+            ttft_p50={model: histogram.quantile(0.5) for model, histogram in self.ttft.items()},
+            ttft_p99={model: histogram.quantile(0.99) for model, histogram in self.ttft.items()},
+            inter_chunk_p50=self.inter_chunk.quantile(0.5),
+            streams_stopped=self.streams["stopped"],
+            pool_wait_p99=self.pool_wait.quantile(0.99),
+            pool_wait_total=self.pool_wait.sum,
+            new_connections=self.connections["new"],
+            reused_connections=self.connections["reused"],
+            cache_hits=self.cache_hits,
+            cache_misses=self.cache_misses,
+            prompt_cache_hits=self.prompt_cache_hits,
+            prompt_cache_misses=self.prompt_cache_misses,
+            prompt_cache_read_tokens=self.prompt_cache_tokens["read"],
+            prompt_cache_write_tokens=self.prompt_cache_tokens["write"],
+            prompt_cache_hit_rate=(
+                self.prompt_cache_tokens["read"] / prompt_tokens if prompt_tokens else None
+            ),
+        )
+
+    def summary(self) -> Optional[str]:
+        # only what was recorded since on_run_start, the other readers stay cumulative
+        run = self._run or dict(
+            started_at=self.started_at,
+            rows=0,
+            tokens=0,
+            retries=0,
+            ttft={},
+            streams_stopped=0,
+            prompt_cache_tokens=dict(read=0, write=0, uncached=0),
+        )
+        if self.updated_at is None or run["started_at"] is None:
+            return None
+        elapsed = self.updated_at - run["started_at"]
+        rows = sum(self.rows.values()) - run["rows"]
+        if elapsed <= 0 or rows <= 0:
+            return None
+
+        tokens = self.input_tokens + self.output_tokens - run["tokens"]
+        latency = self.row_latency.since(run.get("row_latency"))
+        peak_in_flight = self.run_peak_in_flight if self._run is not None else self.peak_in_flight
+        summary = (
+            f"📈 {rows / elapsed:.1f} rows/s, "
+            f"{tokens / elapsed:.0f} tokens/s, "
+            f"latency p50 {latency.quantile(0.5) or 0:.2f}s / p99 {latency.quantile(0.99) or 0:.2f}s, "
+            f"{sum(self.retries.values()) - run['retries']} retries, peak in flight {peak_in_flight}"
+        )
+
+        ttft = [
+            histogram.since(run["ttft"].get(model)).quantile(0.5)
+            for model, histogram in self.ttft.items()
+        ]
+        ttft = [value for value in ttft if value is not None]
+        if ttft:
+            stopped = self.streams["stopped"] - run["streams_stopped"]
+            summary += f", TTFT p50 {max(ttft):.2f}s, {stopped} streams stopped early"
+
+        prompt_tokens = {
+            kind: tokens - run["prompt_cache_tokens"][kind]
+            for kind, tokens in self.prompt_cache_tokens.items()
+        }
+        if sum(prompt_tokens.values()):
+            hit_rate = prompt_tokens["read"] / sum(prompt_tokens.values())
+            summary += f", {hit_rate:.0%} of prompt tokens from cache"
+        return summary
+
+    def to_prometheus(self, prefix: str = "datafarmer_llm") -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name: str, kind: str, help: str) -> str:
+            lines.append(f"# HELP {prefix}_{name} {help}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            return f"{prefix}_{name}"
+
+        def escape(value) -> str:
+            return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+        def labels(**values) -> str:
+            inner = ",".join(f'{key}="{escape(value)}"' for key, value in values.items())
+            return "{" + inner + "}" if inner else ""
+
+        def histogram(name: str, help: str, values: dict[str, _Histogram], label: str) -> None:
+            full_name = metric(name, "histogram", help)
+            for label_value, hist in values.items():
+                base = {label: label_value} if label else {}
+                for bound, count in zip(
+                    [*hist.bounds, "+Inf"], hist.cumulative_counts()
+                ):
+                    lines.append(f"{full_name}_bucket{labels(**base, le=bound)} {count}")
+                lines.append(f"{full_name}_sum{labels(**base)} {hist.sum}")
+                lines.append(f"{full_name}_count{labels(**base)} {hist.count}")
+
+        name = metric("requests_total", "counter", "Provider calls by model and status.")
+        for (model, status), count in self.requests.items():
+            lines.append(f"{name}{labels(model=model, status=status)} {count}")
+
+        name = metric("retries_total", "counter", "Retried attempts by model and error category.")
+        for (model, category), count in self.retries.items():
+            lines.append(f"{name}{labels(model=model, category=category)} {count}")
+
+        name = metric("retry_wait_seconds_total", "counter", "Seconds slept in retry backoff by error category.")
+        for category, seconds in self.retry_wait.items():
+            lines.append(f"{name}{labels(category=category)} {seconds}")
+
+        name = metric("parse_errors_total", "counter", "Responses that didn't match the response schema.")
+        for model, count in self.parse_errors.items():
+            lines.append(f"{name}{labels(model=model)} {count}")
+
+        name = metric("rows_total", "counter", "Finished rows by status.")
+        for status, count in self.rows.items():
+            lines.append(f"{name}{labels(status=status)} {count}")
+
+        name = metric("in_flight", "gauge", "Provider calls in flight.")
+        for model, count in self.in_flight.items():
+            lines.append(f"{name}{labels(model=model)} {count}")
+
+        name = metric("tokens_total", "counter", "Estimated tokens by direction.")
+        lines.append(f"{name}{labels(direction='input')} {self.input_tokens}")
+        lines.append(f"{name}{labels(direction='output')} {self.output_tokens}")
+
+        name = metric("http_connections_total", "counter", "Requests by new or reused pool connection.")
+        for kind, count in self.connections.items():
+            lines.append(f"{name}{labels(kind=kind)} {count}")
+
+        name = metric("streams_total", "counter", "Streamed responses by outcome.")
+        for outcome, count in self.streams.items():
+            lines.append(f"{name}{labels(outcome=outcome)} {count}")
+
+        name = metric("cache_lookups_total", "counter", "Response cache lookups by outcome.")
+        lines.append(f"{name}{labels(outcome='hit')} {self.cache_hits}")
+        lines.append(f"{name}{labels(outcome='miss')} {self.cache_misses}")
+
+        name = metric("prompt_cache_requests_total", "counter", "Provider calls by prompt cache outcome.")
+        lines.append(f"{name}{labels(outcome='hit')} {self.prompt_cache_hits}")
+        lines.append(f"{name}{labels(outcome='miss')} {self.prompt_cache_misses}")
+
+        name = metric("prompt_cache_tokens_total", "counter", "Input tokens by prompt cache usage.")
+        for kind, tokens in self.prompt_cache_tokens.items():
+            lines.append(f"{name}{labels(kind=kind)} {tokens}")
+
+        histogram(
+            "request_duration_seconds", "Provider call latency.", self.request_latency, "model"
+        )
+        histogram("row_duration_seconds", "Row latency including retries.", {"": self.row_latency}, None)
+        histogram("row_attempts", "Attempts per row.", {"": self.attempts}, None)
+        histogram("queue_wait_seconds", "Wait for a concurrency slot.", {"": self.queue_wait}, None)
+        histogram("limiter_wait_seconds", "Wait in the rate limiter.", {"": self.limiter_wait}, None)
+        histogram("time_to_first_token_seconds", "Time to the first streamed chunk.", self.ttft, "model")
+        histogram(
+            "inter_chunk_seconds", "Mean time between streamed chunks.", {"": self.inter_chunk}, None
+        )
+        histogram("pool_wait_seconds", "Wait for an HTTP pool connection.", {"": self.pool_wait}, None)
+
+        return "\n".join(lines) + "\n"
+
+    def to_otlp(self, scope: str = "datafarmer") -> dict:
+        """Return the metrics in the OTLP/JSON shape of an OpenTelemetry metrics export."""
+        now = str(time.time_ns())
+        start = str(self.reset_at_ns)
+
+        def attributes(**values) -> list[dict]:
+            return [
+                {"key": key, "value": {"stringValue": str(value)}} for key, value in values.items()
+            ]
+
+        def sum_metric(name: str, unit: str, points: list[tuple[dict, float]]) -> dict:
+            return {
+                "name": name,
+                "unit": unit,
+                "sum": {
+                    "aggregationTemporality": 2,
+                    "isMonotonic": True,
+                    "dataPoints": [
+                        {
+                            "attributes": attributes(**attrs),
+                            "asDouble": value,
+                            "startTimeUnixNano": start,
+                            "timeUnixNano": now,
+                        }
+                        for attrs, value in points
+                    ],
+                },
+            }
+
+        def histogram_metric(name: str, unit: str, points: list[tuple[dict, _Histogram]]) -> dict:
+            return {
+                "name": name,
+                "unit": unit,
+                "histogram": {
+                    "aggregationTemporality": 2,
+                    "dataPoints": [
+                        {
+                            "attributes": attributes(**attrs),
+                            "count": str(hist.count),
+                            "sum": hist.sum,
+                            "bucketCounts": [str(count) for count in hist.counts],
+                            "explicitBounds": list(hist.bounds),
+                            "startTimeUnixNano": start,
+                            "timeUnixNano": now,
+                        }
+                        for attrs, hist in points
+                    ],
+                },
+            }
+
+        metrics = [
+            sum_metric(
+                "datafarmer.llm.requests",
+                "1",
+                [({"model": m, "status": s}, c) for (m, s), c in self.requests.items()],
+            ),
+            sum_metric(
+                "datafarmer.llm.retries",
+                "1",
+                [({"model": m, "category": k}, c) for (m, k), c in self.retries.items()],
+            ),
+            sum_metric(
+                "datafarmer.llm.retry_wait",
+                "s",
+                [({"category": k}, v) for k, v in self.retry_wait.items()],
+            ),
+            sum_metric(
+                "datafarmer.llm.parse_errors",
+                "1",
+                [({"model": m}, c) for m, c in self.parse_errors.items()],
+            ),
+            sum_metric("datafarmer.llm.rows", "1", [({"status": s}, c) for s, c in self.rows.items()]),
+            sum_metric(
+                "datafarmer.llm.tokens",
+                "1",
+                [({"direction": "input"}, self.input_tokens), ({"direction": "output"}, self.output_tokens)],
+            ),
+            sum_metric(
+                "datafarmer.llm.http.connections",
+                "1",
+                [({"kind": k}, c) for k, c in self.connections.items()],
+            ),
+            sum_metric(
+                "datafarmer.llm.streams",
+                "1",
+                [({"outcome": k}, c) for k, c in self.streams.items()],
+            ),
+            sum_metric(
+                "datafarmer.llm.prompt_cache.requests",
+                "1",
+                [({"outcome": "hit"}, self.prompt_cache_hits), ({"outcome": "miss"}, self.prompt_cache_misses)],
+            ),
+            sum_metric(
+                "datafarmer.llm.prompt_cache.tokens",
+                "1",
+                [({"kind": k}, v) for k, v in self.prompt_cache_tokens.items()],
+            ),
+            {
+                "name": "datafarmer.llm.in_flight",
+                "unit": "1",
+                "gauge": {
+                    "dataPoints": [
+                        {"attributes": attributes(model=m), "asInt": str(c), "timeUnixNano": now}
+                        for m, c in self.in_flight.items()
+                    ]
+                },
+            },
+            histogram_metric(
+                "datafarmer.llm.request.duration",
+                "s",
+                [({"model": m}, h) for m, h in self.request_latency.items()],
+            ),
+            histogram_metric("datafarmer.llm.row.duration", "s", [({}, self.row_latency)]),
+            histogram_metric("datafarmer.llm.row.attempts", "1", [({}, self.attempts)]),
+            histogram_metric("datafarmer.llm.queue_wait", "s", [({}, self.queue_wait)]),
+            histogram_metric("datafarmer.llm.limiter_wait", "s", [({}, self.limiter_wait)]),
+            histogram_metric("datafarmer.llm.pool_wait", "s", [({}, self.pool_wait)]),
+            histogram_metric(
+                "datafarmer.llm.time_to_first_token",
+                "s",
+                [({"model": m}, h) for m, h in self.ttft.items()],
+            ),
+            histogram_metric("datafarmer.llm.inter_chunk", "s", [({}, self.inter_chunk)]),
+        ]
+        return {
+            "resourceMetrics": [
+                {"scopeMetrics": [{"scope": {"name": scope}, "metrics": metrics}]}
+            ]
+        }
@@ -0,0 +1,139 @@
+from typing import Optional
+import time
+from datafarmer.llm.base import _get_status_code, _is_rate_limit_error
+from datafarmer.llm.retry import get_retry_after
+from datafarmer.utils import logger
+
+
+class _Target:
+    def __init__(self, name: str, weight: float):
+        self.name = name
+        self.weight = weight
+        self.outstanding = 0
+        self.requests = 0
+        self.successes = 0
+        self.failures = 0
+        self.ejections = 0
+        self.consecutive_failures = 0
+        self.ejected_until = 0.0
+        self.latency_sum = 0.0
+
+
+class TargetPool:
+    def __init__(
+        self,
+        names: list[str],
+        weights: Optional[list[float]] = None,
+        eject_seconds: float = 10.0,
+        max_eject_seconds: float = 300.0,
+    ):
+        """Spread requests over several targets (projects, regions, keys) of the same model.
+
+        Every request goes to the target with the fewest outstanding requests relative to its
+        weight. A target that answers 429 or 5xx is ejected for `eject_seconds`, doubling on
+        every consecutive failure up to `max_eject_seconds` (or for the provider Retry-After,
+        if longer). When every target is ejected, the one that comes back first is used.
+
+        Args:
+            names (list[str]): target names, used in logs and stats
+            weights (Optional[list[float]], optional): relative capacity of every target, e.g. its
+                quota. Defaults to None (equal weights).
+            eject_seconds (float, optional): first ejection time. Defaults to 10.0.
+            max_eject_seconds (float, optional): longest ejection time. Defaults to 300.0.
+        """
+        weights = weights or [1.0] * len(names)
+        assert len(names) > 0, "names should not be empty"
+        assert len(weights) == len(names), "weights should have one value per target"
+        assert all(weight > 0 for weight in weights), "weights should be greater than 0"
+
+        self.targets = [_Target(name, weight) for name, weight in zip(names, weights)]
+        self.eject_seconds = eject_seconds
+        self.max_eject_seconds = max_eject_seconds
+        self._next = 0
+
+    def acquire(self) -> int:
+        """Pick a target for one request and count it as outstanding, returns its index."""
+        now = time.monotonic()
+        count = len(self.targets)
+        # start from a rotating offset so ties are spread round-robin
+        start, self._next = self._next, (self._next + 1) % count
+
+        best, best_score = None, None
+        for offset in range(count):
+            index = (start + offset) % count
+            target = self.targets[index]
+            if target.ejected_until > now:
+                continue
+            score = (target.outstanding + 1) / target.weight
+            if best_score is None or score < best_score:
+                best, best_score = index, score
+
+        if best is None:
+            best = min(range(count), key=lambda index: self.targets[index].ejected_until)
+
+        target = self.targets[best]
+        target.outstanding += 1
+        target.requests += 1
+        return best
+
+    def release(
+        self,
+        index: int,
+        seconds: float = 0.0,
+        error: Optional[BaseException] = None,
+        cancelled: bool = False,
+    ) -> None:
+        """Finish a request on a target, ejecting the target on a quota or server error.
+
+        A `cancelled` request only frees its slot, it counts as neither a success nor a failure.
+        """
+        target = self.targets[index]
+        target.outstanding -= 1
+        if cancelled:
+            return
+        target.latency_sum += seconds
+
+        if error is None:
+            target.successes += 1
+            target.consecutive_failures = 0
+            return
+
+        target.failures += 1
+        status_code = _get_status_code(error)
+        if not (_is_rate_limit_error(error) or (status_code is not None and status_code >= 500)):
+            return
+
+        target.consecutive_failures += 1
+        eject_seconds = min(
+            self.max_eject_seconds, self.eject_seconds * 2 ** (target.consecutive_failures - 1)
+        )
+        eject_seconds = max(eject_seconds, get_retry_after(error) or 0.0)
+        ejected_until = time.monotonic() + eject_seconds
+        if ejected_until > target.ejected_until:
+            if target.ejected_until <= time.monotonic():
+                target.ejections += 1
+                logger.warning(f"⏏️ Ejecting target {target.name} for {eject_seconds:.0f}s: {str(error)}")
+            target.ejected_until = ejected_until
+
+    def stats(self) -> list[dict]:
+        """Return per-target counters: outstanding, requests, successes, failures, ejections,
+        whether it is ejected right now and the mean latency."""
+        now = time.monotonic()
+        return [
+            dict(
+                target=target.name,
+                weight=target.weight,
+                outstanding=target.outstanding,
+                requests=target.requests,
+                successes=target.successes,
+                failures=target.failures,
+                ejections=target.ejections,
+                is_ejected=target.ejected_until > now,
+                mean_latency=(
+                    target.latency_sum / (target.successes + target.failures)
+                    if target.successes + target.failures
+                    else None
+                ),
+            )
+            for target in self.targets
+        ]
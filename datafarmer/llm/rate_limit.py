@@ -0,0 +1,190 @@
+from typing import Optional
+import asyncio
+import threading
+import time
+
+
+class _TokenBucket:
+    """A token bucket that hands out reservations, sleeping callers go into debt in order."""
+
+    def __init__(self, capacity_per_minute: float):
+        self.capacity = capacity_per_minute
+        self.level = capacity_per_minute
+        self.updated_at = time.monotonic()
+
+    def reserve(self, amount: float, rate_fraction: float) -> float:
+        """Take `amount` from the bucket and return the seconds to wait before using it."""
+        now = time.monotonic()
+        rate_per_second = self.capacity * rate_fraction / 60
+        self.level = min(
+            self.capacity, self.level + (now - self.updated_at) * rate_per_second
+        )
+        self.updated_at = now
+        self.level -= amount
+
+        if self.level >= 0:
+            return 0.0
+        return -self.level / rate_per_second
+
+
+class RateLimiter:
+    def __init__(
+        self,
+        requests_per_minute: Optional[float] = None,
+        tokens_per_minute: Optional[float] = None,
+        model_limits: Optional[dict[str, dict]] = None,
+        decrease_factor: float = 0.5,
+        increase_step: float = 0.05,
+        success_threshold: int = 20,
+        min_rate_fraction: float = 0.05,
+        decrease_cooldown: float = 1.0,
+    ):
+        """Client-side RPM/TPM limiter with AIMD (additive increase, multiplicative decrease).
+
+        One instance can be shared by several LLM instances that draw from the same quota.
+        Every model gets its own buckets, so a single limiter can guard several models.
+
+        Args:
+            requests_per_minute (Optional[float], optional): default request budget per model. Defaults to None (unlimited).
+            tokens_per_minute (Optional[float], optional): default input token budget per model. Defaults to None (unlimited).
+            model_limits (Optional[dict[str, dict]], optional): per-model overrides, e.g.
+                ``{"gemini-2.5-flash": {"requests_per_minute": 600, "tokens_per_minute": 1_000_000}}``.
+                Defaults to None.
+            decrease_factor (float, optional): the rate is multiplied by this on every 429. Defaults to 0.5.
+            increase_step (float, optional): fraction of the budget added back after sustained success. Defaults to 0.05.
+            success_threshold (int, optional): consecutive successes needed before increasing the rate. Defaults to 20.
+            min_rate_fraction (float, optional): lower bound of the rate as a fraction of the budget. Defaults to 0.05.
+            decrease_cooldown (float, optional): seconds after a decrease during which further 429s don't cut
+                the rate again, so a wave of concurrent 429s counts as one. 429s of requests sent before the
+                last decrease are ignored as well. Defaults to 1.0.
+        """
+        assert 0 < decrease_factor < 1, "decrease_factor should be between 0 and 1"
+        assert 0 < min_rate_fraction <= 1, "min_rate_fraction should be between 0 and 1"
+        assert decrease_cooldown >= 0, "decrease_cooldown should not be negative"
+
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.decrease_factor = decrease_factor
+        self.increase_step = increase_step
+        self.success_threshold = success_threshold
+        self.min_rate_fraction = min_rate_fraction
+        self.decrease_cooldown = decrease_cooldown
+
+        self._lock = threading.Lock()
+        self._buckets: dict[str, tuple[Optional[_TokenBucket], Optional[_TokenBucket]]] = {}
+        self._rate_fraction: dict[str, float] = {}
+        self._successes: dict[str, int] = {}
+        self._decreased_at: dict[str, float] = {}
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def split(self, parts: int) -> "RateLimiter":
+        """Return a fresh limiter with every budget divided by `parts`, e.g. one per worker process."""
+        assert parts > 0, "parts should be greater than 0"
+
+        def divide(value: Optional[float]) -> Optional[float]:
+            return value / parts if value else value
+
+        return RateLimiter(
+            requests_per_minute=divide(self.requests_per_minute),
+            tokens_per_minute=divide(self.tokens_per_minute),
+            model_limits={
+                model: {key: divide(value) for key, value in limits.items()}
+                for model, limits in self.model_limits.items()
+            },
+            decrease_factor=self.decrease_factor,
+            increase_step=self.increase_step,
+            success_threshold=self.success_threshold,
+            min_rate_fraction=self.min_rate_fraction,
+            decrease_cooldown=self.decrease_cooldown,
+        )
+
+    def get_limits(self, model: str) -> tuple[Optional[float], Optional[float]]:
+        """Return the configured (requests_per_minute, tokens_per_minute) budget of `model`."""
+        limits = self.model_limits.get(model, {})
+        return (
+            limits.get("requests_per_minute", self.requests_per_minute),
+            limits.get("tokens_per_minute", self.tokens_per_minute),
+        )
+
+    def _get_buckets(self, model: str) -> tuple[Optional[_TokenBucket], Optional[_TokenBucket]]:
+        if model not in self._buckets:
+            rpm, tpm = self.get_limits(model)
+            self._buckets[model] = (
+                _TokenBucket(rpm) if rpm else None,
+                _TokenBucket(tpm) if tpm else None,
+            )
+            self._rate_fraction[model] = 1.0
+            self._successes[model] = 0
+        return self._buckets[model]
+
+    def get_rate_fraction(self, model: str) -> float:
+        """Return the current fraction of the configured budget that is allowed for `model`."""
+        with self._lock:
+            self._get_buckets(model)
+            return self._rate_fraction[model]
+
+    async def acquire(self, model: str, tokens: int = 0) -> float:
+        """Wait until one request of `tokens` input tokens fits in the budget of `model`.
+
+        Args:
+            model (str): model name the request is sent to
+            tokens (int, optional): estimated input tokens of the request. Defaults to 0.
+
+        Returns:
+            float: seconds spent waiting
+        """
+        with self._lock:
+            request_bucket, token_bucket = self._get_buckets(model)
+            fraction = self._rate_fraction[model]
+            wait = 0.0
+            if request_bucket is not None:
+                wait = max(wait, request_bucket.reserve(1, fraction))
+            if token_bucket is not None and tokens > 0:
+                wait = max(wait, token_bucket.reserve(tokens, fraction))
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def on_success(self, model: str) -> None:
+        """Record a successful request, additively raising the rate after a streak."""
+        with self._lock:
+            self._get_buckets(model)
+            self._successes[model] += 1
+            if self._successes[model] >= self.success_threshold:
+                self._successes[model] = 0
+                self._rate_fraction[model] = min(
+                    1.0, self._rate_fraction[model] + self.increase_step
+                )
+
+    def on_rate_limited(self, model: str, sent_at: Optional[float] = None) -> None:
+        """Record a 429 response, multiplicatively cutting the rate at most once per cooldown.
+
+        Args:
+            model (str): model name the request was sent to
+            sent_at (Optional[float], optional): `time.monotonic()` when the request was sent, a 429
+                of a request sent before the last decrease was already accounted for. Defaults to None.
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._get_buckets(model)
+            self._successes[model] = 0
+            decreased_at = self._decreased_at.get(model)
+            if decreased_at is not None and (
+                now - decreased_at < self.decrease_cooldown
+                or (sent_at is not None and sent_at < decreased_at)
+            ):
+                return
+            self._decreased_at[model] = now
+            self._rate_fraction[model] = max(
+                self.min_rate_fraction, self._rate_fraction[model] * self.decrease_factor
+            )
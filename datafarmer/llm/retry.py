@@ -0,0 +1,124 @@
+from email.utils import parsedate_to_datetime
+from typing import Optional
+import random
+import re
+import time
+
+_RETRY_IN_MESSAGE = re.compile(r"retry (?:in|after) ([\d.]+)\s*(ms|s)", re.IGNORECASE)
+_DURATION = re.compile(r"^([\d.]+)s$")
+
+
+def _parse_retry_after_header(value: str) -> Optional[float]:
+    """Parse a Retry-After header, either delay-seconds or an HTTP date."""
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _find_retry_delay(details) -> Optional[float]:
+    """Find a google.rpc.RetryInfo `retryDelay` (e.g. "2s") in a Google API error body."""
+    if isinstance(details, dict):
+        delay = details.get("retryDelay")
+        if isinstance(delay, str) and _DURATION.match(delay):
+            return float(_DURATION.match(delay).group(1))
+        details = list(details.values())
+    if isinstance(details, list):
+        for item in details:
+            delay = _find_retry_delay(item)
+            if delay is not None:
+                return delay
+    return None
+
+
+def get_retry_after(exc: BaseException) -> Optional[float]:
+    """Return the retry delay in seconds suggested by the provider, if the error carries one.
+
+    Looks at the ``retry-after-ms`` / ``retry-after`` response headers (OpenAI, Anthropic, httpx),
+    the ``RetryInfo.retryDelay`` of Google API error bodies, and "retry in 2.5s" style messages.
+    """
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is not None:
+        retry_after_ms = headers.get("retry-after-ms")
+        if retry_after_ms is not None:
+            try:
+                return max(0.0, float(retry_after_ms) / 1000)
+            except ValueError:
+                pass
+        retry_after = headers.get("retry-after")
+        if retry_after is not None:
+            delay = _parse_retry_after_header(retry_after)
+            if delay is not None:
+                return delay
+
+    # google-genai errors keep the parsed error body in `details`
+    delay = _find_retry_delay(getattr(exc, "details", None))
+    if delay is not None:
+        return delay
+
+    match = _RETRY_IN_MESSAGE.search(str(exc))
+    if match:
+        value = float(match.group(1))
+        return value / 1000 if match.group(2).lower() == "ms" else value
+    return None
+
+
+class RetryPolicy:
+    def __init__(
+        self,
+        min_wait: float = 2,
+        max_wait: float = 60,
+        multiplier: float = 1,
+        jitter: float = 0.5,
+        max_attempts: Optional[int] = None,
+        respect_retry_after: bool = True,
+        max_retry_after: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        """Backoff of one error class (rate limits, server errors, timeouts, ...).
+
+        The wait grows exponentially, ``multiplier * 2 ** (attempt - 1)`` clamped to
+        ``[min_wait, max_wait]``, and is randomised down by up to `jitter`, never below `min_wait`, so
+        that requests that failed together don't retry together. A delay suggested by the provider (Retry-After)
+        replaces the exponential wait, it is only ever stretched by a little jitter, and is cut
+        to `max_retry_after` so a long Retry-After doesn't park a request past its timeout.
+
+        Args:
+            min_wait (float, optional): minimum seconds between retries. Defaults to 2.
+            max_wait (float, optional): maximum seconds between retries. Defaults to 60.
+            multiplier (float, optional): exponential backoff multiplier. Defaults to 1.
+            jitter (float, optional): fraction of the wait that is randomised, 0 disables it.
+                Defaults to 0.5.
+            max_attempts (Optional[int], optional): attempts for this error class, defaults to the
+                `max_attempts` of the LLM. Defaults to None.
+            respect_retry_after (bool, optional): use the provider suggested delay when there is
+                one. Defaults to True.
+            max_retry_after (Optional[float], optional): longest provider suggested delay that is
+                honoured, longer ones are cut to it. Defaults to None (`max_wait`).
+            seed (Optional[int], optional): seed of the jitter. Defaults to None.
+        """
+        assert 0 <= jitter <= 1, "jitter should be between 0 and 1"
+        assert min_wait <= max_wait, "min_wait should not be greater than max_wait"
+
+        self.min_wait = min_wait
+        self.max_wait = max_wait
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.max_attempts = max_attempts
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_wait if max_retry_after is None else max_retry_after
+        self.random = random.Random(seed)
+
+    def get_wait(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Return the seconds to sleep after failed attempt number `attempt` (starting at 1)."""
+        if retry_after is not None and self.respect_retry_after:
+            retry_after *= 1 + self.random.uniform(0, 0.1 * self.jitter)
+            return min(retry_after, self.max_retry_after)
+
+        wait = min(self.max_wait, max(self.min_wait, self.multiplier * 2 ** (attempt - 1)))
+        return self.random.uniform(max(self.min_wait, wait * (1 - self.jitter)), wait)
@@ -0,0 +1,188 @@
+from collections import deque
+from typing import Optional
+import asyncio
+import time
+from datafarmer.llm.base import BaseLLM, _is_rate_limit_error
+from datafarmer.llm.batch import BatchBackend
+from datafarmer.llm.cache import ResponseCache
+from datafarmer.llm.metrics import Metrics
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy
+from datafarmer.utils import logger
+
+
+class RouterLLM(BaseLLM):
+    def __init__(
+        self,
+        llms: list[BaseLLM],
+        hedge_percentile: float = 0.95,
+        hedge_after: Optional[float] = None,
+        hedge_budget: float = 0.05,
+        min_samples: int = 50,
+        latency_window: int = 1000,
+        failover_on_quota: bool = True,
+        min_wait: int = 2,
+        max_wait: int = 60,
+        max_attempts: int = 3,
+        request_timeout: int = 30,
+        rate_limiter: Optional[RateLimiter] = None,
+        cache: Optional[ResponseCache] = None,
+        metrics: Optional[Metrics] = None,
+        retry_policies: Optional[dict[str, RetryPolicy]] = None,
+    ):
+        """Route requests over several LLMs with hedged requests and quota failover.
+
+        Every request goes to the first LLM. When it is still running after the hedge delay, a
+        duplicate is sent to the next LLM and whichever answers first wins, the other call is
+        cancelled. A quota error (HTTP 429) moves the request to the next LLM right away.
+        The router does the retrying, the retry settings of the wrapped LLMs are not used.
+
+        Args:
+            llms (list[BaseLLM]): LLMs in order of preference, e.g. a primary and a backup
+            hedge_percentile (float, optional): hedge once a request is slower than this percentile
+                of the recent latencies of its LLM. Defaults to 0.95.
+            hedge_after (Optional[float], optional): fixed hedge delay in seconds, overrides
+                `hedge_percentile`. Defaults to None.
+            hedge_budget (float, optional): maximum fraction of requests that may be hedged, caps
+                the extra load on the backup. Defaults to 0.05.
+            min_samples (int, optional): latencies observed before percentile hedging starts.
+                Defaults to 50.
+            latency_window (int, optional): number of recent latencies kept per LLM. Defaults to 1000.
+            failover_on_quota (bool, optional): send a request to the next LLM on a quota error.
+                Defaults to True.
+            min_wait (int, optional): minimum seconds between retries (exponential backoff). Defaults to 2.
+            max_wait (int, optional): maximum seconds between retries. Defaults to 60.
+            max_attempts (int, optional): maximum number of retry attempts. Defaults to 3.
+            request_timeout (int, optional): per-request timeout in seconds. Defaults to 30.
+            rate_limiter (Optional[RateLimiter], optional): limiter in front of the router, the
+                wrapped LLMs keep their own. Defaults to None.
+            cache (Optional[ResponseCache], optional): persistent response cache. Defaults to None.
+            metrics (Optional[Metrics], optional): metrics hooks of the router. Defaults to None.
+            retry_policies (Optional[dict[str, RetryPolicy]], optional): backoff per error class
+                ("rate_limit", "server_error", "timeout", "connection", "parse_error", "other"),
+                classes without a policy use `min_wait` / `max_wait`. Defaults to None.
+        """
+        super().__init__(
+            min_wait=min_wait,
+            max_wait=max_wait,
+            max_attempts=max_attempts,
+            request_timeout=request_timeout,
+            rate_limiter=rate_limiter,
+            cache=cache,
+            metrics=metrics,
+            retry_policies=retry_policies,
+        )
+
+        assert len(llms) > 0, "llms should not be empty"
+        assert 0 < hedge_percentile < 1, "hedge_percentile should be between 0 and 1"
+        assert 0 <= hedge_budget <= 1, "hedge_budget should be between 0 and 1"
+
+        self.llms = llms
+        self._supports_streaming = all(llm._supports_streaming for llm in llms)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_after = hedge_after
+        self.hedge_budget = hedge_budget
+        self.min_samples = min_samples
+        self.failover_on_quota = failover_on_quota
+
+        self._latencies = [deque(maxlen=latency_window) for _ in llms]
+        self._hedge_delays: list[Optional[float]] = [None for _ in llms]
+        self.stats = dict(requests=0, hedged=0, hedge_wins=0, failovers=0)
+
+    def _get_model_name(self, **kwargs) -> str:
+        return self.llms[0]._get_model_name(**kwargs)
+
+    def _get_batch_backend(self) -> BatchBackend:
+        return self.llms[0]._get_batch_backend()
+
+    async def _count_tokens(self, prompt: str, **kwargs) -> Optional[int]:
+        return await self.llms[0]._count_tokens(prompt, **kwargs)
+
+    def _record_latency(self, position: int, seconds: float) -> None:
+        latencies = self._latencies[position]
+        latencies.append(seconds)
+        # the percentile is refreshed every few samples instead of sorting on every request
+        if len(latencies) >= self.min_samples and len(latencies) % 10 == 0:
+            ordered = sorted(latencies)
+            self._hedge_delays[position] = ordered[
+                min(len(ordered) - 1, int(self.hedge_percentile * len(ordered)))
+            ]
+
+    def _get_hedge_delay(self, position: int) -> Optional[float]:
+        """Return the seconds to wait before hedging a request to `position`, None to never hedge."""
+        if position + 1 >= len(self.llms):
+            return None
+        if self.stats["hedged"] >= self.hedge_budget * self.stats["requests"]:
+            return None
+        if self.hedge_after is not None:
+            return self.hedge_after
+        return self._hedge_delays[position]
+
+    async def _call_llm(self, position: int, id: str, prompt: str, **kwargs) -> tuple[str, str, bool]:
+        started_at = time.perf_counter()
+        result = await self.llms[position]._call_generate_single(id, prompt, **kwargs)
+        self._record_latency(position, time.perf_counter() - started_at)
+        return result
+
+    async def _generate_hedged(
+        self, position: int, id: str, prompt: str, **kwargs
+    ) -> tuple[str, str, bool]:
+        """Send the request to `position`, hedging it to the next LLM when it is too slow."""
+        primary = asyncio.ensure_future(self._call_llm(position, id, prompt, **kwargs))
+        pending = {primary}
+        try:
+            delay = self._get_hedge_delay(position)
+            if delay is None:
+                return await primary
+
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if done:
+                return primary.result()
+
+            self.stats["hedged"] += 1
+            backup = asyncio.ensure_future(self._call_llm(position + 1, id, prompt, **kwargs))
+            pending.add(backup)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is backup:
+                            self.stats["hedge_wins"] += 1
+                        return task.result()
+
+            # both calls failed, the primary error decides on retry or failover
+            backup.exception()
+            raise primary.exception()
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _generate_single(self, id: str, prompt: str, **kwargs) -> tuple[str, str, bool]:
+        """Generate a response from the first LLM that answers.
+
+        Args:
+            id (str): identifier for this prompt
+            prompt (str): the prompt text
+            **kwargs: passed through to the wrapped LLMs
+
+        Returns:
+            tuple[str, str, bool]: (id, response_text, is_succeeded)
+        """
+        self.stats["requests"] += 1
+        position = 0
+        while True:
+            try:
+                return await self._generate_hedged(position, id, prompt, **kwargs)
+            except Exception as e:
+                if (
+                    not self.failover_on_quota
+                    or not _is_rate_limit_error(e)
+                    or position + 1 >= len(self.llms)
+                ):
+                    raise
+                position += 1
+                self.stats["failovers"] += 1
+                logger.warning(
+                    f"🔀 Quota error on {self.llms[position - 1]._get_model_name(**kwargs)}, "
+                    f"failing over to {self.llms[position]._get_model_name(**kwargs)}"
+                )
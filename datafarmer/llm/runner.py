@@ -0,0 +1,160 @@
+from typing import Any, Awaitable, Optional
+import asyncio
+import atexit
+import os
+import threading
+import time
+from datafarmer.utils import logger
+
+
+class LoopRunner:
+    def __init__(self, name: str = "datafarmer-loop"):
+        """One long-lived event loop on a daemon thread that runs coroutines for synchronous callers.
+
+        Provider clients, their connection pools and TLS sessions, rate limiter buckets and
+        caches stay bound to the same loop between calls, so only the first call pays the setup.
+        Any thread can submit, including one that already runs its own loop (e.g. a notebook).
+
+        Args:
+            name (str, optional): name of the loop thread. Defaults to "datafarmer-loop".
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self.startup_ms: Optional[float] = None
+        self.calls = 0
+        self.setup_ms_total = 0.0
+        self.last_setup_ms: Optional[float] = None
+
+    @property
+    def is_running(self) -> bool:
+        # a forked child inherits the loop object but not the thread that runs it
+        return self._thread is not None and self._thread.is_alive() and self._pid == os.getpid()
+
+    @property
+    def in_loop_thread(self) -> bool:
+        """True when called from a coroutine that runs on the background loop."""
+        return self.is_running and threading.current_thread() is self._thread
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread if it isn't running yet, return the loop."""
+        with self._lock:
+            if self.is_running:
+                return self._loop
+
+            started_at = time.perf_counter()
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_forever():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            self._loop = loop
+            self._thread = threading.Thread(target=run_forever, name=self.name, daemon=True)
+            self._pid = os.getpid()
+            self._thread.start()
+            ready.wait()
+
+            self.startup_ms = (time.perf_counter() - started_at) * 1000
+            logger.info(f"🔁 Started background event loop in {self.startup_ms:.1f} ms")
+            return loop
+
+    async def _timed(self, coroutine: Awaitable, submitted_at: float) -> Any:
+        """Record the time from submission to the coroutine starting on the loop."""
+        setup_ms = (time.perf_counter() - submitted_at) * 1000
+        self.calls += 1
+        self.setup_ms_total += setup_ms
+        self.last_setup_ms = setup_ms
+        logger.debug(f"🔁 Call {self.calls} started after {setup_ms:.2f} ms")
+        return await coroutine
+
+    def run(self, coroutine: Awaitable, timeout: Optional[float] = None) -> Any:
+        """Run a coroutine on the background loop and block until it's done.
+
+        Args:
+            coroutine (Awaitable): the coroutine to run
+            timeout (Optional[float], optional): seconds to wait, the coroutine is cancelled
+                after that. Defaults to None (no limit).
+
+        Returns:
+            Any: the result of the coroutine
+
+        Raises:
+            RuntimeError: called from a coroutine that runs on the background loop itself,
+                blocking there would deadlock
+        """
+        submitted_at = time.perf_counter()
+        if self.in_loop_thread:
+            coroutine.close()
+            raise RuntimeError("Can't block the background event loop from its own thread")
+
+        loop = self._start()
+        future = asyncio.run_coroutine_threadsafe(self._timed(coroutine, submitted_at), loop)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            # KeyboardInterrupt or timeout, don't leave the work running in the background
+            future.cancel()
+            raise
+
+    def stats(self) -> dict:
+        """Return the number of calls and the loop startup and per-call setup overhead."""
+        return {
+            "calls": self.calls,
+            "startup_ms": self.startup_ms,
+            "last_setup_ms": self.last_setup_ms,
+            "mean_setup_ms": self.setup_ms_total / self.calls if self.calls else None,
+        }
+
+    def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancel pending tasks, close async generators and the default executor, stop the loop.
+
+        The next `run` starts a new loop.
+
+        Args:
+            timeout (float, optional): seconds to wait for the loop to wind down. Defaults to 5.0.
+        """
+        with self._lock:
+            if not self.is_running:
+                return
+            loop, thread = self._loop, self._thread
+
+            async def wind_down():
+                tasks = [
+                    task for task in asyncio.all_tasks() if task is not asyncio.current_task()
+                ]
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                await loop.shutdown_asyncgens()
+                await loop.shutdown_default_executor()
+
+            try:
+                asyncio.run_coroutine_threadsafe(wind_down(), loop).result(timeout)
+            except Exception as e:
+                logger.warning(f"⚠️ Background event loop didn't wind down cleanly: {str(e)}")
+
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._loop = self._thread = self._pid = None
+            logger.debug("🔁 Stopped background event loop")
+
+
+_runner: Optional[LoopRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_runner() -> LoopRunner:
+    """Return the process-wide runner used by the synchronous methods, stopped at exit."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = LoopRunner()
+            atexit.register(_runner.shutdown)
+        return _runner
@@ -0,0 +1,112 @@
+from typing import AsyncIterator, Callable, Optional
+import time
+from datafarmer.llm.metrics import Metrics
+
+
+class StreamOptions:
+    def __init__(
+        self,
+        max_chars: Optional[int] = None,
+        stop_when: Optional[Callable[[str], bool]] = None,
+        check_every: int = 1,
+    ):
+        """Stream responses chunk by chunk, measure time to first token and stop runaway ones early.
+
+        Stopping closes the stream, so the provider stops generating and the remaining output
+        tokens are neither waited for nor billed. A stopped response is kept as a success with
+        the text received so far.
+
+        Args:
+            max_chars (Optional[int], optional): stop once the response is this long, the text is
+                cut to exactly `max_chars`. Defaults to None.
+            stop_when (Optional[Callable[[str], bool]], optional): called with the partial text,
+                the stream stops when it returns True, e.g. ``lambda text: "</answer>" in text``.
+                Must be a module-level function with `workers` (to be pickled) and with a
+                `ResponseCache` (its name is part of the cache key). Defaults to None.
+            check_every (int, optional): call `stop_when` every this many chunks, the partial text
+                is joined on every check. Defaults to 1.
+        """
+        assert max_chars is None or max_chars > 0, "max_chars should be greater than 0"
+        assert check_every > 0, "check_every should be greater than 0"
+        self.max_chars = max_chars
+        self.stop_when = stop_when
+        self.check_every = check_every
+
+    @property
+    def cacheable(self) -> bool:
+        """Whether `to_dict` identifies the options, a lambda or nested function can't be told
+        apart from another one with the same qualified name."""
+        qualname = getattr(self.stop_when, "__qualname__", None)
+        return self.stop_when is None or (qualname is not None and "<" not in qualname)
+
+    def to_dict(self) -> dict:
+        """Return the options that change the response, used in cache keys."""
+        stop_when = self.stop_when
+        return {
+            "max_chars": self.max_chars,
+            "stop_when": (
+                None
+                if stop_when is None
+                else f"{getattr(stop_when, '__module__', '')}.{getattr(stop_when, '__qualname__', repr(stop_when))}"
+            ),
+        }
+
+    def __repr__(self) -> str:
+        return f"StreamOptions(max_chars={self.max_chars}, stop_when={self.stop_when!r})"
+
+    async def collect(
+        self, chunks: AsyncIterator[str], model: str, metrics: Metrics, started_at: float
+    ) -> str:
+        """Read a stream of text chunks until it ends or a stop condition is met.
+
+        Args:
+            chunks (AsyncIterator[str]): text chunks of the response, closed when the stream stops
+            model (str): model name reported to metrics
+            metrics (Metrics): receives `on_stream` once the stream is done
+            started_at (float): `time.perf_counter()` when the request was sent
+
+        Returns:
+            str: the response text
+        """
+        parts = []
+        length = 0
+        count = 0
+        first_at = last_at = None
+        stopped = False
+
+        try:
+            async for chunk in chunks:
+                if not chunk:
+                    continue
+                last_at = time.perf_counter()
+                if first_at is None:
+                    first_at = last_at
+                parts.append(chunk)
+                length += len(chunk)
+                count += 1
+
+                if self.max_chars is not None and length >= self.max_chars:
+                    stopped = True
+                    break
+                if self.stop_when is not None and count % self.check_every == 0:
+                    # the joined text replaces the parts, it is not joined again at the end
+                    parts = ["".join(parts)]
+                    if self.stop_when(parts[0]):
+                        stopped = True
+                        break
+        finally:
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+
+        text = "".join(parts)
+        if self.max_chars is not None:
+            text = text[: self.max_chars]
+
+        metrics.on_stream(
+            model,
+            ttft=None if first_at is None else first_at - started_at,
+            inter_chunk=(last_at - first_at) / (count - 1) if count > 1 else None,
+            chunks=count,
+            stopped=stopped,
+        )
+        return text
@@ -0,0 +1,177 @@
+from typing import Any, Optional
+import json
+import re
+import pandas as pd
+import polars as pl
+
+try:
+    import orjson
+
+    _loads = orjson.loads
+    _JSON_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:
+    _loads = json.loads
+    _JSON_ERRORS = (json.JSONDecodeError,)
+
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+_PYTHON_TYPES = {
+    "object": dict,
+    "array": list,
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "null": type(None),
+}
+_PANDAS_DTYPES = dict(string="string", integer="Int64", number="Float64", boolean="boolean")
+_POLARS_DTYPES = dict(string=pl.String, integer=pl.Int64, number=pl.Float64, boolean=pl.Boolean)
+
+
+class StructuredOutputError(ValueError):
+    """A response that isn't valid JSON or doesn't match the response schema, retried like a
+    transient error."""
+
+
+def _get_type(schema: dict) -> Optional[str]:
+    """Return the JSON type of a schema, ignoring "null" in a ["type", "null"] union."""
+    schema_type = schema.get("type")
+    if isinstance(schema_type, list):
+        types = [t for t in schema_type if t != "null"]
+        return types[0] if len(types) == 1 else None
+    if schema_type is None and "anyOf" in schema:
+        # pydantic writes Optional[X] as anyOf [X, null]
+        types = [_get_type(option) for option in schema["anyOf"] if option.get("type") != "null"]
+        return types[0] if len(types) == 1 else None
+    return schema_type
+
+
+def _validate(value: Any, schema: dict, path: str = "$") -> None:
+    """Check a value against a JSON schema subset: type, required, properties, items and enum."""
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        types = schema_type if isinstance(schema_type, list) else [schema_type]
+        is_valid = any(
+            isinstance(value, _PYTHON_TYPES[t])
+            and not (t in ("integer", "number") and isinstance(value, bool))
+            for t in types
+            if t in _PYTHON_TYPES
+        )
+        if not is_valid:
+            raise StructuredOutputError(f"{path} should be {' or '.join(types)}, got {value!r}")
+
+    if "enum" in schema and value not in schema["enum"]:
+        raise StructuredOutputError(f"{path} should be one of {schema['enum']}, got {value!r}")
+
+    if isinstance(value, dict):
+        missing = [key for key in schema.get("required", []) if key not in value]
+        if missing:
+            raise StructuredOutputError(f"{path} is missing required fields {missing}")
+        for key, property_schema in schema.get("properties", {}).items():
+            if key in value:
+                _validate(value[key], property_schema, f"{path}.{key}")
+    elif isinstance(value, list) and isinstance(schema.get("items"), dict):
+        for i, item in enumerate(value):
+            _validate(item, schema["items"], f"{path}[{i}]")
+
+
+class ResponseSchema:
+    def __init__(self, schema: dict | type):
+        """Schema of a structured response, parses and validates every response once.
+
+        Args:
+            schema (dict | type): a JSON schema with top-level "properties", or a Pydantic model
+                class. Pydantic models are validated by pydantic-core straight from the JSON text,
+                JSON schemas are parsed with orjson when it is installed and checked for types,
+                required fields and enums.
+        """
+        if isinstance(schema, type) and hasattr(schema, "model_validate_json"):
+            self.model = schema
+            self.json_schema = schema.model_json_schema()
+        else:
+            assert isinstance(schema, dict), "schema should be a JSON schema dict or a Pydantic model"
+            self.model = None
+            self.json_schema = schema
+
+        assert _get_type(self.json_schema) in (None, "object") and "properties" in self.json_schema, (
+            "schema should describe a JSON object with properties"
+        )
+        properties = self.json_schema["properties"]
+        self.fields = list(properties)
+        self.types = [_get_type(self._resolve(properties[field])) for field in self.fields]
+
+    def _resolve(self, schema: dict) -> dict:
+        """Follow a local "$ref" (pydantic puts nested models in "$defs")."""
+        ref = schema.get("$ref")
+        if isinstance(ref, str) and ref.startswith("#/$defs/"):
+            return self.json_schema.get("$defs", {}).get(ref.removeprefix("#/$defs/"), schema)
+        return schema
+
+    def to_dict(self) -> dict:
+        """Return the JSON schema, used in cache keys and provider requests."""
+        return self.json_schema
+
+    def __repr__(self) -> str:
+        return f"ResponseSchema({json.dumps(self.json_schema, sort_keys=True)})"
+
+    def parse(self, text: str) -> dict:
+        """Parse and validate a response.
+
+        Args:
+            text (str): the response text, a surrounding markdown code fence is ignored
+
+        Returns:
+            dict: the parsed fields
+
+        Raises:
+            StructuredOutputError: the text isn't valid JSON or doesn't match the schema
+        """
+        if not isinstance(text, str):
+            raise StructuredOutputError(f"expected a JSON string, got {type(text).__name__}")
+        match = _CODE_FENCE.match(text)
+        if match:
+            text = match.group(1)
+
+        if self.model is not None:
+            try:
+                return self.model.model_validate_json(text).model_dump(mode="json")
+            except ValueError as e:
+                # pydantic.ValidationError is a ValueError
+                raise StructuredOutputError(str(e)) from e
+
+        try:
+            value = _loads(text)
+        except _JSON_ERRORS as e:
+            raise StructuredOutputError(f"invalid JSON: {str(e)}") from e
+        _validate(value, self.json_schema)
+        return value
+
+    def parse_or_none(self, text: Optional[str]) -> Optional[dict]:
+        """Like parse, but None for a missing or invalid response."""
+        if text is None:
+            return None
+        try:
+            return self.parse(text)
+        except StructuredOutputError:
+            return None
+
+    def to_columns(self, values: list[Optional[dict]], frame_type: str = "pandas") -> dict:
+        """Build one typed column per field, column by column.
+
+        Args:
+            values (list[Optional[dict]]): parsed responses, None for failed rows
+            frame_type (str, optional): "pandas", or "polars" / "arrow". Defaults to "pandas".
+
+        Returns:
+            dict: {field: pd.Series or pl.Series}, missing values are nulls
+        """
+        columns = {}
+        for field, field_type in zip(self.fields, self.types):
+            cells = [value.get(field) if value is not None else None for value in values]
+            if frame_type != "pandas":
+                columns[field] = pl.Series(field, cells, dtype=_POLARS_DTYPES.get(field_type), strict=False)
+            elif field_type in _PANDAS_DTYPES:
+                columns[field] = pd.Series(pd.array(cells, dtype=_PANDAS_DTYPES[field_type]))
+            else:
+                columns[field] = pd.Series(cells, dtype=object)
+        return columns
@@ -0,0 +1,113 @@
+from string import Formatter
+from typing import Optional
+import re
+import pandas as pd
+import polars as pl
+
+_JINJA_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def parse_prompt_template(template: str) -> list[tuple[str, Optional[str], str, Optional[str]]]:
+    """Split a prompt template into (literal, column, format_spec, conversion) segments.
+
+    Two placeholder styles are supported:
+        - Jinja-style ``{{ column }}``, any other brace is kept literally (handy for JSON examples)
+        - ``str.format`` style ``{column}`` / ``{column:.2f}``, literal braces are written as ``{{ }}``
+
+    A template that contains at least one ``{{ column }}`` placeholder is treated as Jinja-style.
+
+    Args:
+        template (str): prompt template
+
+    Returns:
+        list[tuple[str, Optional[str], str, Optional[str]]]: template segments
+    """
+    if _JINJA_PLACEHOLDER.search(template):
+        parts = _JINJA_PLACEHOLDER.split(template)
+        literals, columns = parts[0::2], parts[1::2] + [None]
+        return [(literal, column, "", None) for literal, column in zip(literals, columns)]
+
+    return [
+        (literal, column, format_spec or "", conversion)
+        for literal, column, format_spec, conversion in Formatter().parse(template)
+    ]
+
+
+def get_template_columns(template: str) -> list[str]:
+    """Return the column names referenced by a prompt template, in order of first use."""
+    columns = []
+    for _, column, _, _ in parse_prompt_template(template):
+        if column is not None and column not in columns:
+            columns.append(column)
+    return columns
+
+
+def render_prompt_template(data: pd.DataFrame | pl.DataFrame, template: str) -> pd.Series | pl.Series:
+    """Render a prompt template for every row with column-wise string concatenation.
+
+    Missing values (None, NaN, null) render as an empty string with both backends, so a frame
+    gives the same prompts, and cache keys, in pandas and polars.
+
+    Args:
+        data (pd.DataFrame | pl.DataFrame): dataframe with the template columns
+        template (str): prompt template, see `parse_prompt_template`
+
+    Returns:
+        pd.Series | pl.Series: rendered prompts, aligned with `data.index` for pandas
+    """
+    if isinstance(data, pl.DataFrame):
+        return _render_polars_prompt_template(data, template)
+
+    prompts = pd.Series("", index=data.index, dtype=object)
+
+    for literal, column, format_spec, conversion in parse_prompt_template(template):
+        if literal:
+            prompts = prompts + literal
+        if column is None:
+            continue
+
+        values = data[column]
+        missing = values.isna().to_numpy()
+        if conversion == "r":
+            values = values.map(repr, na_action="ignore")
+        elif conversion == "a":
+            values = values.map(ascii, na_action="ignore")
+        if format_spec:
+            values = values.map(lambda value: format(value, format_spec), na_action="ignore")
+
+        values = values.astype(str)
+        if missing.any():
+            values = values.mask(missing, "")
+        prompts = prompts + values
+
+    return prompts
+
+
+def _render_polars_prompt_template(data: pl.DataFrame, template: str) -> pl.Series:
+    """Polars version of render_prompt_template, a single concat_str expression."""
+    expressions = []
+
+    for literal, column, format_spec, conversion in parse_prompt_template(template):
+        if literal:
+            expressions.append(pl.lit(literal))
+        if column is None:
+            continue
+
+        value = pl.col(column)
+        if data.schema[column].is_float():
+            # NaN is missing in pandas, render it like null so both backends agree
+            value = value.fill_nan(None)
+        if conversion or format_spec:
+            convert = {"r": repr, "a": ascii}.get(conversion, lambda value: value)
+            value = value.map_elements(
+                lambda value, convert=convert, format_spec=format_spec: format(
+                    convert(value), format_spec
+                ),
+                return_dtype=pl.String,
+            )
+        # concat_str would turn the whole prompt null, missing cells render as ""
+        expressions.append(value.cast(pl.String).fill_null(""))
+
+    if not expressions:
+        return pl.Series("prompt", [""] * len(data), dtype=pl.String)
+    return data.select(pl.concat_str(expressions).alias("prompt")).to_series()
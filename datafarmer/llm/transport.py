@@ -0,0 +1,178 @@
+from contextvars import ContextVar
+from typing import Any, Optional
+import importlib
+import threading
+import time
+from datafarmer.llm.metrics import Metrics, _Histogram
+from datafarmer.utils import logger
+
+# (metrics, model) of the provider call running in the current task, set by the engine
+current_request: ContextVar[Optional[tuple[Metrics, str]]] = ContextVar(
+    "current_request", default=None
+)
+
+_NEW_CONNECTION_EVENTS = ("connection.connect_tcp.started", "connection.connect_unix_socket.started")
+
+
+def _get_httpx_module(client_class: type):
+    """Return the httpx package a client class is built on (httpx, or a fork such as httpx2)."""
+    for cls in client_class.__mro__:
+        if cls.__name__ == "AsyncClient":
+            return importlib.import_module(cls.__module__.split(".")[0])
+    raise TypeError(f"{client_class.__name__} is not an httpx AsyncClient")
+
+
+class HttpTransport:
+    def __init__(
+        self,
+        max_connections: int = 1000,
+        max_keepalive_connections: Optional[int] = None,
+        keepalive_expiry: float = 30.0,
+        http2: bool = False,
+        connect_timeout: float = 10.0,
+        pool_timeout: Optional[float] = None,
+    ):
+        """HTTP connection pool settings shared by the provider clients.
+
+        The SDK default pools (100 connections for Anthropic and OpenAI) are far below the
+        concurrency of a large run, so requests queue inside the client instead of on the wire.
+        Pass one instance as `transport` to several LLMs and they share one pool per SDK.
+        Every request reports how long it waited for a connection, and whether it opened a new
+        one, to `metrics.on_pool_wait` of the LLM that sent it.
+
+        Args:
+            max_connections (int, optional): open connections per client. Defaults to 1000.
+            max_keepalive_connections (Optional[int], optional): idle connections kept open.
+                Defaults to None (same as `max_connections`).
+            keepalive_expiry (float, optional): seconds an idle connection is kept. Defaults to 30.0.
+            http2 (bool, optional): multiplex requests over HTTP/2 connections, requires the
+                ``h2`` package. Defaults to False.
+            connect_timeout (float, optional): seconds to open a connection. Defaults to 10.0.
+            pool_timeout (Optional[float], optional): seconds to wait for a free connection before
+                failing with a timeout. Defaults to None (the request timeout).
+        """
+        assert max_connections > 0, "max_connections should be greater than 0"
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                raise ImportError("h2 package is required for http2. Install with: uv add h2")
+
+        self.max_connections = max_connections
+        self.max_keepalive_connections = (
+            max_connections if max_keepalive_connections is None else max_keepalive_connections
+        )
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.connect_timeout = connect_timeout
+        self.pool_timeout = pool_timeout
+
+        self._lock = threading.Lock()
+        self._clients: dict[type, Any] = {}
+        self.pool_wait = _Histogram()
+        self.connections = dict(new=0, reused=0)
+
+    def __getstate__(self) -> dict:
+        # clients hold sockets of this process, workers open their own
+        state = self.__dict__.copy()
+        state["_lock"] = None
+        state["_clients"] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def timeout(self, seconds: float, client_class: Optional[type] = None) -> Any:
+        """Return an httpx Timeout for a request timeout with the pool's connect and pool timeouts.
+
+        Args:
+            seconds (float): read and write timeout of the request
+            client_class (Optional[type], optional): the httpx AsyncClient class the timeout is
+                for. Defaults to None (httpx.AsyncClient).
+        """
+        httpx_module = _get_httpx_module(client_class or importlib.import_module("httpx").AsyncClient)
+        return httpx_module.Timeout(
+            seconds,
+            connect=min(self.connect_timeout, seconds),
+            pool=seconds if self.pool_timeout is None else self.pool_timeout,
+        )
+
+    def get_client(self, client_class: Optional[type] = None, timeout: float = 60.0) -> Any:
+        """Return the shared client of a class, built on first use.
+
+        Args:
+            client_class (Optional[type], optional): httpx AsyncClient class to build, e.g. an SDK's
+                ``DefaultAsyncHttpxClient`` so its default headers and settings are kept.
+                Defaults to None (httpx.AsyncClient).
+            timeout (float, optional): default request timeout of the client. Defaults to 60.0.
+
+        Returns:
+            Any: an httpx AsyncClient, the same instance for every call with the same class
+        """
+        client_class = client_class or importlib.import_module("httpx").AsyncClient
+        with self._lock:
+            client = self._clients.get(client_class)
+            if client is None:
+                httpx_module = _get_httpx_module(client_class)
+                client = self._clients[client_class] = client_class(
+                    limits=httpx_module.Limits(
+                        max_connections=self.max_connections,
+                        max_keepalive_connections=self.max_keepalive_connections,
+                        keepalive_expiry=self.keepalive_expiry,
+                    ),
+                    timeout=self.timeout(timeout, client_class),
+                    http2=self.http2,
+                    event_hooks={"request": [self._trace_request]},
+                )
+                logger.debug(
+                    f"🔌 Built {client_class.__name__} with {self.max_connections} connections"
+                    f"{', HTTP/2' if self.http2 else ''}"
+                )
+            return client
+
+    async def _trace_request(self, request: Any) -> None:
+        """Request hook, times the wait for a pool connection through the httpcore trace extension."""
+        if "trace" in request.extensions:
+            return
+        started_at = time.perf_counter()
+        context = current_request.get()
+        done = False
+
+        async def trace(event_name: str, info: dict) -> None:
+            nonlocal done
+            if done:
+                return
+            new_connection = event_name in _NEW_CONNECTION_EVENTS
+            if new_connection or event_name.endswith("send_request_headers.started"):
+                done = True
+                self._on_pool_wait(context, time.perf_counter() - started_at, new_connection)
+
+        request.extensions["trace"] = trace
+
+    def _on_pool_wait(
+        self, context: Optional[tuple[Metrics, str]], seconds: float, new_connection: bool
+    ) -> None:
+        self.pool_wait.observe(seconds)
+        self.connections["new" if new_connection else "reused"] += 1
+        if context is not None:
+            metrics, model = context
+            metrics.on_pool_wait(model, seconds, new_connection)
+
+    def stats(self) -> dict:
+        """Return the requests sent, connections opened and the pool wait of every client."""
+        return {
+            "requests": self.pool_wait.count,
+            "new_connections": self.connections["new"],
+            "reused_connections": self.connections["reused"],
+            "pool_wait_p50": self.pool_wait.quantile(0.5),
+            "pool_wait_p99": self.pool_wait.quantile(0.99),
+            "pool_wait_total": self.pool_wait.sum,
+        }
+
+    async def aclose(self) -> None:
+        """Close every client and its connections."""
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            await client.aclose()
@@ -0,0 +1,230 @@
+from typing import Any, Optional
+import numpy as np
+from datafarmer.utils import logger
+
+_BLOCK_ROWS = 65_536
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """Return an L2-normalized float32 copy of a matrix, copied block by block so a memory-mapped
+    matrix is never converted to float64 as a whole."""
+    normalized = np.empty(vectors.shape, dtype=np.float32)
+    for start in range(0, len(vectors), _BLOCK_ROWS):
+        block = np.asarray(vectors[start : start + _BLOCK_ROWS], dtype=np.float32)
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        # zero vectors stay zero and failed (NaN) rows stay NaN
+        normalized[start : start + _BLOCK_ROWS] = block / np.where(norms > 0, norms, 1)
+    return normalized
+
+
+def _top_k(scores: np.ndarray, rows: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+    """Return the `k` highest scores of every query and their rows, best first, from score and row
+    matrices of the same shape."""
+    if scores.shape[1] > k:
+        best = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        scores = np.take_along_axis(scores, best, axis=1)
+        rows = np.take_along_axis(rows, best, axis=1)
+    order = np.argsort(-scores, axis=1, kind="stable")
+    return np.take_along_axis(scores, order, axis=1), np.take_along_axis(rows, order, axis=1)
+
+
+class VectorIndex:
+    def __init__(
+        self,
+        vectors: np.ndarray,
+        records: Any,
+        n_lists: Optional[int] = None,
+        n_probe: int = 8,
+        normalize: bool = True,
+        seed: int = 0,
+    ):
+        """In-process cosine similarity index over a matrix of chunk embeddings.
+
+        Searches are exact (brute force over every vector, in blocks) by default. With `n_lists`
+        the vectors are clustered with k-means into an inverted file and a search only scores the
+        vectors of the `n_probe` closest clusters, which trades a little recall for speed on
+        large corpora.
+
+        Distances follow Vertex RAG: cosine distance, ``1 - cosine similarity``, lower is closer.
+        Rows that failed to embed (NaN, see `embed_from_dataframe`) never match.
+
+        Args:
+            vectors (np.ndarray): float matrix, one row per chunk, e.g. from `embed_from_dataframe`
+                or ``np.load(path, mmap_mode="r")``
+            records (Any): pandas or polars dataframe with one row per vector, a "text" column and
+                optional "source_uri" and "file_id" columns (`file_ids` filters on "file_id")
+            n_lists (Optional[int], optional): number of k-means clusters for approximate search,
+                ``sqrt(len(vectors))`` is a good start. Defaults to None (exact search).
+            n_probe (int, optional): clusters scored per query in approximate search. Defaults to 8.
+            normalize (bool, optional): L2-normalize a float32 copy of the vectors, set False for
+                vectors that are already normalized (`embed_from_dataframe(normalize=True)`) to
+                keep a memory-mapped matrix on disk. Defaults to True.
+            seed (int, optional): random seed of the k-means initialisation. Defaults to 0.
+        """
+        assert vectors.ndim == 2, "vectors should be a 2-D matrix"
+        assert len(records) == len(vectors), "records should have one row per vector"
+        assert "text" in records.columns, "records should have a 'text' column"
+        assert n_lists is None or 0 < n_lists <= len(vectors), (
+            "n_lists should be between 1 and the number of vectors"
+        )
+        assert n_probe > 0, "n_probe should be greater than 0"
+
+        self.vectors = _normalize_rows(vectors) if normalize else vectors
+        self.texts = records["text"].to_list()
+        self.source_uris = (
+            records["source_uri"].to_list() if "source_uri" in records.columns else None
+        )
+        self.file_ids = (
+            np.asarray(records["file_id"].to_list()) if "file_id" in records.columns else None
+        )
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+
+        self.valid = np.ones(len(vectors), dtype=bool)
+        for start in range(0, len(vectors), _BLOCK_ROWS):
+            block = self.vectors[start : start + _BLOCK_ROWS]
+            self.valid[start : start + _BLOCK_ROWS] = np.isfinite(block).all(axis=1)
+
+        self.centroids: Optional[np.ndarray] = None
+        if n_lists is not None:
+            self._build_lists(np.random.default_rng(seed))
+
+    @classmethod
+    def load(cls, path: str, records: Any, mmap: bool = True, **kwargs) -> "VectorIndex":
+        """Build an index from embeddings exported to a ``.npy`` file, e.g. with
+        ``embed_from_dataframe(chunks, output_path=path)``.
+
+        Args:
+            path (str): ``.npy`` file with one row per chunk
+            records (Any): the chunks dataframe the embeddings were computed from
+            mmap (bool, optional): open the file memory-mapped instead of reading it. Defaults to True.
+            **kwargs: passed to `VectorIndex`
+        """
+        return cls(np.load(path, mmap_mode="r" if mmap else None), records, **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def _build_lists(self, rng: np.random.Generator, iterations: int = 10) -> None:
+        """Cluster the vectors with spherical k-means and sort the rows by cluster."""
+        rows = np.flatnonzero(self.valid)
+        sample = rows
+        if len(rows) > 256 * self.n_lists:
+            sample = np.sort(rng.choice(rows, 256 * self.n_lists, replace=False))
+        points = np.asarray(self.vectors[sample], dtype=np.float32)
+        centroids = points[rng.choice(len(points), self.n_lists, replace=False)]
+
+        for _ in range(iterations):
+            assignment = np.argmax(points @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, points)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # an empty cluster keeps its centroid
+            centroids = np.where(norms > 0, sums / np.where(norms > 0, norms, 1), centroids)
+
+        assignment = np.full(len(self.vectors), -1)
+        for start in range(0, len(self.vectors), _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start : start + _BLOCK_ROWS], dtype=np.float32)
+            assignment[start : start + _BLOCK_ROWS] = np.argmax(block @ centroids.T, axis=1)
+        assignment[~self.valid] = -1
+
+        self.centroids = centroids
+        self._list_rows = np.argsort(assignment, kind="stable")
+        self._list_offsets = np.searchsorted(assignment[self._list_rows], np.arange(self.n_lists + 1))
+        logger.debug(f"🧭 Clustered {len(rows)} vectors into {self.n_lists} lists")
+
+    def search(
+        self,
+        queries: np.ndarray,
+        top_k: int = 10,
+        max_distance: Optional[float] = None,
+        file_ids: Optional[list[str]] = None,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Find the closest vectors of every query.
+
+        Args:
+            queries (np.ndarray): one query vector, or a matrix with one query per row
+            top_k (int, optional): number of neighbours per query. Defaults to 10.
+            max_distance (Optional[float], optional): only keep neighbours closer than this cosine
+                distance, like Vertex RAG's `vector_distance_threshold`. Defaults to None.
+            file_ids (Optional[list[str]], optional): only search the chunks of these files.
+                Defaults to None.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: `(rows, distances)`, both of shape
+                ``(len(queries), top_k)`` and sorted closest first. Missing neighbours have row -1
+                and distance inf.
+        """
+        assert top_k > 0, "top_k should be greater than 0"
+        queries = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        assert queries.shape[1] == self.vectors.shape[1], (
+            f"queries should have {self.vectors.shape[1]} dimensions, got {queries.shape[1]}"
+        )
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms > 0, norms, 1)
+
+        allowed = self.valid
+        if file_ids is not None:
+            assert self.file_ids is not None, "records need a 'file_id' column to filter on file_ids"
+            allowed = allowed & np.isin(self.file_ids, file_ids)
+
+        if self.centroids is None:
+            scores, rows = self._search_exact(queries, top_k, allowed)
+        else:
+            scores, rows = self._search_lists(queries, top_k, allowed)
+
+        distances = 1 - scores
+        missing = ~np.isfinite(scores)
+        if max_distance is not None:
+            missing |= distances >= max_distance
+        distances[missing] = np.inf
+        rows = np.where(missing, -1, rows)
+        return rows, distances
+
+    def _search_exact(
+        self, queries: np.ndarray, top_k: int, allowed: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        best_scores = np.empty((len(queries), 0), dtype=np.float32)
+        best_rows = np.empty((len(queries), 0), dtype=np.int64)
+        for start in range(0, len(self.vectors), _BLOCK_ROWS):
+            block = np.asarray(self.vectors[start : start + _BLOCK_ROWS], dtype=np.float32)
+            scores = queries @ block.T
+            scores[:, ~allowed[start : start + _BLOCK_ROWS]] = -np.inf
+            rows = np.broadcast_to(np.arange(start, start + len(block)), scores.shape)
+            # merge the block's candidates with the best ones so far
+            best_scores, best_rows = _top_k(
+                np.concatenate([best_scores, scores], axis=1),
+                np.concatenate([best_rows, rows], axis=1),
+                top_k,
+            )
+        return self._pad(best_scores, best_rows, top_k)
+
+    def _search_lists(
+        self, queries: np.ndarray, top_k: int, allowed: np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray]:
+        n_probe = min(self.n_probe, self.n_lists)
+        probes = np.argpartition(-(queries @ self.centroids.T), n_probe - 1, axis=1)[:, :n_probe]
+
+        best_scores = np.full((len(queries), top_k), -np.inf, dtype=np.float32)
+        best_rows = np.full((len(queries), top_k), -1, dtype=np.int64)
+        for i, lists in enumerate(probes):
+            rows = np.concatenate(
+                [self._list_rows[self._list_offsets[j] : self._list_offsets[j + 1]] for j in lists]
+            )
+            rows = np.sort(rows[allowed[rows]])
+            if not len(rows):
+                continue
+            scores = np.asarray(self.vectors[rows], dtype=np.float32) @ queries[i]
+            scores, rows = _top_k(scores[None], rows[None], top_k)
+            best_scores[i, : scores.shape[1]] = scores[0]
+            best_rows[i, : rows.shape[1]] = rows[0]
+        return best_scores, best_rows
+
+    @staticmethod
+    def _pad(scores: np.ndarray, rows: np.ndarray, top_k: int) -> tuple[np.ndarray, np.ndarray]:
+        """Pad results to `top_k` columns when the index has fewer vectors."""
+        missing = top_k - scores.shape[1]
+        if missing > 0:
+            scores = np.pad(scores, ((0, 0), (0, missing)), constant_values=-np.inf)
+            rows = np.pad(rows, ((0, 0), (0, missing)), constant_values=-1)
+        return scores, rows
@@ -1,14 +1,42 @@
 from vertexai.preview import rag
 from vertexai.preview.rag import RagCorpus
 from vertexai.generative_models import Tool
-from typing import Optional, Any
+from google.cloud.aiplatform_v1beta1 import RagContexts, RetrieveContextsResponse
+from typing import Callable, Optional, Any
+from datafarmer.llm.cache import ResponseCache, make_cache_key
+from datafarmer.llm.vector_index import VectorIndex
 from datafarmer.utils import logger
+import numpy as np
+import time
 import vertexai
 
 
 class VertexRag:
-    def __init__(self, project_id) -> None:
+    def __init__(
+        self,
+        project_id,
+        cache: Optional[ResponseCache] = None,
+        listing_check_interval: float = 60.0,
+    ) -> None:
+        """
+        wrapper around Vertex AI RAG corpora
+
+        Args:
+            project_id (str): google cloud project id
+            cache (Optional[ResponseCache], optional): cache retrieval responses, keyed by corpus, query,
+                top_k, threshold and file ids. Entries expire with the cache's `ttl_seconds` and are not
+                used anymore once the corpus file listing changes. Defaults to None.
+            listing_check_interval (float, optional): seconds a corpus file listing is trusted before it
+                is listed again to detect changes. Defaults to 60.0.
+        """
         self.project_id = project_id
+        self.cache = cache
+        self.listing_check_interval = listing_check_interval
+
+        # corpus name -> (fingerprint of the file listing, time it was listed)
+        self._corpus_versions: dict[str, tuple[str, float]] = {}
+        # corpus name -> (index, function embedding a list of queries)
+        self._local_indexes: dict[str, tuple[VectorIndex, Callable[[list[str]], np.ndarray]]] = {}
 
         vertexai.init(project=self.project_id)
 
@@ -75,6 +103,48 @@ class VertexRag:
         )
 
         logger.info(f"rag imported : {response.imported_rag_files_count} files")
+        self._corpus_versions.pop(corpus_name, None)
+
+    def get_corpus_version(self, corpus_name: str) -> str:
+        """
+        return a fingerprint of the corpus file listing, listed again every `listing_check_interval` seconds
+
+        Args:
+            corpus_name (str): corpus name format "projects/{project_id}/locations/{location}/corpora/{corpus_id}"
+        """
+
+        version, checked_at = self._corpus_versions.get(corpus_name, (None, 0.0))
+        if version is None or time.monotonic() - checked_at > self.listing_check_interval:
+            files = sorted(
+                (file.name, str(getattr(file, "update_time", "")))
+                for file in self.get_documents_from_corpus(corpus_name)
+            )
+            version = make_cache_key(files=files)
+            self._corpus_versions[corpus_name] = (version, time.monotonic())
+        return version
+
+    def set_local_index(
+        self,
+        corpus_name: str,
+        index: Optional[VectorIndex],
+        embed_queries: Optional[Callable[[list[str]], np.ndarray]] = None,
+    ) -> None:
+        """
+        serve the retrieval queries of a corpus from a local vector index instead of Vertex AI
+
+        Args:
+            corpus_name (str): corpus name the index replaces
+            index (Optional[VectorIndex]): index of the corpus chunks, None removes the local index
+            embed_queries (Optional[Callable[[list[str]], np.ndarray]], optional): embeds a list of queries with
+                the model the chunks were embedded with, e.g.
+                ``lambda queries: gemini.embed_from_dataframe(pd.DataFrame({"text": queries}))``. Defaults to None.
+        """
+
+        if index is None:
+            self._local_indexes.pop(corpus_name, None)
+            return
+        assert embed_queries is not None, "embed_queries is required with a local index"
+        self._local_indexes[corpus_name] = (index, embed_queries)
 
     def get_retrieval_query(
         self,
@@ -94,12 +164,31 @@ class VertexRag:
             file_ids (Optional[list[str]], optional): optional list of specific file ids to query. Defaults to None.
 
         Returns:
-            Any: retrieved context response
+            Any: retrieved context response, served from the local index or the cache when set
         """
 
+        if corpus_name in self._local_indexes:
+            return self._query_local_index(
+                corpus_name, query, similarity_top_k, vector_distance_threshold, file_ids
+            )
+
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(
+                corpus_name=corpus_name,
+                query=query,
+                similarity_top_k=similarity_top_k,
+                vector_distance_threshold=vector_distance_threshold,
+                file_ids=sorted(file_ids) if file_ids else None,
+                corpus_version=self.get_corpus_version(corpus_name),
+            )
+            cached = self.cache.get(key)
+            if cached is not None:
+                return RetrieveContextsResponse.from_json(cached)
+
         rag_resource = rag.RagResource(rag_corpus=corpus_name, rag_file_ids=file_ids)
 
-        return rag.retrieval_query(
+        response = rag.retrieval_query(
             rag_resources=[rag_resource],
             text=query,
             rag_retrieval_config=rag.RagRetrievalConfig(
@@ -108,6 +197,37 @@ class VertexRag:
             ),
         )
 
+        if key is not None:
+            self.cache.set(key, RetrieveContextsResponse.to_json(response))
+        return response
+
+    def _query_local_index(
+        self,
+        corpus_name: str,
+        query: str,
+        similarity_top_k: int,
+        vector_distance_threshold: float,
+        file_ids: Optional[list[str]],
+    ) -> RetrieveContextsResponse:
+        index, embed_queries = self._local_indexes[corpus_name]
+        rows, distances = index.search(
+            embed_queries([query]),
+            top_k=similarity_top_k,
+            max_distance=vector_distance_threshold,
+            file_ids=file_ids,
+        )
+
+        contexts = [
+            RagContexts.Context(
+                source_uri=index.source_uris[row] if index.source_uris is not None else "",
+                text=index.texts[row],
+                distance=float(distance),
+            )
+            for row, distance in zip(rows[0].tolist(), distances[0].tolist())
+            if row >= 0
+        ]
+        return RetrieveContextsResponse(contexts=RagContexts(contexts=contexts))
+
     def get_rag_tool(
         self,
         corpus_name: str,
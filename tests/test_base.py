@@ -0,0 +1,232 @@
+from datafarmer.llm.base import BaseLLM, RESULT_COLUMNS
+from datafarmer.llm.cache import ResponseCache
+from datafarmer.llm.rate_limit import RateLimiter
+from datafarmer.llm.retry import RetryPolicy
+from pandas import DataFrame
+import asyncio
+import pickle
+
+
+class EchoLLM(BaseLLM):
+    """Offline provider that echoes the prompt and tracks in-flight requests."""
+
+    def __init__(self, latency: float = 0.01, **kwargs):
+        super().__init__(min_wait=0, max_wait=0, **kwargs)
+        self.latency = latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+            if prompt == "fail":
+                raise ValueError("bad prompt")
+            return id, f"echo: {prompt}", True
+        finally:
+            self.in_flight -= 1
+
+
+def _sample_data(n: int = 20) -> DataFrame:
+    return DataFrame({"id": range(n), "prompt": [f"prompt {i}" for i in range(n)]})
+
+
+def test_batch_generation():
+    llm = EchoLLM()
+    result = llm.generate_from_dataframe(_sample_data(), batch_size=7)
+
+    assert isinstance(result, DataFrame)
+    assert sorted(result["id"]) == list(range(20))
+    assert llm.peak_in_flight <= 7
+
+
+def test_sliding_window_generation():
+    llm = EchoLLM()
+    data = _sample_data(50)
+    data.loc[3, "prompt"] = "fail"
+
+    result = llm.generate_from_dataframe(data, max_concurrency=5)
+
+    assert list(result.columns) == RESULT_COLUMNS
+    assert sorted(result["id"]) == list(range(50))
+    failed = result[result["status"] == "failed"]
+    assert list(failed["id"]) == [3]
+    assert failed["error_type"].iloc[0] == "ValueError"
+    assert failed["result"].isna().all()
+    assert llm.peak_in_flight == 5
+
+
+def test_sliding_window_queue_wait_is_per_request():
+    llm = EchoLLM(latency=0.05)
+    requests = [(i, f"prompt {i}", {}) for i in range(20)]
+    queue_waits = []
+
+    async def run():
+        return [
+            result
+            async for result in llm._iter_windowed_generation(
+                iter(requests), max_concurrency=5, queue_waits=queue_waits
+            )
+        ]
+
+    assert len(asyncio.run(run())) == 20
+    # a request waits for one slot to free up, not for every request pulled before it
+    assert len(queue_waits) == 20
+    assert max(queue_waits[:5]) < 0.01
+    assert max(queue_waits) < 0.1
+
+
+def test_resume_from_journal(tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    data = _sample_data(10)
+    data.loc[[2, 5], "prompt"] = "fail"
+
+    llm = EchoLLM()
+    first = llm.generate_from_dataframe(data, max_concurrency=4, journal=journal_path)
+    assert len(first) == 10
+    assert (first["status"] == "succeeded").sum() == 8
+
+    # fix the failed rows and resume, only the missing ids are generated again
+    data.loc[[2, 5], "prompt"] = "fixed"
+    llm = EchoLLM()
+    second = llm.generate_from_dataframe(data, journal=journal_path)
+
+    assert llm.calls == 2
+    assert sorted(second["id"]) == list(range(10))
+    assert set(second.loc[second["id"].isin([2, 5]), "result"]) == {"echo: fixed"}
+
+
+def test_redrive_failed_rows():
+    llm = EchoLLM()
+    data = _sample_data(10)
+    data.loc[[2, 5], "prompt"] = "fail"
+    result = llm.generate_from_dataframe(data)
+
+    # drop one row entirely, missing ids are generated again as well
+    result = result[result["id"] != 7]
+    data.loc[[2, 5], "prompt"] = "fixed"
+    redriven = llm.redrive(result, data, max_attempts=2)
+
+    assert sorted(redriven["id"]) == list(range(10))
+    # rows that already succeeded are kept as they were
+    kept = result[~result["id"].isin([2, 5])]
+    assert kept.merge(redriven, how="inner").shape[0] == len(kept)
+    assert set(redriven["status"]) == {"succeeded"}
+    assert redriven.loc[redriven["id"] == 2, "attempts"].item() == 2
+    assert redriven.loc[redriven["id"] == 2, "result"].item() == "echo: fixed"
+
+
+def test_plan_and_estimate():
+    class CountingLLM(EchoLLM):
+        async def _count_tokens(self, prompt, **kwargs):
+            return None if prompt == "x" * 40 else 7
+
+    data = DataFrame({"id": ["A", "B"], "prompt": ["x" * 40, "x" * 400]})
+    llm = CountingLLM(rate_limiter=RateLimiter(requests_per_minute=60, tokens_per_minute=60))
+
+    assert list(llm.plan(data)["input_tokens"]) == [11, 101]
+    assert list(llm.plan(data, count_tokens=True)["input_tokens"]) == [11, 7]
+
+    estimate = llm.estimate(
+        data, output_tokens_per_row=100, input_cost_per_million=1.0, output_cost_per_million=10.0
+    )
+    assert estimate["input_tokens"] == 112
+    assert estimate["cost"] == (112 * 1.0 + 200 * 10.0) / 1_000_000
+    assert estimate["bottleneck"] == "tokens_per_minute"
+    assert estimate["estimated_seconds"] == 112
+    assert llm.calls == 0
+
+
+def test_token_budget_batching():
+    llm = EchoLLM()
+    data = DataFrame({"id": range(6), "prompt": ["x" * 40] * 4 + ["x" * 400, "x" * 40]})
+
+    result = llm.generate_from_dataframe(data, batch_tokens=25)
+
+    assert sorted(result["id"]) == list(range(6))
+    # 11 tokens per short prompt, so two short rows per batch and the long row on its own
+    assert llm.peak_in_flight == 2
+    assert BaseLLM._get_token_batches(llm._estimate_prompt_tokens(data), 25) == [
+        slice(0, 2), slice(2, 4), slice(4, 5), slice(5, 6)
+    ]
+
+
+def test_token_budget_with_sliding_window():
+    llm = EchoLLM()
+    data = DataFrame({"id": range(8), "prompt": ["x" * 40] * 6 + ["x" * 400, "x" * 40]})
+
+    result = llm.generate_from_dataframe(data, max_concurrency=8, batch_tokens=25)
+
+    assert sorted(result["id"]) == list(range(8))
+    assert set(result["status"]) == {"succeeded"}
+    assert llm.peak_in_flight == 2
+
+
+def test_generate_iter_from_chunks():
+    def chunks():
+        for start in range(0, 30, 10):
+            yield DataFrame({"prompt": [f"prompt {i}" for i in range(start, start + 10)]})
+
+    async def collect():
+        llm = EchoLLM()
+        records = [record async for record in llm.generate_iter(chunks(), max_concurrency=3)]
+        return llm, records
+
+    llm, records = asyncio.run(collect())
+
+    assert llm.peak_in_flight == 3
+    assert sorted(id for id, _, _ in records) == list(range(30))
+    assert {status for _, _, status in records} == {"succeeded"}
+
+
+def test_dedup_fans_out_results():
+    data = DataFrame(
+        {
+            "id": range(6),
+            "prompt": ["a", "b", "a", "a", "b", "a"],
+            "language": ["en", "en", "en", "id", "en", "en"],
+        }
+    )
+
+    llm = EchoLLM()
+    result = llm.generate_from_dataframe(data, dedup=True)
+
+    assert llm.calls == 3
+    assert dict(zip(result["id"], result["result"])) == {
+        i: f"echo: {prompt}" for i, prompt in enumerate(data["prompt"])
+    }
+
+
+def test_multiprocess_workers():
+    llm = EchoLLM(latency=0.001)
+    result = llm.generate_from_dataframe(_sample_data(40), max_concurrency=8, workers=2)
+
+    assert sorted(result["id"]) == list(range(40))
+    assert set(result["result"]) == {f"echo: prompt {i}" for i in range(40)}
+
+
+def test_multiprocess_workers_report_metrics_and_cache_to_parent(tmp_path):
+    llm = EchoLLM(latency=0.001, cache=ResponseCache(path=str(tmp_path / "cache.sqlite")))
+    llm.generate_from_dataframe(_sample_data(20), max_concurrency=8, workers=2)
+    llm.generate_from_dataframe(_sample_data(20), max_concurrency=8, workers=2)
+
+    assert (llm.cache.hits, llm.cache.misses) == (20, 20)
+    snapshot = llm.metrics.snapshot()
+    assert sum(snapshot["requests"].values()) == 20
+    assert (snapshot["cache_hits"], snapshot["cache_misses"]) == (20, 20)
+    assert sum(snapshot["rows"].values()) == 40
+
+
+def test_pickle_keeps_retry_settings():
+    llm = EchoLLM(latency=0.001)
+    llm.min_wait, llm.max_wait, llm.max_attempts = 0.123, 0.5, 7
+    llm.retry_policies = {"rate_limit": RetryPolicy(1, 2)}
+
+    clone = pickle.loads(pickle.dumps(llm))
+
+    assert (clone.min_wait, clone.max_wait, clone.max_attempts) == (0.123, 0.5, 7)
+    assert clone.retry_policies["rate_limit"].max_wait == 2
+    assert clone.latency == 0.001 and clone.calls == 0
@@ -0,0 +1,104 @@
+from datafarmer.llm.base import BaseLLM
+from datafarmer.llm.batch import BatchBackend
+from pandas import DataFrame
+import pytest
+
+
+class FakeBatchBackend(BatchBackend):
+    """In-memory batch server: jobs finish after a few polls, prompt 'fail' fails."""
+
+    max_batch_size = 4
+    poll_interval = 0.01
+
+    def __init__(self, polls_until_done: int = 2):
+        self.polls_until_done = polls_until_done
+        self.jobs = {}
+
+    async def submit(self, requests):
+        job_id = f"job-{len(self.jobs)}"
+        self.jobs[job_id] = {"requests": requests, "polls": 0}
+        return job_id
+
+    async def poll(self, job_id):
+        job = self.jobs[job_id]
+        job["polls"] += 1
+        return "succeeded" if job["polls"] >= self.polls_until_done else "running"
+
+    async def results(self, job_id):
+        # results come back in reverse order, like an unordered provider output
+        requests = self.jobs[job_id]["requests"]
+        for position in reversed(range(len(requests))):
+            prompt, _ = requests[position]
+            yield position, f"batched: {prompt}", prompt != "fail"
+
+
+class BatchLLM(BaseLLM):
+    def __init__(self, backend: BatchBackend):
+        super().__init__()
+        self.backend = backend
+
+    def _get_batch_backend(self):
+        return self.backend
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        raise AssertionError("async path should not be used in batch mode")
+
+
+def test_batch_mode_shards_and_maps_results():
+    backend = FakeBatchBackend()
+    data = DataFrame({"id": list("ABCDEFGHIJ"), "prompt": [f"p{i}" for i in range(10)]})
+    data.loc[4, "prompt"] = "fail"
+
+    result = BatchLLM(backend).generate_from_dataframe(data, mode="batch")
+
+    assert len(backend.jobs) == 3
+    succeeded = result[result["status"] == "succeeded"]
+    assert dict(zip(succeeded["id"], succeeded["result"])) == {
+        id: f"batched: {prompt}" for id, prompt in zip(data["id"], data["prompt"]) if id != "E"
+    }
+    assert result.loc[result["id"] == "E", "error_type"].item() == "BatchRequestFailed"
+
+
+def test_batch_mode_failed_job():
+    backend = FakeBatchBackend()
+
+    async def failed_poll(job_id):
+        return "failed"
+
+    backend.poll = failed_poll
+    data = DataFrame({"id": ["A", "B"], "prompt": ["p0", "p1"]})
+
+    result = BatchLLM(backend).generate_from_dataframe(data, mode="batch")
+
+    assert set(result["id"]) == {"A", "B"}
+    assert set(result["status"]) == {"failed"}
+    assert set(result["error_type"]) == {"BatchJobFailed"}
+
+
+def test_batch_mode_missing_results():
+    backend = FakeBatchBackend()
+    results = backend.results
+
+    async def partial_results(job_id):
+        async for position, response, is_succeeded in results(job_id):
+            if position != 1:
+                yield position, response, is_succeeded
+
+    backend.results = partial_results
+    data = DataFrame({"id": ["A", "B", "C"], "prompt": ["p0", "p1", "p2"]})
+
+    result = BatchLLM(backend).generate_from_dataframe(data, mode="batch")
+
+    assert sorted(result["id"]) == ["A", "B", "C"]
+    assert result.loc[result["id"] == "B", "error_type"].item() == "BatchResultMissing"
+    assert set(result.loc[result["id"] != "B", "status"]) == {"succeeded"}
+
+
+def test_batch_mode_rejects_unsupported_columns():
+    backend = FakeBatchBackend()
+    backend.unsupported_kwargs = ("image_file_path",)
+    data = DataFrame({"id": ["A"], "prompt": ["p0"], "image_file_path": ["cat.png"]})
+
+    with pytest.raises(AssertionError, match="image_file_path"):
+        BatchLLM(backend).generate_from_dataframe(data, mode="batch")
+    assert not backend.jobs
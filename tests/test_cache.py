@@ -0,0 +1,74 @@
+from datafarmer.llm import ResponseCache
+from datafarmer.llm.base import BaseLLM
+from pandas import DataFrame
+import asyncio
+import sqlite3
+import time
+
+
+class CountingLLM(BaseLLM):
+    """Offline provider that counts how many requests reach it."""
+
+    def __init__(self, system_instruction=None, **kwargs):
+        super().__init__(min_wait=0, max_wait=0, **kwargs)
+        self.model = "fake-model"
+        self.system_instruction = system_instruction
+        self.calls = 0
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        self.calls += 1
+        return id, prompt.upper(), True
+
+
+def test_cache_hits_skip_generation(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"))
+    data = DataFrame({"id": ["A", "B"], "prompt": ["hello", "world"]})
+
+    llm = CountingLLM(cache=cache)
+    first = llm.generate_from_dataframe(data)
+    second = llm.generate_from_dataframe(data)
+
+    assert llm.calls == 2
+    assert sorted(second["result"]) == sorted(first["result"]) == ["HELLO", "WORLD"]
+    assert cache.stats()["hits"] == 2
+
+    # a different system instruction is a different key
+    other = CountingLLM(cache=cache, system_instruction="be brief")
+    other.generate_from_dataframe(data)
+    assert other.calls == 2
+
+
+def test_cache_eviction(tmp_path):
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), max_entries=2, ttl_seconds=60)
+    for i in range(3):
+        cache.set(f"key-{i}", "value")
+        time.sleep(0.01)
+    cache.evict()
+
+    assert cache.stats()["entries"] == 2
+    assert cache.get("key-0") is None
+    assert cache.get("key-2") == "value"
+
+    cache.ttl_seconds = 0
+    assert cache.get("key-2") is None
+
+
+def test_locked_cache_does_not_block(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = ResponseCache(path=path, busy_timeout=0.05)
+    cache.set("key", "value")
+
+    # another process holds the write lock
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")
+    try:
+        started_at = time.perf_counter()
+        assert asyncio.run(cache.get_async("key")) == "value"
+        asyncio.run(cache.set_async("other", "value"))
+        assert time.perf_counter() - started_at < 1
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+
+    assert cache.get("other") is None
+    assert cache.stats()["hits"] == 1
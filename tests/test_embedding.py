@@ -0,0 +1,117 @@
+from datafarmer.llm import Gemini, GithubCopilot, RateLimiter
+from datafarmer.llm.embedding import get_embedding_batches
+from tests.test_base import EchoLLM
+from types import SimpleNamespace
+import asyncio
+import base64
+import numpy as np
+import polars as pl
+import random
+
+
+class EmbedLLM(EchoLLM):
+    """Embeds text i as [i, 1, 0], a batch with "fail" fails for good."""
+
+    _embedding_model = "echo-embedding"
+    _embed_batch_size = 4
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.batches = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    async def _embed_batch(self, texts, model, dimensions=None, **kwargs):
+        self.batches.append(len(texts))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "fail" in texts:
+            raise ValueError("bad input")
+        return [[float(text.removeprefix("t")), 1.0, 0.0] for text in texts]
+
+
+def test_get_embedding_batches():
+    tokens = np.array([10, 10, 10, 50, 10, 10, 10, 10])
+    batches = get_embedding_batches(tokens, batch_size=3, batch_tokens=40)
+    assert [(b.start, b.stop) for b in batches] == [(0, 3), (3, 4), (4, 7), (7, 8)]
+
+
+def test_embed_in_order_with_failed_batches(tmp_path):
+    llm = EmbedLLM()
+    texts = [f"t{i}" for i in range(10)] + ["fail"]
+    data = pl.DataFrame({"text": texts})
+
+    matrix = llm.embed_from_dataframe(data, max_concurrency=2)
+
+    assert matrix.dtype == np.float32 and matrix.shape == (11, 3)
+    assert matrix[:8, 0].tolist() == list(range(8))
+    # the last batch holds t8, t9 and "fail"
+    assert np.isnan(matrix[8:]).all()
+    assert llm.batches == [4, 4, 3] and llm.peak_in_flight == 2
+
+    path = str(tmp_path / "vectors.npy")
+    written = llm.embed_from_dataframe(data.head(10), output_path=path, normalize=True)
+    loaded = np.load(path, mmap_mode="r")
+    assert isinstance(written, np.memmap) and loaded.shape == (10, 3)
+    np.testing.assert_allclose(np.linalg.norm(loaded, axis=1), 1.0, rtol=1e-6)
+
+
+def test_embedding_records_rate_limiter_idle_time():
+    limiter = RateLimiter(tokens_per_minute=6000)
+    llm = EmbedLLM(rate_limiter=limiter)
+    # use up the initial burst, the next requests wait for the bucket to refill
+    asyncio.run(limiter.acquire("echo-embedding", tokens=6000))
+
+    llm.embed_from_dataframe(pl.DataFrame({"text": [f"t{i}" for i in range(10)]}))
+
+    assert llm.idle_seconds["rate_limiter"] > 0.1
+    assert llm.metrics.snapshot()["limiter_wait_total"] == llm.idle_seconds["rate_limiter"]
+
+
+def test_openai_embeddings_are_decoded_from_base64():
+    copilot = GithubCopilot(github_token="token", min_wait=0, max_wait=0)
+    requests = []
+
+    async def create(model, input, encoding_format, timeout, **kwargs):
+        requests.append(dict(model=model, size=len(input), encoding_format=encoding_format, **kwargs))
+        data = [
+            SimpleNamespace(
+                index=i,
+                embedding=base64.b64encode(np.array([len(text), i], dtype="<f4").tobytes()).decode(),
+            )
+            for i, text in enumerate(input)
+        ]
+        random.shuffle(data)
+        return SimpleNamespace(data=data)
+
+    copilot.client.embeddings.create = create
+
+    texts = ["a" * (i + 1) for i in range(5)]
+    matrix = copilot.embed_from_dataframe(
+        pl.DataFrame({"text": texts}), batch_size=2, dimensions=2
+    )
+
+    assert matrix[:, 0].tolist() == [1, 2, 3, 4, 5]
+    assert requests[0] == dict(
+        model="text-embedding-3-small", size=2, encoding_format="base64", dimensions=2
+    )
+
+
+def test_gemini_embed_content_batches():
+    gemini = Gemini(project_id="project", min_wait=0, max_wait=0)
+    calls = []
+
+    async def embed_content(model, contents, config):
+        calls.append((model, len(contents), config.task_type))
+        return SimpleNamespace(embeddings=[SimpleNamespace(values=[0.5] * 8) for _ in contents])
+
+    gemini.client.aio.models.embed_content = embed_content
+
+    data = pl.DataFrame({"text": ["document"] * 600})
+    matrix = gemini.embed_from_dataframe(data, task_type="RETRIEVAL_DOCUMENT")
+
+    assert matrix.shape == (600, 8)
+    assert [size for _, size, _ in calls] == [250, 250, 100]
+    assert calls[0][0] == "text-embedding-005" and calls[0][2] == "RETRIEVAL_DOCUMENT"
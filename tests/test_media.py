@@ -0,0 +1,127 @@
+from datafarmer.llm.media import MediaCache, guess_mime_type
+from pandas import DataFrame
+import asyncio
+import os
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n" + b"\x00" * 8
+
+
+def test_guess_mime_type():
+    assert guess_mime_type("photo.jpg", PNG_HEADER) == "image/png"
+    assert guess_mime_type("clip", b"RIFF\x00\x00\x00\x00WAVEfmt ") == "audio/wav"
+    assert guess_mime_type("clip.mp3", b"ID3\x03") == "audio/mpeg"
+    assert guess_mime_type("gs://bucket/scan.pdf") == "application/pdf"
+    assert guess_mime_type("recording", file_type="audio") == "audio/mpeg"
+    assert guess_mime_type("unknown") == "application/octet-stream"
+
+
+def test_media_cache_reads_once_and_evicts(tmp_path):
+    paths = []
+    for i in range(3):
+        path = tmp_path / f"image_{i}.bin"
+        path.write_bytes(PNG_HEADER + bytes(1024 * 1024 - len(PNG_HEADER)))
+        paths.append(str(path))
+
+    cache = MediaCache(max_size_mb=2)
+    reads = []
+    original_read = cache._read
+
+    def counting_read(file_path, file_type):
+        reads.append(file_path)
+        return original_read(file_path, file_type)
+
+    cache._read = counting_read
+
+    async def load_all():
+        return await asyncio.gather(*[cache.load(paths[0], "image") for _ in range(10)])
+
+    results = asyncio.run(load_all())
+    assert reads == [paths[0]]
+    assert {mime_type for _, mime_type in results} == {"image/png"}
+
+    asyncio.run(cache.load(paths[1]))
+    asyncio.run(cache.load(paths[2]))
+    assert cache.stats()["entries"] == 2 and cache.size <= cache.max_size
+
+    # the least recently used file was evicted and is read again
+    asyncio.run(cache.load(paths[0]))
+    assert reads.count(paths[0]) == 2
+
+    # an edited file is read again
+    os.utime(paths[2], ns=(0, 0))
+    asyncio.run(cache.load(paths[2]))
+    assert reads.count(paths[2]) == 2
+
+
+def test_gemini_genai_sends_file_parts(tmp_path):
+    from datafarmer.llm import Gemini
+
+    image_path = tmp_path / "image.jpg"
+    image_path.write_bytes(PNG_HEADER)
+
+    gemini = Gemini(project_id="project", min_wait=0, max_wait=0)
+    requests = []
+
+    class Response:
+        text = "ok"
+
+    async def generate_content(model, contents, config):
+        requests.append(contents)
+        return Response()
+
+    gemini.client.aio.models.generate_content = generate_content
+
+    data = DataFrame(
+        {"id": range(4), "prompt": ["describe"] * 4, "image_file_path": [str(image_path)] * 4}
+    )
+    result = gemini.generate_from_dataframe(data)
+
+    assert set(result["status"]) == {"succeeded"}
+    prompt, part = requests[0]
+    assert prompt == "describe"
+    assert part.inline_data.mime_type == "image/png"
+    assert part.inline_data.data == PNG_HEADER
+    assert gemini.media_cache.stats()["misses"] == 1
+
+
+def test_gemini_uploads_large_files_once(tmp_path):
+    from datafarmer.llm import Gemini
+
+    audio_path = tmp_path / "call.wav"
+    audio_path.write_bytes(b"RIFF\x00\x00\x00\x00WAVEfmt " + bytes(2048))
+
+    gemini = Gemini(
+        project_id="project",
+        client_kwargs={"vertexai": False, "api_key": "key", "project": None, "location": None},
+        upload_threshold_mb=0.001,
+        min_wait=0,
+        max_wait=0,
+    )
+    uploads, requests = [], []
+
+    class Uploaded:
+        uri = "https://generativelanguage.googleapis.com/v1beta/files/abc"
+        mime_type = "audio/wav"
+
+    async def upload(file, config):
+        uploads.append((file, config.mime_type))
+        await asyncio.sleep(0.01)
+        return Uploaded()
+
+    class Response:
+        text = "ok"
+
+    async def generate_content(model, contents, config):
+        requests.append(contents)
+        return Response()
+
+    gemini.client.aio.files.upload = upload
+    gemini.client.aio.models.generate_content = generate_content
+
+    data = DataFrame(
+        {"id": range(5), "prompt": ["transcribe"] * 5, "audio_file_path": [str(audio_path)] * 5}
+    )
+    gemini.generate_from_dataframe(data)
+
+    assert uploads == [(str(audio_path), "audio/wav")]
+    assert {contents[1].file_data.file_uri for contents in requests} == {Uploaded.uri}
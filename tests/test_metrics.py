@@ -0,0 +1,104 @@
+from datafarmer.llm.metrics import InMemoryMetrics
+from tests.test_base import EchoLLM, _sample_data
+import time
+
+
+class FlakyLLM(EchoLLM):
+    """Times out on the first attempt of every even id."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = set()
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        if id % 2 == 0 and id not in self.seen:
+            self.seen.add(id)
+            raise TimeoutError("slow")
+        return await super()._generate_single(id, prompt, **kwargs)
+
+
+def test_metrics_are_recorded():
+    llm = FlakyLLM(latency=0.001)
+    data = _sample_data(10)
+    data.loc[3, "prompt"] = "fail"
+
+    llm.generate_from_dataframe(data, max_concurrency=4)
+    snapshot = llm.metrics.snapshot()
+
+    assert snapshot["rows"] == {"succeeded": 9, "failed": 1}
+    assert snapshot["retries"] == {"FlakyLLM|timeout": 5}
+    assert snapshot["requests"] == {"FlakyLLM|failed": 6, "FlakyLLM|succeeded": 9}
+    assert snapshot["in_flight"] == 0
+    assert snapshot["peak_in_flight"] == 4
+    assert snapshot["attempts_mean"] == 1.5
+    assert snapshot["input_tokens"] > 0 and snapshot["rows_per_second"] > 0
+
+
+def test_summary_covers_only_the_last_run():
+    llm = EchoLLM(latency=0.01)
+    llm.generate_from_dataframe(_sample_data(20), max_concurrency=20)
+    time.sleep(1)
+    llm.generate_from_dataframe(_sample_data(20), max_concurrency=20)
+
+    # over both runs and the pause it would be below 40 rows/s
+    rows_per_second = float(llm.metrics.summary().split()[1])
+    assert rows_per_second > 100
+    assert llm.metrics.snapshot()["rows"] == {"succeeded": 40}
+
+
+def test_metrics_export():
+    metrics = InMemoryMetrics()
+    metrics.on_request_start("m")
+    metrics.on_request_end("m", "succeeded", 0.2, input_tokens=10, output_tokens=5)
+    metrics.on_retry("m", "rate_limit")
+    metrics.on_result("succeeded", 2, 200.0)
+
+    text = metrics.to_prometheus()
+    assert 'datafarmer_llm_requests_total{model="m",status="succeeded"} 1' in text
+    assert 'datafarmer_llm_retries_total{model="m",category="rate_limit"} 1' in text
+    assert 'datafarmer_llm_request_duration_seconds_bucket{model="m",le="0.25"} 1' in text
+    assert 'datafarmer_llm_request_duration_seconds_bucket{model="m",le="+Inf"} 1' in text
+
+    otlp = metrics.to_otlp()
+    exported = {
+        metric["name"]: metric
+        for metric in otlp["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]
+    }
+    duration = exported["datafarmer.llm.request.duration"]["histogram"]["dataPoints"][0]
+    assert duration["count"] == "1"
+    assert len(duration["bucketCounts"]) == len(duration["explicitBounds"]) + 1
+
+
+def test_metrics_export_start_time_and_label_escaping():
+    metrics = InMemoryMetrics()
+    model = 'tuned "v2"\\a\nb'
+    metrics.on_request_start(model)
+    metrics.on_request_end(model, "ok", 0.1)
+
+    assert 'model="tuned \\"v2\\"\\\\a\\nb"' in metrics.to_prometheus()
+
+    exported = metrics.to_otlp()["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]
+    points = [
+        point
+        for metric in exported
+        for kind in ("sum", "histogram")
+        for point in metric.get(kind, {}).get("dataPoints", [])
+    ]
+    assert points
+    assert all(point["startTimeUnixNano"] == str(metrics.reset_at_ns) for point in points)
+    assert all(int(point["startTimeUnixNano"]) <= int(point["timeUnixNano"]) for point in points)
+
+    metrics.reset()
+    assert metrics.reset_at_ns >= int(points[0]["startTimeUnixNano"])
+
+
+def test_metrics_recording_is_cheap():
+    metrics = InMemoryMetrics()
+    started_at = time.perf_counter()
+    for i in range(20_000):
+        metrics.on_request_start("m")
+        metrics.on_request_end("m", "succeeded", i % 100 / 100, 100, 50)
+        metrics.on_result("succeeded", 1, 10.0)
+
+    # far below a millisecond per request, so it can stay on at 1000+ req/s
+    assert (time.perf_counter() - started_at) / 20_000 < 1e-4
@@ -0,0 +1,94 @@
+from tests.test_base import EchoLLM
+import asyncio
+import polars as pl
+import pyarrow as pa
+import pytest
+
+
+@pytest.fixture
+def no_pandas(monkeypatch):
+    """Fail the test if the engine converts the input to pandas."""
+
+    def to_pandas(*args, **kwargs):
+        raise AssertionError("input was converted to pandas")
+
+    monkeypatch.setattr(pl.DataFrame, "to_pandas", to_pandas)
+
+
+def test_polars_in_polars_out(no_pandas):
+    llm = EchoLLM()
+    data = pl.DataFrame(
+        {"id": [f"row-{i}" for i in range(6)], "prompt": [f"p{i}" for i in range(6)], "tag": range(6)}
+    )
+
+    result = llm.generate_from_dataframe(data, batch_size=4)
+
+    assert isinstance(result, pl.DataFrame)
+    assert result.schema["attempts"] == pl.Int64 and result.schema["latency_ms"] == pl.Float64
+    assert dict(zip(result["id"], result["result"])) == {
+        f"row-{i}": f"echo: p{i}" for i in range(6)
+    }
+
+    windowed = llm.generate_from_dataframe(data, max_concurrency=2)
+    assert isinstance(windowed, pl.DataFrame) and windowed.height == 6
+
+
+def test_lazyframe_with_template_and_dedup(no_pandas):
+    llm = EchoLLM()
+    data = pl.LazyFrame({"review": ["good", "bad", "good", None]})
+
+    result = llm.generate_from_dataframe(
+        data, prompt_template="Classify: {review}", dedup=True, max_concurrency=4
+    )
+
+    assert isinstance(result, pl.DataFrame)
+    assert result.sort("id")["result"].to_list() == [
+        "echo: Classify: good",
+        "echo: Classify: bad",
+        "echo: Classify: good",
+        "echo: Classify: ",
+    ]
+    assert llm.metrics.snapshot()["rows"] == {"succeeded": 3}
+
+
+def test_arrow_in_arrow_out_with_journal(tmp_path, no_pandas):
+    llm = EchoLLM()
+    data = pa.table({"id": [1, 2, 3, 4], "prompt": ["a", "fail", "c", "d"]})
+    journal = str(tmp_path / "journal.jsonl")
+
+    result = llm.generate_from_dataframe(data, journal=journal)
+
+    assert isinstance(result, pa.Table)
+    assert sorted(result.column("status").to_pylist()) == ["failed"] + ["succeeded"] * 3
+
+    # ids in the journal are resumed, the failed row is generated again
+    resumed = llm.generate_from_dataframe(data, journal=journal)
+    assert isinstance(resumed, pa.Table) and resumed.num_rows == 4
+    assert llm.metrics.snapshot()["rows"]["failed"] == 2
+
+
+def test_redrive_polars():
+    llm = EchoLLM()
+    data = pl.DataFrame({"id": range(5), "prompt": ["a", "fail", "c", "fail", "e"]})
+    result = llm.generate_from_dataframe(data)
+
+    fixed = data.with_columns(pl.col("prompt").str.replace("fail", "fixed"))
+    redriven = llm.redrive(result, fixed)
+
+    assert isinstance(redriven, pl.DataFrame)
+    assert set(redriven["status"]) == {"succeeded"}
+    # the failed attempt and the redriven one
+    assert redriven.filter(pl.col("id") == 1)["attempts"].item() == 2
+
+
+def test_generate_iter_over_arrow_batches(no_pandas):
+    llm = EchoLLM()
+    data = pa.table({"prompt": [f"p{i}" for i in range(25)]})
+
+    async def collect():
+        return [item async for item in llm.generate_iter(data, chunk_size=10, max_concurrency=5)]
+
+    results = asyncio.run(collect())
+
+    assert sorted(id for id, _, _ in results) == list(range(25))
+    assert all(status == "succeeded" for _, _, status in results)
@@ -0,0 +1,97 @@
+from datafarmer.llm.pool import TargetPool
+from pandas import DataFrame
+import asyncio
+import time
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+
+def test_weighted_least_outstanding():
+    pool = TargetPool(["a", "b"], weights=[1, 3])
+
+    picks = [pool.acquire() for _ in range(8)]
+
+    assert picks.count(0) == 2 and picks.count(1) == 6
+    stats = pool.stats()
+    assert [target["outstanding"] for target in stats] == [2, 6]
+
+
+def test_ejection_and_recovery():
+    pool = TargetPool(["a", "b"], eject_seconds=0.05)
+
+    index = pool.acquire()
+    pool.release(index, error=QuotaError("quota"))
+    assert all(pool.acquire() != index for _ in range(5))
+    assert pool.stats()[index]["is_ejected"] and pool.stats()[index]["ejections"] == 1
+
+    time.sleep(0.06)
+    assert not pool.stats()[index]["is_ejected"]
+
+    # a non-retryable error doesn't eject
+    other = 1 - index
+    pool.release(other, error=ValueError("bad request"))
+    assert not pool.stats()[other]["is_ejected"]
+
+
+def test_cancelled_request_only_frees_its_slot():
+    pool = TargetPool(["a"], eject_seconds=0.01)
+    pool.release(pool.acquire(), error=QuotaError("quota"))
+
+    pool.release(pool.acquire(), seconds=5.0, error=None, cancelled=True)
+
+    stats = pool.stats()[0]
+    assert (stats["outstanding"], stats["successes"], stats["failures"]) == (0, 0, 1)
+    assert stats["mean_latency"] == 0.0
+    # the failure streak is not reset by the cancelled request
+    assert pool.targets[0].consecutive_failures == 1
+
+
+def test_all_ejected_uses_first_to_recover():
+    pool = TargetPool(["a", "b"], eject_seconds=10)
+    pool.release(pool.acquire(), error=QuotaError("quota"))
+    first = 1 - pool.acquire()
+    pool.release(1 - first, error=QuotaError("quota"))
+
+    # the first ejected target recovers first
+    assert pool.acquire() == first
+
+
+def test_gemini_spreads_over_targets():
+    from datafarmer.llm import Gemini
+
+    gemini = Gemini(
+        project_id="project",
+        targets=[
+            {"project": "project-a", "location": "us-central1"},
+            {"project": "project-b", "location": "europe-west4"},
+        ],
+        min_wait=0,
+        max_wait=0,
+    )
+
+    class Response:
+        def __init__(self, text):
+            self.text = text
+
+    def fake_generate(name, fail=False):
+        async def generate_content(model, contents, config):
+            await asyncio.sleep(0.01)
+            if fail:
+                raise QuotaError("quota")
+            return Response(f"{name}: {contents}")
+
+        return generate_content
+
+    gemini.clients[0].aio.models.generate_content = fake_generate("a", fail=True)
+    gemini.clients[1].aio.models.generate_content = fake_generate("b")
+
+    data = DataFrame({"id": range(6), "prompt": [f"p{i}" for i in range(6)]})
+    result = gemini.generate_from_dataframe(data, max_concurrency=2)
+
+    assert set(result["status"]) == {"succeeded"}
+    assert all(response.startswith("b: ") for response in result["result"])
+    stats = gemini.target_stats().set_index("target")
+    assert stats.loc["project-a/us-central1#0", "ejections"] == 1
+    assert stats.loc["project-b/europe-west4#1", "successes"] == 6
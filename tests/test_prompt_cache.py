@@ -0,0 +1,122 @@
+from datafarmer.llm import Anthropic, Gemini, InMemoryMetrics
+from pandas import DataFrame
+from types import SimpleNamespace
+import asyncio
+import time
+
+RUBRIC = "Grade the answer against the following rubric. " * 200
+
+
+def test_anthropic_marks_system_instruction_cacheable():
+    anthropic = Anthropic(
+        api_key="key", system_instruction=RUBRIC, prompt_caching=True, min_wait=0, max_wait=0
+    )
+    requests = []
+
+    async def create(timeout, **kwargs):
+        requests.append(kwargs)
+        first = len(requests) == 1
+        usage = SimpleNamespace(
+            input_tokens=5,
+            cache_creation_input_tokens=1000 if first else 0,
+            cache_read_input_tokens=0 if first else 1000,
+        )
+        return SimpleNamespace(content=[SimpleNamespace(text="ok")], usage=usage)
+
+    anthropic.client.messages.create = create
+
+    # one row first so the cache is written before the others read it
+    data = DataFrame({"id": range(4), "prompt": ["answer"] * 4})
+    anthropic.generate_from_dataframe(data.iloc[:1])
+    anthropic.generate_from_dataframe(data.iloc[1:])
+
+    assert requests[0]["system"] == [
+        {"type": "text", "text": RUBRIC, "cache_control": {"type": "ephemeral"}}
+    ]
+    snapshot = anthropic.metrics.snapshot()
+    assert snapshot["prompt_cache_hits"] == 3 and snapshot["prompt_cache_misses"] == 1
+    assert snapshot["prompt_cache_read_tokens"] == 3000
+    assert snapshot["prompt_cache_write_tokens"] == 1000
+
+
+def test_anthropic_without_prompt_caching_sends_plain_system():
+    anthropic = Anthropic(api_key="key", system_instruction=RUBRIC)
+
+    assert anthropic._get_message_params("answer")["system"] == RUBRIC
+
+
+def test_gemini_creates_and_refreshes_context_cache():
+    gemini = Gemini(
+        project_id="project",
+        system_instruction=RUBRIC,
+        context_cache_ttl=600,
+        min_wait=0,
+        max_wait=0,
+    )
+    created, updated, configs = [], [], []
+
+    async def create(model, config):
+        created.append(config)
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(
+            name="cachedContents/1", usage_metadata=SimpleNamespace(total_token_count=2000)
+        )
+
+    async def update(name, config):
+        updated.append((name, config.ttl))
+
+    async def generate_content(model, contents, config):
+        configs.append(config)
+        usage = SimpleNamespace(prompt_token_count=2005, cached_content_token_count=2000)
+        return SimpleNamespace(text="ok", usage_metadata=usage)
+
+    gemini.client.aio.caches.create = create
+    gemini.client.aio.caches.update = update
+    gemini.client.aio.models.generate_content = generate_content
+
+    data = DataFrame({"id": range(5), "prompt": ["answer"] * 5})
+    result = gemini.generate_from_dataframe(data)
+
+    assert set(result["status"]) == {"succeeded"}
+    assert len(created) == 1 and created[0].system_instruction == RUBRIC
+    assert created[0].ttl == "600s"
+    assert {config.cached_content for config in configs} == {"cachedContents/1"}
+    assert all(config.system_instruction is None for config in configs)
+
+    snapshot = gemini.metrics.snapshot()
+    assert snapshot["prompt_cache_hits"] == 5
+    assert snapshot["prompt_cache_read_tokens"] == 10_000
+    assert snapshot["prompt_cache_write_tokens"] == 2000
+
+    # past half of its TTL the cache is extended instead of created again
+    next(iter(gemini._context_caches.values()))["expire_at"] = time.monotonic() + 60
+    gemini.generate_from_dataframe(data.iloc[:1])
+    assert len(created) == 1 and updated == [("cachedContents/1", "600s")]
+
+
+def test_gemini_falls_back_when_prefix_cannot_be_cached():
+    gemini = Gemini(
+        project_id="project",
+        system_instruction="short",
+        context_cache_ttl=600,
+        min_wait=0,
+        max_wait=0,
+        metrics=InMemoryMetrics(),
+    )
+    configs = []
+
+    async def create(model, config):
+        raise ValueError("Cached content is too small")
+
+    async def generate_content(model, contents, config):
+        configs.append(config)
+        return SimpleNamespace(text="ok", usage_metadata=None)
+
+    gemini.client.aio.caches.create = create
+    gemini.client.aio.models.generate_content = generate_content
+
+    result = gemini.generate_from_dataframe(DataFrame({"id": range(3), "prompt": ["answer"] * 3}))
+
+    assert set(result["status"]) == {"succeeded"}
+    assert all(config.cached_content is None for config in configs)
+    assert all(config.system_instruction == "short" for config in configs)
@@ -0,0 +1,98 @@
+from datafarmer.llm import RateLimiter
+from datafarmer.llm.base import BaseLLM
+from pandas import DataFrame
+import asyncio
+import pickle
+import time
+
+
+class RateLimitError(Exception):
+    status_code = 429
+
+
+class QuotaLLM(BaseLLM):
+    """Offline provider that answers 429 for the first `failures` calls."""
+
+    def __init__(self, failures: int = 0, **kwargs):
+        super().__init__(min_wait=0, max_wait=0, **kwargs)
+        self.model = "fake-model"
+        self.failures = failures
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        if self.failures > 0:
+            self.failures -= 1
+            raise RateLimitError("quota exceeded")
+        return id, prompt, True
+
+
+def test_rate_limiter_aimd():
+    limiter = RateLimiter(
+        requests_per_minute=60,
+        decrease_factor=0.5,
+        increase_step=0.1,
+        success_threshold=2,
+        decrease_cooldown=0,
+    )
+
+    limiter.on_rate_limited("model-a")
+    limiter.on_rate_limited("model-a")
+    assert limiter.get_rate_fraction("model-a") == 0.25
+    assert limiter.get_rate_fraction("model-b") == 1.0
+
+    for _ in range(4):
+        limiter.on_success("model-a")
+    assert round(limiter.get_rate_fraction("model-a"), 2) == 0.45
+
+
+def test_rate_limiter_wave_of_429s_is_one_decrease():
+    limiter = RateLimiter(requests_per_minute=6000, decrease_cooldown=0.2)
+    llm = QuotaLLM(failures=50, rate_limiter=limiter, max_attempts=1)
+
+    # 50 concurrent requests all sent before the first 429 comes back
+    llm.generate_from_dataframe(
+        DataFrame({"id": range(50), "prompt": ["p"] * 50}), max_concurrency=50
+    )
+    assert limiter.get_rate_fraction("fake-model") == 0.5
+
+    # a 429 of a request sent after the cooldown cuts the rate again
+    time.sleep(0.25)
+    limiter.on_rate_limited("fake-model", sent_at=time.monotonic())
+    assert limiter.get_rate_fraction("fake-model") == 0.25
+
+
+def test_rate_limiter_requests_per_minute():
+    # 600 rpm -> one request every 0.1s once the initial burst of 600 is used
+    limiter = RateLimiter(requests_per_minute=600)
+    limiter._get_buckets("model")[0].level = 0
+
+    async def acquire_many():
+        await asyncio.gather(*[limiter.acquire("model") for _ in range(5)])
+
+    started_at = time.monotonic()
+    asyncio.run(acquire_many())
+    assert time.monotonic() - started_at >= 0.45
+
+
+def test_rate_limiter_shared_across_instances():
+    limiter = RateLimiter(requests_per_minute=10_000, success_threshold=1000)
+    first = QuotaLLM(failures=1, rate_limiter=limiter)
+    second = QuotaLLM(rate_limiter=limiter)
+    data = DataFrame({"id": ["A"], "prompt": ["hello"]})
+
+    result = first.generate_from_dataframe(data)
+    assert result["result"].tolist() == ["hello"]
+    assert limiter.get_rate_fraction("fake-model") == 0.5
+
+    second.generate_from_dataframe(data)
+    assert second.rate_limiter is first.rate_limiter
+
+
+def test_rate_limiter_split():
+    limiter = RateLimiter(
+        requests_per_minute=1200, model_limits={"pro": {"tokens_per_minute": 90_000}}
+    )
+    share = pickle.loads(pickle.dumps(limiter.split(3)))
+
+    assert share.requests_per_minute == 400
+    assert share.model_limits == {"pro": {"tokens_per_minute": 30_000}}
+    assert share.get_rate_fraction("pro") == 1.0
@@ -0,0 +1,117 @@
+from datafarmer.llm.base import RESULT_COLUMNS
+from datafarmer.llm.retry import RetryPolicy, get_retry_after
+from pandas import DataFrame
+from tests.test_base import EchoLLM, _sample_data
+import httpx
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+    def __init__(self, headers=None):
+        super().__init__("quota exhausted")
+        self.response = httpx.Response(429, headers=headers or {})
+
+
+class GoogleQuotaError(Exception):
+    code = 429
+
+    def __init__(self):
+        super().__init__("429 RESOURCE_EXHAUSTED")
+        self.details = {
+            "error": {
+                "code": 429,
+                "details": [
+                    {"@type": "type.googleapis.com/google.rpc.RetryInfo", "retryDelay": "3s"}
+                ],
+            }
+        }
+
+
+def test_get_retry_after():
+    assert get_retry_after(QuotaError({"retry-after": "2"})) == 2.0
+    assert get_retry_after(QuotaError({"retry-after-ms": "250"})) == 0.25
+    assert get_retry_after(GoogleQuotaError()) == 3.0
+    assert get_retry_after(ValueError("Please retry in 1.5s.")) == 1.5
+    assert get_retry_after(QuotaError()) is None
+
+
+def test_retry_policy_wait():
+    policy = RetryPolicy(min_wait=1, max_wait=8, jitter=0, seed=0)
+    assert [policy.get_wait(attempt) for attempt in range(1, 6)] == [1, 2, 4, 8, 8]
+    # a suggested delay replaces the backoff, even below min_wait, and is cut to max_wait
+    assert policy.get_wait(1, retry_after=0.5) == 0.5
+    assert policy.get_wait(1, retry_after=3600) == 8
+    assert RetryPolicy(max_wait=8, max_retry_after=30, jitter=0).get_wait(1, retry_after=3600) == 30
+
+    jittered = RetryPolicy(min_wait=1, max_wait=4, jitter=0.5, seed=0)
+    waits = [jittered.get_wait(3) for _ in range(100)]
+    assert all(2 <= wait <= 4 for wait in waits) and len(set(waits)) > 1
+    # the jitter never takes a wait below min_wait or a Retry-After above max_retry_after
+    assert all(jittered.get_wait(1) == 1 for _ in range(100))
+    assert all(0.5 <= jittered.get_wait(1, retry_after=0.5) <= 0.525 for _ in range(100))
+    assert all(jittered.get_wait(1, retry_after=4) == 4 for _ in range(100))
+
+
+class RetryAfterLLM(EchoLLM):
+    """Rate limited once per id, with a short Retry-After."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.seen = set()
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        if id not in self.seen:
+            self.seen.add(id)
+            raise QuotaError({"retry-after": "0.05"})
+        return await super()._generate_single(id, prompt, **kwargs)
+
+
+def test_retry_after_is_honored_over_min_wait():
+    llm = RetryAfterLLM()
+    # the default policy would sleep at least 10s, the provider asks for 0.05s
+    llm.min_wait, llm.max_wait = 10, 60
+
+    result = llm.generate_from_dataframe(_sample_data(5), max_concurrency=5)
+
+    assert set(result["status"]) == {"succeeded"}
+    assert result["latency_ms"].max() < 1000
+    assert 0.25 <= llm.idle_seconds["retry_backoff"] < 0.5
+    assert llm.metrics.snapshot()["retry_wait_total"]["rate_limit"] == llm.idle_seconds["retry_backoff"]
+
+
+def test_per_error_class_policy():
+    class TimeoutLLM(EchoLLM):
+        async def _generate_single(self, id, prompt, **kwargs):
+            self.calls += 1
+            raise TimeoutError("slow")
+
+    llm = TimeoutLLM(
+        max_attempts=5,
+        retry_policies={"timeout": RetryPolicy(min_wait=0, max_wait=0, max_attempts=2)},
+    )
+    result = llm.generate_from_dataframe(_sample_data(3))
+
+    assert llm.calls == 6
+    assert set(result["error_type"]) == {"TimeoutError"}
+    assert set(result["attempts"]) == {2}
+
+
+def test_redrive_overrides_replace_retry_policies():
+    class AlwaysRateLimitedLLM(EchoLLM):
+        async def _generate_single(self, id, prompt, **kwargs):
+            self.calls += 1
+            raise QuotaError()
+
+    llm = AlwaysRateLimitedLLM(
+        retry_policies={"rate_limit": RetryPolicy(min_wait=1.5, max_wait=1.5, jitter=0)}
+    )
+    data = _sample_data(2)
+    no_results = DataFrame(columns=RESULT_COLUMNS)
+
+    redriven = llm.redrive(no_results, data, min_wait=0, max_wait=0, max_attempts=2)
+
+    assert set(redriven["attempts"]) == {2}
+    assert redriven["latency_ms"].max() < 1000
+    # the LLM itself keeps its policies
+    assert llm.retry_policies["rate_limit"].min_wait == 1.5
@@ -0,0 +1,81 @@
+from datafarmer.llm.router import RouterLLM
+from tests.test_base import EchoLLM
+from pandas import DataFrame
+import asyncio
+
+
+class QuotaError(Exception):
+    status_code = 429
+
+
+class NamedLLM(EchoLLM):
+    """Echoes its name, prompt 'slow' hangs and prompts in `quota` raise a 429."""
+
+    def __init__(self, name, slow_latency=2.0, quota=(), **kwargs):
+        super().__init__(**kwargs)
+        self.model = name
+        self.slow_latency = slow_latency
+        self.quota = set(quota)
+        self.cancelled = 0
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        self.calls += 1
+        if prompt in self.quota:
+            raise QuotaError("quota exhausted")
+        try:
+            await asyncio.sleep(self.slow_latency if prompt == "slow" else self.latency)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        return id, f"{self.model}: {prompt}", True
+
+
+def _data(prompts):
+    return DataFrame({"id": range(len(prompts)), "prompt": prompts})
+
+
+def test_hedged_request_wins_and_cancels_primary():
+    primary, backup = NamedLLM("primary"), NamedLLM("backup", slow_latency=0.01)
+    router = RouterLLM([primary, backup], hedge_after=0.05, hedge_budget=0.5, min_wait=0, max_wait=0)
+
+    result = router.generate_from_dataframe(_data(["a", "slow", "b"]), max_concurrency=3)
+
+    assert dict(zip(result["id"], result["result"])) == {
+        0: "primary: a", 1: "backup: slow", 2: "primary: b"
+    }
+    assert router.stats["hedged"] == 1 and router.stats["hedge_wins"] == 1
+    assert primary.cancelled == 1
+    assert result["latency_ms"].max() < 1000
+    assert primary.metrics.snapshot()["in_flight"] == 0
+
+
+def test_hedge_budget_limits_duplicates():
+    primary, backup = NamedLLM("primary", slow_latency=0.1), NamedLLM("backup")
+    router = RouterLLM([primary, backup], hedge_after=0.01, hedge_budget=0.0)
+
+    result = router.generate_from_dataframe(_data(["slow", "slow"]))
+
+    assert set(result["result"]) == {"primary: slow"}
+    assert router.stats["hedged"] == 0 and backup.calls == 0
+
+
+def test_failover_on_quota_error():
+    primary, backup = NamedLLM("primary", quota=["a"]), NamedLLM("backup")
+    router = RouterLLM([primary, backup], min_wait=0, max_wait=0)
+
+    result = router.generate_from_dataframe(_data(["a", "b"]))
+
+    assert dict(zip(result["id"], result["result"])) == {0: "backup: a", 1: "primary: b"}
+    assert router.stats["failovers"] == 1
+
+
+def test_percentile_hedge_delay():
+    router = RouterLLM([NamedLLM("primary"), NamedLLM("backup")], hedge_percentile=0.9, min_samples=10)
+    router.stats["requests"] = 100
+
+    assert router._get_hedge_delay(0) is None
+    for i in range(100):
+        router._record_latency(0, i / 100)
+
+    assert router._get_hedge_delay(0) == 0.9
+    assert router._get_hedge_delay(1) is None
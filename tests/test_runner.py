@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from datafarmer.llm.runner import LoopRunner, get_runner
+from tests.test_base import EchoLLM, _sample_data
+import asyncio
+import pytest
+
+
+class LoopRecordingLLM(EchoLLM):
+    """Remembers the event loop every request ran on."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.loops = set()
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        self.loops.add(asyncio.get_running_loop())
+        return await super()._generate_single(id, prompt, **kwargs)
+
+
+def test_sync_calls_share_one_loop():
+    llm = LoopRecordingLLM()
+    calls = get_runner().stats()["calls"]
+
+    for _ in range(3):
+        result = llm.generate_from_dataframe(_sample_data(4))
+        assert (result["status"] == "succeeded").all()
+
+    assert len(llm.loops) == 1
+    stats = get_runner().stats()
+    assert stats["calls"] == calls + 3
+    assert stats["startup_ms"] is not None and stats["mean_setup_ms"] >= 0
+
+
+def test_sync_call_inside_running_loop_and_from_threads():
+    llm = LoopRecordingLLM()
+
+    async def notebook_cell():
+        # a notebook already runs a loop in the calling thread
+        return llm.generate_from_dataframe(_sample_data(3))
+
+    assert len(asyncio.run(notebook_cell())) == 3
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda n: llm.generate_from_dataframe(_sample_data(n)), range(1, 9)))
+
+    assert [len(result) for result in results] == list(range(1, 9))
+    assert len(llm.loops) == 1
+
+
+def test_runner_refuses_nesting_and_shuts_down():
+    runner = LoopRunner(name="test-loop")
+
+    async def nested():
+        return runner.run(asyncio.sleep(0))
+
+    with pytest.raises(RuntimeError):
+        runner.run(nested())
+
+    async def forever():
+        await asyncio.sleep(3600)
+
+    with pytest.raises(TimeoutError):
+        runner.run(forever(), timeout=0.05)
+
+    loop = runner._loop
+    runner.shutdown()
+    assert not runner.is_running and loop.is_closed()
+
+    # the next call starts a new loop
+    assert runner.run(asyncio.sleep(0, result="done")) == "done"
+    assert runner.stats()["calls"] == 3
+    runner.shutdown()
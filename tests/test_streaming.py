@@ -0,0 +1,128 @@
+from datafarmer.llm import Anthropic, Gemini, InMemoryMetrics, ResponseCache, StreamOptions
+from pandas import DataFrame
+from tests.test_base import EchoLLM
+from types import SimpleNamespace
+import asyncio
+import pytest
+import time
+
+
+class FakeStream:
+    """Async iterator over events that remembers whether it was closed."""
+
+    def __init__(self, events, delay=0.0):
+        self.events = events
+        self.delay = delay
+        self.sent = 0
+        self.closed = False
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for event in self.events:
+            await asyncio.sleep(self.delay)
+            self.sent += 1
+            yield event
+
+    async def close(self):
+        self.closed = True
+
+
+def test_collect_stops_and_closes_the_stream():
+    metrics = InMemoryMetrics()
+    closed = []
+
+    async def chunks(parts):
+        try:
+            for part in parts:
+                await asyncio.sleep(0.001)
+                yield part
+        finally:
+            closed.append(True)
+
+    async def collect(options, parts):
+        return await options.collect(chunks(parts), "model", metrics, time.perf_counter())
+
+    parts = ["<answer>", "yes", "</answer>", " and then a long tail"] + ["..."] * 100
+    assert asyncio.run(collect(StreamOptions(), ["a", "", "b", None, "c"])) == "abc"
+    assert asyncio.run(collect(StreamOptions(max_chars=10), parts)) == "<answer>ye"
+    stop = StreamOptions(stop_when=lambda text: "</answer>" in text)
+    assert asyncio.run(collect(stop, parts)) == "<answer>yes</answer>"
+
+    assert closed == [True, True, True]
+    snapshot = metrics.snapshot()
+    assert snapshot["streams_stopped"] == 2
+    assert snapshot["ttft_p50"]["model"] > 0 and snapshot["inter_chunk_p50"] > 0
+    assert "datafarmer_llm_time_to_first_token_seconds_count" in metrics.to_prometheus()
+
+
+def test_anthropic_stream_with_early_stop():
+    anthropic = Anthropic(api_key="key", prompt_caching=True, min_wait=0, max_wait=0)
+    streams = []
+
+    async def create(timeout, stream=False, **kwargs):
+        assert stream
+        usage = SimpleNamespace(
+            input_tokens=5, cache_read_input_tokens=100, cache_creation_input_tokens=0
+        )
+        events = [SimpleNamespace(type="message_start", message=SimpleNamespace(usage=usage))]
+        events += [
+            SimpleNamespace(type="content_block_delta", delta=SimpleNamespace(type="text_delta", text="word "))
+            for _ in range(50)
+        ]
+        streams.append(FakeStream(events, delay=0.001))
+        return streams[-1]
+
+    anthropic.client.messages.create = create
+
+    data = DataFrame({"id": [1, 2], "prompt": ["a", "b"]})
+    result = anthropic.generate_from_dataframe(data, stream=StreamOptions(max_chars=12))
+
+    assert result["result"].tolist() == ["word word wo"] * 2
+    assert (result["status"] == "succeeded").all()
+    # the stream is closed after three chunks instead of read to the end
+    assert all(stream.closed and stream.sent == 4 for stream in streams)
+    snapshot = anthropic.metrics.snapshot()
+    assert snapshot["streams_stopped"] == 2 and snapshot["prompt_cache_read_tokens"] == 200
+
+
+def test_gemini_stream_records_time_to_first_token():
+    gemini = Gemini(project_id="project", min_wait=0, max_wait=0)
+
+    async def generate_content_stream(model, contents, config):
+        async def responses():
+            await asyncio.sleep(0.02)
+            for text in ["Hello", ", ", None, "world"]:
+                yield SimpleNamespace(text=text, usage_metadata=None)
+
+        return responses()
+
+    gemini.client.aio.models.generate_content_stream = generate_content_stream
+
+    result = gemini.generate_from_dataframe(DataFrame({"id": [1], "prompt": ["hi"]}), stream=True)
+
+    assert result["result"].item() == "Hello, world"
+    snapshot = gemini.metrics.snapshot()
+    assert snapshot["ttft_p50"]["gemini-2.5-flash-lite"] > 0.01
+    assert snapshot["streams_stopped"] == 0
+
+
+def test_stream_requires_provider_support():
+    with pytest.raises(AssertionError):
+        EchoLLM().generate_from_dataframe(DataFrame({"id": [1], "prompt": ["a"]}), stream=True)
+
+
+def _stop_at_answer(text):
+    return "</answer>" in text
+
+
+def test_stop_when_must_be_named_with_a_cache(tmp_path):
+    anthropic = Anthropic(api_key="key", cache=ResponseCache(path=str(tmp_path / "cache.sqlite")))
+    data = DataFrame({"id": [1], "prompt": ["a"]})
+
+    assert StreamOptions(stop_when=_stop_at_answer).cacheable
+    with pytest.raises(AssertionError, match="module-level"):
+        anthropic.generate_from_dataframe(
+            data, stream=StreamOptions(stop_when=lambda text: "</answer>" in text)
+        )
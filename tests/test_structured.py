@@ -0,0 +1,115 @@
+from datafarmer.llm.base import BaseLLM
+from datafarmer.llm.structured import ResponseSchema, StructuredOutputError
+from pandas import DataFrame
+from pydantic import BaseModel
+from types import SimpleNamespace
+from typing import Optional
+import json
+import polars as pl
+import pytest
+
+
+class Review(BaseModel):
+    label: str
+    score: float
+    stars: Optional[int] = None
+
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "label": {"type": "string", "enum": ["positive", "negative"]},
+        "confident": {"type": "boolean"},
+        "id": {"type": "integer"},
+    },
+    "required": ["label"],
+}
+
+
+class JsonLLM(BaseLLM):
+    """Answers JSON, but the first attempt of a "flaky" prompt is cut off."""
+
+    def __init__(self, **kwargs):
+        super().__init__(min_wait=0, max_wait=0, **kwargs)
+        self.calls = {}
+
+    async def _generate_single(self, id, prompt, **kwargs):
+        self.calls[id] = self.calls.get(id, 0) + 1
+        if prompt == "flaky" and self.calls[id] == 1:
+            return id, '{"label": "posi', True
+        if prompt == "broken":
+            return id, "I think it is positive", True
+        return id, json.dumps({"label": "positive", "score": 0.5, "stars": 4}), True
+
+
+def test_response_schema_parse():
+    schema = ResponseSchema(SCHEMA)
+
+    assert schema.parse('```json\n{"label": "negative", "id": 3}\n```') == {
+        "label": "negative",
+        "id": 3,
+    }
+    for text in ['{"label": "neutral"}', '{"id": 3}', '{"label": "positive", "id": true}', "{"]:
+        with pytest.raises(StructuredOutputError):
+            schema.parse(text)
+
+    model_schema = ResponseSchema(Review)
+    assert model_schema.fields == ["label", "score", "stars"]
+    assert model_schema.types == ["string", "number", "integer"]
+    with pytest.raises(StructuredOutputError):
+        model_schema.parse('{"label": "positive"}')
+
+
+def test_structured_output_columns_and_retries():
+    llm = JsonLLM()
+    data = DataFrame({"id": ["A", "B", "C"], "prompt": ["good", "flaky", "broken"]})
+
+    result = llm.generate_from_dataframe(data, response_schema=Review).set_index("id")
+
+    assert str(result["score"].dtype) == "Float64" and str(result["stars"].dtype) == "Int64"
+    assert result.loc["A", "label"] == "positive" and result.loc["A", "stars"] == 4
+    # a response that doesn't parse is retried, then fails with its own error type
+    assert result.loc["B", "status"] == "succeeded" and result.loc["B", "attempts"] == 2
+    assert result.loc["C", "status"] == "failed"
+    assert result.loc["C", "error_type"] == "StructuredOutputError"
+    assert result["stars"].isna().sum() == 1
+
+    snapshot = llm.metrics.snapshot()
+    assert snapshot["parse_errors"] == {"JsonLLM": 4}
+    assert snapshot["retries"]["JsonLLM|parse_error"] == 3
+
+
+def test_structured_output_polars_and_clashing_fields():
+    class IdLLM(JsonLLM):
+        async def _generate_single(self, id, prompt, **kwargs):
+            return id, json.dumps({"label": "negative", "confident": True, "id": 7}), True
+
+    data = pl.DataFrame({"id": [1, 2], "prompt": ["a", "b"]})
+    result = IdLLM().generate_from_dataframe(data, response_schema=SCHEMA)
+
+    assert isinstance(result, pl.DataFrame)
+    assert result.schema["confident"] == pl.Boolean
+    assert result.schema["result_id"] == pl.Int64
+    assert sorted(result["id"].to_list()) == [1, 2]
+    assert set(result["result_id"]) == {7}
+
+
+def test_gemini_requests_json_of_the_schema():
+    from datafarmer.llm import Gemini
+
+    gemini = Gemini(project_id="project", min_wait=0, max_wait=0)
+    configs = []
+
+    async def generate_content(model, contents, config):
+        configs.append(config)
+        return SimpleNamespace(text='{"label": "positive", "score": 1}', usage_metadata=None)
+
+    gemini.client.aio.models.generate_content = generate_content
+
+    result = gemini.generate_from_dataframe(
+        DataFrame({"id": [1], "prompt": ["review"]}), response_schema=Review
+    )
+
+    assert configs[0].response_mime_type == "application/json"
+    assert configs[0].response_schema is Review
+    assert result["score"].item() == 1.0
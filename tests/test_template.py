@@ -0,0 +1,47 @@
+from datafarmer.llm.template import get_template_columns, render_prompt_template
+from pandas import DataFrame
+import polars as pl
+import pytest
+from tests.test_base import EchoLLM
+
+
+def test_render_prompt_template():
+    data = DataFrame({"name": ["Ana", "Budi"], "score": [0.5, 0.25]})
+
+    assert render_prompt_template(data, "{name} scored {score:.0%}").tolist() == [
+        "Ana scored 50%",
+        "Budi scored 25%",
+    ]
+    # jinja-style placeholders keep other braces literal
+    assert render_prompt_template(data, 'Return {"name": "{{ name }}"}').tolist() == [
+        'Return {"name": "Ana"}',
+        'Return {"name": "Budi"}',
+    ]
+    assert get_template_columns("{{ a }} and {{b}} and {{ a }}") == ["a", "b"]
+
+
+def test_missing_values_render_the_same_in_pandas_and_polars():
+    data = DataFrame(
+        {"name": ["Ana", None, "Citra"], "score": [0.5, 0.25, float("nan")]}
+    )
+    template = "{name!r} scored {score:.0%}"
+    expected = ["'Ana' scored 50%", " scored 25%", "'Citra' scored "]
+
+    assert render_prompt_template(data, template).tolist() == expected
+    assert render_prompt_template(pl.from_pandas(data), template).to_list() == expected
+    assert render_prompt_template(pl.from_pandas(data, nan_to_null=False), template).to_list() == expected
+
+
+def test_generate_with_prompt_template():
+    data = DataFrame({"id": [1, 2], "review": ["great", "awful"]})
+
+    result = EchoLLM().generate_from_dataframe(
+        data, prompt_template="Classify: {review}", max_concurrency=2
+    )
+    assert dict(zip(result["id"], result["result"])) == {
+        1: "echo: Classify: great",
+        2: "echo: Classify: awful",
+    }
+
+    with pytest.raises(AssertionError, match="language"):
+        EchoLLM().generate_from_dataframe(data, prompt_template="{review} in {language}")
@@ -0,0 +1,59 @@
+from benchmarks.fake_provider import LatencyModel
+from benchmarks.http_stub import serve_stub
+from datafarmer.llm import Anthropic, Gemini, GithubCopilot, HttpTransport
+from pandas import DataFrame
+import httpx
+import pickle
+import pytest
+
+
+@pytest.fixture
+def stub_url(monkeypatch):
+    with serve_stub(LatencyModel(median_latency=0.02, sigma=0.0, tail_probability=0)) as base_url:
+        monkeypatch.setenv("ANTHROPIC_BASE_URL", base_url)
+        yield base_url
+
+
+def test_shared_pool_reports_pool_wait(stub_url):
+    transport = HttpTransport(max_connections=2, pool_timeout=5)
+    llm = Anthropic(api_key="stub", transport=transport, min_wait=0, max_wait=0)
+    other = Anthropic(api_key="stub", model="claude-haiku-4-5", transport=transport)
+
+    # both LLMs send through the same client, and so the same pool
+    assert llm.client._client is other.client._client
+    assert llm.timeout.pool == 5 and llm.timeout.read == 30
+
+    data = DataFrame({"id": range(8), "prompt": [f"prompt {i}" for i in range(8)]})
+    result = llm.generate_from_dataframe(data, max_concurrency=8)
+
+    assert (result["status"] == "succeeded").all()
+    snapshot = llm.metrics.snapshot()
+    # 8 concurrent requests over 2 connections: 6 of them queue in the pool for a reused one
+    assert snapshot["new_connections"] == 2 and snapshot["reused_connections"] == 6
+    assert snapshot["pool_wait_total"] > 0.02
+    assert transport.stats()["requests"] == 8
+    assert "datafarmer_llm_pool_wait_seconds_count 8" in llm.metrics.to_prometheus()
+
+
+def test_transport_clients_per_sdk_and_pickling():
+    transport = HttpTransport(max_connections=50, keepalive_expiry=5)
+    plain = transport.get_client(timeout=20)
+    copilot = GithubCopilot(github_token="token", transport=transport)
+
+    assert isinstance(plain, httpx.AsyncClient) and transport.get_client() is plain
+    assert copilot.client._client is not plain
+    assert plain.timeout.read == 20 and plain.timeout.connect == 10
+
+    gemini = Gemini(
+        project_id="project",
+        client_kwargs={"http_options": {"api_version": "v1"}},
+        targets=[{"location": "us-central1"}, {"location": "europe-west4"}],
+        transport=transport,
+    )
+    for client in gemini.clients:
+        http_options = client._api_client._http_options
+        assert http_options.httpx_async_client is plain and http_options.api_version == "v1"
+
+    # workers rebuild their own clients
+    restored = pickle.loads(pickle.dumps(transport))
+    assert restored._clients == {} and restored.max_connections == 50
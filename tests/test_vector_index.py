@@ -0,0 +1,104 @@
+from datafarmer.llm import ResponseCache, VectorIndex, VertexRag
+from datafarmer.llm import vertex_rag
+from google.cloud.aiplatform_v1beta1 import RagContexts, RetrieveContextsResponse
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import polars as pl
+
+
+def _clustered_vectors(rows=5000, dimensions=32, clusters=20, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dimensions))
+    vectors = centers[rng.integers(0, clusters, rows)] + 0.3 * rng.normal(size=(rows, dimensions))
+    return vectors.astype(np.float32)
+
+
+def _records(rows):
+    return pd.DataFrame(
+        {
+            "text": [f"chunk {i}" for i in range(rows)],
+            "source_uri": [f"gs://bucket/{i % 4}.txt" for i in range(rows)],
+            "file_id": [str(i % 4) for i in range(rows)],
+        }
+    )
+
+
+def test_exact_search_matches_brute_force(tmp_path):
+    vectors = _clustered_vectors()
+    vectors[7] = np.nan  # a chunk that failed to embed
+    path = str(tmp_path / "chunks.npy")
+    np.save(path, vectors)
+    index = VectorIndex.load(path, pl.from_pandas(_records(len(vectors))))
+    queries = vectors[10:30] + 0.01
+
+    rows, distances = index.search(queries, top_k=5)
+
+    normalized = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    queries_normalized = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = np.nan_to_num(queries_normalized @ normalized.T, nan=-2)
+    assert (rows[:, 0] == np.argmax(scores, axis=1)).all()
+    assert np.allclose(distances[:, 0], 1 - scores.max(axis=1), atol=1e-5)
+    assert (np.diff(distances, axis=1) >= 0).all() and 7 not in rows
+
+    rows, distances = index.search(
+        queries[0], top_k=len(vectors) + 5, max_distance=0.3, file_ids=["1"]
+    )
+    found = rows[0][rows[0] >= 0]
+    assert len(found) and all(row % 4 == 1 for row in found)
+    assert (distances[0][: len(found)] < 0.3).all() and np.isinf(distances[0][len(found) :]).all()
+
+
+def test_approximate_search_recall():
+    vectors = _clustered_vectors()
+    queries = vectors[:50] + 0.01
+    exact = VectorIndex(vectors, _records(len(vectors)))
+    approximate = VectorIndex(vectors, _records(len(vectors)), n_lists=70, n_probe=8)
+
+    truth, _ = exact.search(queries, top_k=10)
+    rows, _ = approximate.search(queries, top_k=10)
+
+    recall = np.mean([len(set(a) & set(b)) / 10 for a, b in zip(rows.tolist(), truth.tolist())])
+    assert recall > 0.9
+
+
+def test_vertex_rag_retrieval_cache(monkeypatch, tmp_path):
+    calls = []
+    files = [SimpleNamespace(name="corpus/files/1", update_time="2026-01-01")]
+
+    def retrieval_query(rag_resources, text, rag_retrieval_config):
+        calls.append(text)
+        context = RagContexts.Context(source_uri="gs://bucket/a.txt", text=f"about {text}", distance=0.1)
+        return RetrieveContextsResponse(contexts=RagContexts(contexts=[context]))
+
+    monkeypatch.setattr(vertex_rag.rag, "retrieval_query", retrieval_query)
+    monkeypatch.setattr(vertex_rag.rag, "list_files", lambda corpus_name, page_size: list(files))
+    cache = ResponseCache(path=str(tmp_path / "cache.sqlite"), ttl_seconds=3600)
+    rag = VertexRag(project_id="project", cache=cache, listing_check_interval=0)
+
+    for _ in range(3):
+        response = rag.get_retrieval_query(corpus_name="corpus", query="refund")
+    rag.get_retrieval_query(corpus_name="corpus", query="refund", similarity_top_k=3)
+    assert calls == ["refund", "refund"]
+    assert response.contexts.contexts[0].text == "about refund"
+
+    # a new file in the corpus makes the cached responses stale
+    files.append(SimpleNamespace(name="corpus/files/2", update_time="2026-02-01"))
+    rag.get_retrieval_query(corpus_name="corpus", query="refund")
+    assert calls == ["refund", "refund", "refund"]
+    assert cache.stats()["hits"] == 2
+
+
+def test_vertex_rag_local_index(monkeypatch):
+    def retrieval_query(**kwargs):
+        raise AssertionError("the service should not be called")
+
+    monkeypatch.setattr(vertex_rag.rag, "retrieval_query", retrieval_query)
+    vectors = np.eye(4, dtype=np.float32)
+    rag = VertexRag(project_id="project")
+    rag.set_local_index("corpus", VectorIndex(vectors, _records(4)), lambda queries: vectors[[1]])
+
+    response = rag.get_retrieval_query(corpus_name="corpus", query="anything", similarity_top_k=2)
+
+    contexts = response.contexts.contexts
+    assert [(c.text, c.source_uri, c.distance) for c in contexts] == [("chunk 1", "gs://bucket/1.txt", 0.0)]